@@ -0,0 +1,71 @@
+"""Benchmark fanning game updates out to many spectators: one encoding per viewer against shared frames.
+
+Run from the repository root with `python -m benchmarks.bench_broadcast`.
+"""
+
+import time
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.server.broadcast import Broadcaster
+from findpatientzero.server.protocol import Visibility, diff, encode
+
+NUM_PLAYERS = 40
+NUM_CITIES = 20
+MAX_ROUND = 40
+SPECTATORS = 500
+GAME_MASTERS = 5
+
+
+def new_game() -> Game:
+    """Create an all-CPU game."""
+
+    return Game(
+        GameConfig(num_players=NUM_PLAYERS, num_cities=NUM_CITIES, auto_roll=False, cpu_governors=True),
+        [],
+        [f"City {i}" for i in range(NUM_CITIES)],
+        seed=0,
+    )
+
+
+def per_viewer() -> float:
+    """Diff and encode every update separately for each viewer; return the seconds spent."""
+
+    game = new_game()
+    viewers = [Visibility.PUBLIC] * SPECTATORS + [Visibility.GAME_MASTER] * GAME_MASTERS
+    queues: list[list[bytes]] = [[] for _ in viewers]
+    spent = 0.0
+    previous = game.last_state
+    while game.phase != GamePhase.GAME_OVER and game.round < MAX_ROUND:
+        game.run_rounds(1)
+        start = time.perf_counter()
+        for visibility, queue in zip(viewers, queues):
+            queue.append(encode(diff(game, previous, game.last_state).redact(visibility)))
+        spent += time.perf_counter() - start
+        previous = game.last_state
+    return spent
+
+
+def shared() -> float:
+    """Broadcast every update with shared frames; return the seconds spent."""
+
+    game = new_game()
+    broadcaster = Broadcaster(game, max_pending=MAX_ROUND + 1)
+    # Publish explicitly instead of from the game's hooks, to time publishing alone
+    broadcaster._unsubscribe()
+    for _ in range(SPECTATORS):
+        broadcaster.subscribe()
+    for _ in range(GAME_MASTERS):
+        broadcaster.subscribe(Visibility.GAME_MASTER)
+    spent = 0.0
+    while game.phase != GamePhase.GAME_OVER and game.round < MAX_ROUND:
+        game.run_rounds(1)
+        start = time.perf_counter()
+        broadcaster.publish()
+        spent += time.perf_counter() - start
+    return spent
+
+
+if __name__ == "__main__":
+    print(f"{SPECTATORS} spectators and {GAME_MASTERS} game masters, {NUM_PLAYERS} players, up to round {MAX_ROUND}")
+    for label, func in (("per viewer", per_viewer), ("shared frames", shared)):
+        print(f"{label:>13}: {func() * 1000:8.1f} ms")
@@ -0,0 +1,39 @@
+"""Benchmark forking a 20-player game against deep-copying it.
+
+Run from the repository root with `python -m benchmarks.bench_fork`.
+"""
+
+import copy
+import timeit
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+
+NUM_PLAYERS = 20
+NUM_CITIES = 12
+ROUNDS = 8
+
+
+def setup_game() -> Game:
+    """Create an all-CPU game and play a few rounds so that it has some history."""
+
+    game = Game(
+        GameConfig(num_players=NUM_PLAYERS, num_cities=NUM_CITIES),
+        [],
+        [f"City {i}" for i in range(NUM_CITIES)],
+        seed=0,
+    )
+    while game.round < ROUNDS and game.phase != GamePhase.GAME_OVER:
+        game.go_to_next_phase()
+    return game
+
+
+if __name__ == "__main__":
+    game = setup_game()
+    print(f"{NUM_PLAYERS} players, {NUM_CITIES} cities, round {game.round}")
+
+    for label, func, number in (
+        ("Game.fork()", game.fork, 5000),
+        ("copy.deepcopy(game)", lambda: copy.deepcopy(game), 200),
+    ):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print(f"{label:>20}: {number / seconds:10,.0f} per second ({seconds / number * 1e6:.1f} us each)")
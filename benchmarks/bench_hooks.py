@@ -0,0 +1,144 @@
+"""Benchmark the cost of game hooks, with and without subscribers.
+
+Run from the repository root with `python -m benchmarks.bench_hooks`. Without subscribers
+a game only checks `hooks.active` at each publishing site, so its speed should match a
+tree from before hooks were added. `--baseline REV` measures exactly that: it checks out
+REV (by default the commit before hooks were added) in a temporary git worktree and plays
+the same seeds without subscribers in both trees, alternating fresh processes so that
+neither tree benefits from a warmer machine.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from findpatientzero.engine.game import Game, GameConfig
+from findpatientzero.engine.hooks import Hook
+
+NUM_PLAYERS = 20
+NUM_CITIES = 12
+MAX_ROUND = 40
+GAMES = 20
+REPEAT = 5
+
+BASELINE = "e0d3def~1"
+"""The commit before hooks were added."""
+
+UNSUBSCRIBED = f"""
+import json, timeit
+from findpatientzero.engine.game import Game, GameConfig
+
+def play():
+    rounds = 0
+    for seed in range({GAMES}):
+        game = Game(
+            GameConfig(num_players={NUM_PLAYERS}, num_cities={NUM_CITIES}, auto_roll=False, cpu_governors=True),
+            [],
+            [f"City {{i}}" for i in range({NUM_CITIES})],
+            seed=seed,
+        )
+        rounds += game.run_to_end(max_round={MAX_ROUND})
+    return rounds
+
+print(json.dumps([min(timeit.repeat(play, number=1, repeat={REPEAT})), play()]))
+"""
+"""A script that plays the games without subscribers in the tree it is run from, and prints
+the best time and the total number of rounds played (using only APIs older than hooks)."""
+
+
+def new_game(seed: int) -> Game:
+    """Create an all-CPU game."""
+
+    return Game(
+        GameConfig(num_players=NUM_PLAYERS, num_cities=NUM_CITIES, auto_roll=False, cpu_governors=True),
+        [],
+        [f"City {i}" for i in range(NUM_CITIES)],
+        seed=seed,
+    )
+
+
+def play(hooks: tuple[Hook, ...]) -> int:
+    """Play every game with a counting subscriber on some hooks.
+
+    Returns:
+        The number of hooks published.
+    """
+
+    published = 0
+
+    def count(game, *args) -> None:
+        nonlocal published
+        published += 1
+
+    for seed in range(GAMES):
+        game = new_game(seed)
+        for hook in hooks:
+            game.hooks.subscribe(hook, count)
+        game.run_to_end(max_round=MAX_ROUND)
+    return published
+
+
+def unsubscribed(tree: str) -> tuple[float, int]:
+    """Play the games without subscribers in a fresh process in a tree.
+
+    Returns:
+        The best time in seconds and the total number of rounds played.
+    """
+
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    output = subprocess.run(
+        [sys.executable, "-c", UNSUBSCRIBED], cwd=tree, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    seconds, rounds = json.loads(output)
+    return seconds, rounds
+
+
+def compare(revision: str, processes: int) -> None:
+    """Time the games without subscribers in this tree and in a baseline revision."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = os.path.join(directory, "baseline")
+        subprocess.run(["git", "worktree", "add", "--detach", baseline, revision], cwd=root, check=True,
+                       capture_output=True)
+        try:
+            times: dict[str, list[float]] = {"baseline": [], "hooks": []}
+            rounds: dict[str, int] = dict()
+            for _ in range(processes):
+                for label, tree in (("baseline", baseline), ("hooks", root)):
+                    seconds, rounds[label] = unsubscribed(tree)
+                    times[label].append(seconds)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", baseline], cwd=root, check=True)
+
+    assert rounds["baseline"] == rounds["hooks"], "the trees played different games"
+    print(f"no subscribers, {rounds['hooks']:,} rounds, best of {REPEAT} in each of {processes} processes per tree")
+    for label, measured in times.items():
+        print(f"{label:>12}: best {min(measured) * 1000:7.1f} ms, median {sorted(measured)[processes // 2] * 1000:7.1f} ms")
+    difference = min(times["hooks"]) / min(times["baseline"]) - 1
+    print(f"{'difference':>12}: {difference:+.1%} (best against best)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", nargs="?", const=BASELINE, help="compare no subscribers with this revision")
+    parser.add_argument("--processes", type=int, default=9, help="processes per tree for --baseline")
+    args = parser.parse_args()
+
+    if args.baseline is not None:
+        compare(args.baseline, args.processes)
+        sys.exit()
+
+    print(f"{GAMES} games, {NUM_PLAYERS} players, {NUM_CITIES} cities, up to round {MAX_ROUND}, best of {REPEAT}")
+    cases = {
+        "none": (),
+        "deaths only": (Hook.DIED,),
+        "all hooks": tuple(Hook),
+    }
+    for label, hooks in cases.items():
+        seconds = min(timeit.repeat(lambda: play(hooks), number=1, repeat=REPEAT))
+        print(f"{label:>12}: {seconds * 1000:7.1f} ms, {play(hooks):7,} hooks published")
@@ -0,0 +1,40 @@
+"""Benchmark the mean-field model: its error against the full engine, and its speed on large maps.
+
+Run from the repository root with `python -m benchmarks.bench_meanfield`.
+"""
+
+import time
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.meanfield import MeanFieldModel, measure_error
+
+ROUNDS = 30
+SEEDS = list(range(100))
+CONFIGS = {
+    "8 players, 6 cities": GameConfig(num_players=8, num_cities=6),
+    "40 players, 20 cities": GameConfig(num_players=40, num_cities=20),
+    "40 players, 20 cities, CPU governors": GameConfig(num_players=40, num_cities=20, cpu_governors=True),
+    "200 players, 100 cities": GameConfig(num_players=200, num_cities=100),
+}
+LARGE_MAPS = (1000, 5000)
+LARGE_ROUNDS = 60
+
+
+if __name__ == "__main__":
+    print(f"Error against the average of {len(SEEDS)} engine games over {ROUNDS} rounds")
+    print(f"{'':>38} {'health':>7} {'max':>6} {'stage':>6} {'city':>6} {'model':>9} {'engine':>9}")
+    for name, config in CONFIGS.items():
+        error = measure_error(config, SEEDS, ROUNDS)
+        print(
+            f"{name:>38} {error.health:7.3f} {error.max_health:6.3f} {error.mean_stage:6.2f} "
+            f"{error.city_stage:6.2f} {error.model_seconds * 1000:7.1f}ms {error.engine_seconds:8.1f}s"
+        )
+
+    print(f"\nModel time for {LARGE_ROUNDS} rounds on large maps (2 players per city)")
+    for cities in LARGE_MAPS:
+        for cpu_governors in (False, True):
+            model = MeanFieldModel(GameConfig(num_players=2 * cities, num_cities=cities, cpu_governors=cpu_governors))
+            start = time.perf_counter()
+            model.run(LARGE_ROUNDS)
+            label = f"{cities} cities" + (", CPU governors" if cpu_governors else "")
+            print(f"{label:>38} {(time.perf_counter() - start) * 1000:8.1f} ms")
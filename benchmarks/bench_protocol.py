@@ -0,0 +1,125 @@
+"""Benchmark sending game states to a remote client: full states against deltas.
+
+Run from the repository root with `python -m benchmarks.bench_protocol`. A stand-in server
+plays all-CPU games and sends every committed state over a local socket to a stand-in client
+thread, which decodes it into a `StateMirror`. Bytes and encode time are per round.
+"""
+
+import socket
+import struct
+import threading
+import time
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.server.protocol import (
+    StateMirror,
+    Visibility,
+    decode,
+    decode_json,
+    diff,
+    encode,
+    encode_json,
+    snapshot,
+)
+
+NUM_PLAYERS = 40
+NUM_CITIES = 20
+MAX_ROUND = 40
+GAMES = 10
+
+
+def new_game(seed: int) -> Game:
+    """Create an all-CPU game."""
+
+    return Game(
+        GameConfig(num_players=NUM_PLAYERS, num_cities=NUM_CITIES, auto_roll=False, cpu_governors=True),
+        [],
+        [f"City {i}" for i in range(NUM_CITIES)],
+        seed=seed,
+    )
+
+
+def receive(sock: socket.socket, size: int) -> bytes:
+    """Read exactly `size` bytes from a socket."""
+
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("The server closed the connection.")
+        data += chunk
+    return bytes(data)
+
+
+def client(sock: socket.socket, binary: bool, mirrors: list[StateMirror]) -> None:
+    """Decode length-prefixed messages into a mirror until an empty message ends each game."""
+
+    mirror = StateMirror()
+    while True:
+        (size,) = struct.unpack("!I", receive(sock, 4))
+        if size == 0:
+            mirrors.append(mirror)
+            if len(mirrors) == GAMES:
+                return
+            mirror = StateMirror()
+            continue
+        data = receive(sock, size)
+        mirror.apply(decode(data) if binary else decode_json(data.decode()))
+
+
+def serve(mode: str, visibility: Visibility) -> tuple[int, float, int]:
+    """Play the games and send every round to a client.
+
+    Args:
+        mode: "full" to send a JSON snapshot every round, "json" or "binary" to send deltas.
+        visibility: What the client is allowed to see.
+
+    Returns:
+        The bytes sent, the seconds spent diffing and encoding, and the number of rounds.
+    """
+
+    server, remote = socket.socketpair()
+    mirrors: list[StateMirror] = []
+    thread = threading.Thread(target=client, args=(remote, mode == "binary", mirrors))
+    thread.start()
+
+    sent = rounds = 0
+    encoding = 0.0
+    for seed in range(GAMES):
+        game = new_game(seed)
+        previous = None
+        while True:
+            start = time.perf_counter()
+            if mode == "full":
+                data = encode_json(snapshot(game).redact(visibility)).encode()
+            else:
+                delta = diff(game, previous, game.last_state) if previous is not None else snapshot(game)
+                delta = delta.redact(visibility)
+                data = encode(delta) if mode == "binary" else encode_json(delta).encode()
+            encoding += time.perf_counter() - start
+            server.sendall(struct.pack("!I", len(data)) + data)
+            sent += len(data)
+            rounds += 1
+
+            if game.phase == GamePhase.GAME_OVER or game.round >= MAX_ROUND:
+                break
+            previous = game.last_state
+            game.run_rounds(1)
+        server.sendall(struct.pack("!I", 0))
+
+    thread.join()
+    server.close()
+    remote.close()
+    return sent, encoding, rounds
+
+
+if __name__ == "__main__":
+    print(f"{GAMES} games, {NUM_PLAYERS} players, {NUM_CITIES} cities, up to round {MAX_ROUND}")
+    for visibility in Visibility:
+        print(f"{visibility.value} view:")
+        for mode, label in (("full", "full state, JSON"), ("json", "delta, JSON"), ("binary", "delta, binary")):
+            sent, encoding, rounds = serve(mode, visibility)
+            print(
+                f"  {label:>16}: {sent / rounds:8,.0f} bytes per round,"
+                f" {encoding / rounds * 1e6:6,.0f} us to encode per round"
+            )
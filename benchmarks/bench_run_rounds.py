@@ -0,0 +1,43 @@
+"""Benchmark fast-forwarding all-CPU games against stepping them phase by phase.
+
+Run from the repository root with `python -m benchmarks.bench_run_rounds`.
+"""
+
+import timeit
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+
+NUM_PLAYERS = 20
+NUM_CITIES = 12
+MAX_ROUND = 40
+GAMES = 20
+
+
+def new_game(seed: int) -> Game:
+    """Create an all-CPU game."""
+
+    return Game(
+        GameConfig(num_players=NUM_PLAYERS, num_cities=NUM_CITIES),
+        [],
+        [f"City {i}" for i in range(NUM_CITIES)],
+        seed=seed,
+    )
+
+
+def step() -> None:
+    for seed in range(GAMES):
+        game = new_game(seed)
+        while game.phase != GamePhase.GAME_OVER and game.round < MAX_ROUND:
+            game.go_to_next_phase()
+
+
+def fast_forward() -> None:
+    for seed in range(GAMES):
+        new_game(seed).run_to_end(max_round=MAX_ROUND)
+
+
+if __name__ == "__main__":
+    print(f"{GAMES} games, {NUM_PLAYERS} players, {NUM_CITIES} cities, up to round {MAX_ROUND}")
+    for label, func in (("go_to_next_phase", step), ("run_to_end", fast_forward)):
+        seconds = timeit.timeit(func, number=1)
+        print(f"{label:>17}: {GAMES / seconds:8,.0f} games per second")
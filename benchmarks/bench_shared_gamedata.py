@@ -0,0 +1,67 @@
+"""Benchmark worker start-up with and without shared game data.
+
+Run from the repository root with `python -m benchmarks.bench_shared_gamedata`.
+"""
+
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+from findpatientzero.gamedata.shared import SharedGameData, init_worker
+
+WORKERS = 8
+
+
+def start_worker(results, spec: str | None) -> None:
+    """Import the engine in a fresh worker and report the import time and peak memory."""
+
+    start = time.perf_counter()
+    if spec is not None:
+        init_worker(spec)
+    import findpatientzero.engine.game  # noqa: F401
+    seconds = time.perf_counter() - start
+    results.put((seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, private_game_data()))
+
+
+def private_game_data() -> int:
+    """Measure the bytes a worker allocates to decode the event data and build its events."""
+
+    from findpatientzero.engine.entities import event
+    from findpatientzero.gamedata import load, shared
+
+    if shared._attached is not None:
+        shared._attached._sections.clear()
+    tracemalloc.start()
+    kept = (event.repeat_events(event._get_event_frequencies()), load.load_governor_policy(),
+            load.load_health_transitions())
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def run(label: str, spec: str | None) -> None:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    start = time.perf_counter()
+    workers = [context.Process(target=start_worker, args=(results, spec)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    measurements = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+
+    imports = sum(seconds for seconds, _, _ in measurements) / WORKERS
+    rss = sum(kb for _, kb, _ in measurements) / WORKERS
+    private = sum(size for _, _, size in measurements) / WORKERS
+    print(f"{label:>6}: all workers ready in {wall * 1000:6.1f} ms, engine import {imports * 1000:6.1f} ms, "
+          f"peak RSS {rss / 1024:5.1f} MiB, private event data {private / 1024:5.1f} KiB per worker")
+
+
+if __name__ == "__main__":
+    print(f"{WORKERS} spawned workers")
+    run("YAML", None)
+    with SharedGameData.create() as shared:
+        run("shared", shared.spec)
@@ -0,0 +1,57 @@
+"""Benchmark ingesting simulated games into the results warehouse.
+
+Run from the repository root with `python -m benchmarks.bench_warehouse`.
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.runner import GameOutcome, GameResult, game_seed, play_game
+from findpatientzero.simulation.warehouse import ResultsWarehouse
+
+GAMES = 1_000_000
+BATCH = 10_000
+CONFIGS = [GameConfig(num_players=8, num_cities=6, survey_threshold=threshold) for threshold in range(1, 11)]
+
+
+def synthetic_results(count: int, start: int) -> list[GameResult]:
+    """Game results shaped like real ones, without playing the games."""
+
+    rng = random.Random(start)
+    outcomes = list(GameOutcome)
+    return [
+        GameResult(game_seed(0, start + index), rng.choice(outcomes), rng.randint(5, 40), rng.randint(0, 8))
+        for index in range(count)
+    ]
+
+
+def ingest(label: str, batches: list[tuple[GameConfig, list[GameResult]]]) -> None:
+    """Time adding the batches to a fresh warehouse, as the batch runner does."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.db")
+        start = time.perf_counter()
+        with ResultsWarehouse(path) as warehouse:
+            for config, results in batches:
+                warehouse.add_games(config, results)
+        seconds = time.perf_counter() - start
+        games = sum(len(results) for _, results in batches)
+        rounds = sum(len(result.round_metrics or ()) for _, results in batches for result in results)
+        size = os.path.getsize(path) / 2 ** 20
+    print(f"{label:>22}: {games:>9,} games, {rounds:>9,} round rows in {seconds:6.2f} s "
+          f"({games / seconds:>9,.0f} games/s, {(games + rounds) / seconds:>9,.0f} rows/s), {size:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    batches = [
+        (CONFIGS[index % len(CONFIGS)], synthetic_results(BATCH, index * BATCH))
+        for index in range(GAMES // BATCH)
+    ]
+    ingest("games", batches)
+
+    # Real games with round metrics (a few thousand, repeated to reach a realistic volume)
+    played = [play_game(CONFIGS[0], game_seed(1, index), 200, round_metrics=True) for index in range(2_000)]
+    ingest("games + round metrics", [(CONFIGS[0], played)] * 50)
@@ -2,7 +2,9 @@
 import random
 from findpatientzero.engine.entities.player import InfectionState
 from findpatientzero.engine.game import Game, GameConfig, GamePhase
-from findpatientzero.gamedata.load import load_console_text, load_city_names
+from findpatientzero.engine.inference import PatientZeroInference
+from findpatientzero.engine.names import NamePool, city_names as all_city_names
+from findpatientzero.gamedata.load import load_console_text
 
 
 console_text = load_console_text()
@@ -10,7 +12,6 @@ yes_no_map = console_text["yes_no_map"]
 wrongly_accused_traveler = console_text["wrongly_accused_traveler"]
 wrongly_accused_governor = console_text["wrongly_accused_governor"]
 wrongly_accused_observer = console_text["wrongly_accused_observer"]
-names: list[str] = load_city_names()
 
 
 def format_event(player) -> str:
@@ -26,6 +27,21 @@ def format_event(player) -> str:
 
     return output
 
+def print_contacts(game: Game, player, game_master_mode: bool) -> None:
+    """Print who a player shared a city with, and (for the game master) their likeliest chain of infection."""
+
+    contacts = game.contacts.contacts(player)
+    if not contacts:
+        print(f"{player.name} has not shared a city with anyone.")
+    for other, meetings in contacts.items():
+        print(f"\t{other.name}: " + ", ".join(f"{city} (round {game_round})" for game_round, city in meetings))
+    if game_master_mode:
+        chain = game.contacts.transmission_chain(player)
+        if chain:
+            print("Likely chain of infection: " + " -> ".join(
+                f"{infected.name} ({city}, round {game_round})" for infected, game_round, city in chain
+            ))
+
 def wait_for_enter(prompt):
     while True:
         if input(prompt) == "":
@@ -51,7 +67,9 @@ def main():
             break
         except ValueError:
             print("Please enter a valid number.")
-    city_names = [names.pop(random.randint(0, len(names) - 1)) for _ in range(num_cities)]
+    rng = random.Random()
+    city_name_pool = NamePool(all_city_names(), rng, fallback="City")
+    city_names = [city_name_pool.draw() for _ in range(num_cities)]
     print(f"Cities that will be in the Game{city_names}")
 
     # Get human players
@@ -142,11 +160,17 @@ def main():
 
     # Create a new game control object
     try:
-        config = GameConfig(num_players=len(player_names) + num_cpu, num_cities=num_cities, auto_roll=roll_response)
+        config = GameConfig(
+            num_players=len(player_names) + num_cpu,
+            num_cities=num_cities,
+            auto_roll=roll_response,
+            track_contacts=True,
+        )
         game = Game(config, player_names, city_names)
     except ValueError as e:
         print(e)
         return
+    inference = PatientZeroInference.from_history(game, [game.last_state])
 
     print("\n\033[1mD.A.R.W.I.N. Online\033[0m")
 
@@ -255,33 +279,44 @@ def main():
                 deliberation_round_counter = 0
                 prompt = (
                         "\nPlease guess which player is Patient Zero, press enter to skip guessing.\n"
-                        + "\n".join(f"{idx}: {player}" for idx, player in enumerate(game.players, 1))
+                        + "\n".join(
+                            f"{idx}: {player}"
+                            + (f" ({inference.probability(player):.0%} likely)" if game_master_mode else "")
+                            for idx, player in enumerate(game.players, 1)
+                        )
+                        + "\nType 'contacts <player>' to see who a player shared a city with."
                         + "\nInput: "
                 )
                 while True:
                     user_response = input(prompt).strip()
                     if user_response == "":
                         break
-                    chosen_player = next(
-                        (player for player in game.players if str(player).lower() == user_response.lower()), None)
-                    if chosen_player is None:
-                        try:
-                            chosen_player = game.players[int(user_response) - 1]
-                        except (ValueError, IndexError):
-                            pass
+                    if user_response.lower().startswith("contacts "):
+                        name = user_response[len("contacts "):].strip()
+                        traced_player = game.get_player(name)
+                        if traced_player is None and name.isdigit():
+                            traced_player = game.get_player(int(name) - 1)
+                        if traced_player is None:
+                            print("Invalid input. Try again.")
+                        else:
+                            print_contacts(game, traced_player, game_master_mode)
+                        continue
+                    chosen_player = game.get_player(user_response)
+                    if chosen_player is None and user_response.isdigit():
+                        chosen_player = game.get_player(int(user_response) - 1)
                     if chosen_player:
                         game.patient_zero_suspect = chosen_player
                         #NOTE game logic does not recognize player death until after resolve, this is flavor text only
                         #it should stay current to game logic in current form, but if refactored double check
                         if not game.suspect_is_patient_zero:
                             if game.patient_zero_suspect.is_traveler:
-                                print(f"{chosen_player.name} {random.choice(wrongly_accused_traveler)}"
+                                print(f"{chosen_player.name} {rng.choice(wrongly_accused_traveler)}"
                                       f"\nThey were not Patient Zero.")
                             elif game.patient_zero_suspect.is_governor:
-                                print(f"{chosen_player.name} {random.choice(wrongly_accused_governor)}"
+                                print(f"{chosen_player.name} {rng.choice(wrongly_accused_governor)}"
                                       f"\nThey are not Patient Zero.")
                             elif game.patient_zero_suspect.is_observer:
-                                print(f"{chosen_player.name} {random.choice(wrongly_accused_observer)}"
+                                print(f"{chosen_player.name} {rng.choice(wrongly_accused_observer)}"
                                       f"\nThey were not Patient Zero.")
                         break
                     else:
@@ -302,8 +337,11 @@ def main():
             break
 
 
+        resolving = game.phase == GamePhase.RESOLVE_MOVES
         game.go_to_next_phase()
         assert game.phase != GamePhase.ERROR
+        if resolving:
+            inference.observe(game.last_state)
 
     print("\n\033[1mD.A.R.W.I.N. Offline\033[0m"
           "\nThank you for playing."
@@ -0,0 +1,251 @@
+"""Contact tracing: which travelers shared a city, when, and who likely infected whom."""
+
+from bisect import bisect_left, bisect_right
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.player import InfectionState, Player, PlayerRole, PlayerState
+from findpatientzero.engine.transitions import INFECTED_STATES
+
+
+class ContactIndex:
+    """A co-location index of a game, updated as each state is committed.
+
+    The index maps each city and round to the travelers who ended the round there, and
+    each traveler to the rounds and cities of their visits, so contact queries only visit
+    the rounds a traveler was present instead of the whole history. It also records when
+    each traveler was infected and when each city was seeded (its infection went from 0 to
+    above 0) along with the infected travelers present, which links every infection to its
+    possible sources.
+    """
+
+    _visits: dict[Player, list[tuple[int, City]]]
+    """The (round, city) of each traveler's visits, in round order."""
+
+    _visit_rounds: dict[Player, list[int]]
+    """The rounds of each traveler's visits (for binary search)."""
+
+    _occupants: dict[tuple[City, int], list[Player]]
+    """The travelers in each city at the end of each round, in game order."""
+
+    _infections: dict[Player, tuple[int, City | None]]
+    """The round each traveler was infected and the city they were infected in."""
+
+    _seedings: dict[City, list[tuple[int, list[Player]]]]
+    """The rounds each city was seeded, and the infected travelers present who may have seeded it."""
+
+    _seeding_rounds: dict[City, list[int]]
+    """The rounds each city was seeded (for binary search)."""
+
+    _health: dict[Player, InfectionState]
+    """The latest health of each player."""
+
+    _stages: dict[City, int]
+    """The latest infection stage of each city."""
+
+    def __init__(self) -> None:
+        self._visits = dict()
+        self._visit_rounds = dict()
+        self._occupants = dict()
+        self._infections = dict()
+        self._seedings = dict()
+        self._seeding_rounds = dict()
+        self._health = dict()
+        self._stages = dict()
+
+    def record(
+                self,
+                game_round: int,
+                players: dict[Player, PlayerState],
+                cities: dict[City, CityState],
+            ) -> None:
+        """Index a committed state.
+
+        Args:
+            game_round: The round of the state.
+            players: The new states of the players whose state changed (every traveler).
+            cities: The new states of the cities.
+        """
+
+        for player, state in players.items():
+            if state.role == PlayerRole.TRAVELER and state.city is not None:
+                self._visits.setdefault(player, []).append((game_round, state.city))
+                self._visit_rounds.setdefault(player, []).append(game_round)
+                self._occupants.setdefault((state.city, game_round), []).append(player)
+            if state.health in INFECTED_STATES and player not in self._infections:
+                infected_round = game_round if state.infected_round is None else state.infected_round
+                self._infections[player] = (infected_round, state.city)
+
+        for city, state in cities.items():
+            if state.infection_stage > 0 and self._stages.get(city, 0) == 0:
+                # Only travelers who were already infected before the move can have spread
+                seeders = [
+                    player for player in self._occupants.get((city, game_round), ())
+                    if self._health.get(player) in INFECTED_STATES
+                ]
+                self._seedings.setdefault(city, []).append((game_round, seeders))
+                self._seeding_rounds.setdefault(city, []).append(game_round)
+            self._stages[city] = state.infection_stage
+
+        for player, state in players.items():
+            self._health[player] = state.health
+
+    def copy(self, players: dict[Player, Player], cities: dict[City, City]) -> "ContactIndex":
+        """Create a copy of the index for a forked game.
+
+        Args:
+            players: The players of the original game mapped to their copies.
+            cities: The cities of the original game mapped to their copies.
+
+        Returns:
+            The copy, referring to the copied players and cities.
+        """
+
+        copy = ContactIndex()
+        copy._visits = {
+            players[player]: [(game_round, cities[city]) for game_round, city in visits]
+            for player, visits in self._visits.items()
+        }
+        copy._visit_rounds = {players[player]: rounds.copy() for player, rounds in self._visit_rounds.items()}
+        copy._occupants = {
+            (cities[city], game_round): [players[player] for player in occupants]
+            for (city, game_round), occupants in self._occupants.items()
+        }
+        copy._infections = {
+            players[player]: (game_round, None if city is None else cities[city])
+            for player, (game_round, city) in self._infections.items()
+        }
+        copy._seedings = {
+            cities[city]: [(game_round, [players[player] for player in seeders]) for game_round, seeders in seedings]
+            for city, seedings in self._seedings.items()
+        }
+        copy._seeding_rounds = {cities[city]: rounds.copy() for city, rounds in self._seeding_rounds.items()}
+        copy._health = {players[player]: health for player, health in self._health.items()}
+        copy._stages = {cities[city]: stage for city, stage in self._stages.items()}
+        return copy
+
+    def visits(self, player: Player) -> list[tuple[int, City]]:
+        """The rounds and cities of a traveler's visits, in round order.
+
+        Args:
+            player: The player.
+
+        Returns:
+            The (round, city) of each visit (a copy).
+        """
+        return list(self._visits.get(player, ()))
+
+    def occupants(self, city: City, game_round: int) -> list[Player]:
+        """The travelers who were in a city at the end of a round.
+
+        Args:
+            city: The city.
+            game_round: The round.
+
+        Returns:
+            The travelers, in game order (a copy).
+        """
+        return list(self._occupants.get((city, game_round), ()))
+
+    def contacts(
+                self,
+                player: Player,
+                start: int | None = None,
+                stop: int | None = None,
+            ) -> dict[Player, list[tuple[int, City]]]:
+        """Who a traveler shared a city with, and when.
+
+        Args:
+            player: The traveler.
+            start: The first round to consider (from the start of the game if None).
+            stop: The last round to consider (up to the latest round if None).
+
+        Returns:
+            The rounds and cities each contact shared with the traveler, in round order, by
+            contact (in order of their first contact).
+        """
+
+        visits = self._visits.get(player, [])
+        rounds = self._visit_rounds.get(player, [])
+        first = 0 if start is None else bisect_left(rounds, start)
+        last = len(rounds) if stop is None else bisect_right(rounds, stop)
+        contacts: dict[Player, list[tuple[int, City]]] = dict()
+        for game_round, city in visits[first:last]:
+            for other in self._occupants[(city, game_round)]:
+                if other is not player:
+                    contacts.setdefault(other, []).append((game_round, city))
+        return contacts
+
+    def infection(self, player: Player) -> tuple[int, City | None] | None:
+        """When and where a player was infected.
+
+        Args:
+            player: The player.
+
+        Returns:
+            The round and city of the infection, or None if the player was never infected.
+        """
+        return self._infections.get(player)
+
+    def possible_sources(self, player: Player) -> list[Player]:
+        """The infected travelers who may have seeded the city where a player was infected.
+
+        A traveler is infected by moving into a city that was already infected, so the
+        sources are the seeders of the latest seeding of that city before the infection.
+
+        Args:
+            player: The infected player.
+
+        Returns:
+            The possible sources, earliest infected first (empty for Patient Zero, or if
+            the seeding happened before the index was created).
+        """
+
+        infection = self._infections.get(player)
+        if infection is None or infection[1] is None:
+            return []
+        game_round, city = infection
+        rounds = self._seeding_rounds.get(city, [])
+        index = bisect_left(rounds, game_round) - 1
+        if index < 0:
+            return []
+        seeders = self._seedings[city][index][1]
+        return sorted(
+            (seeder for seeder in seeders if seeder is not player),
+            key=lambda seeder: self._infections[seeder][0],
+        )
+
+    def transmission_chain(self, player: Player) -> list[tuple[Player, int, City | None]]:
+        """The likeliest chain of infections that led to a player's infection.
+
+        At each step, the earliest infected of the possible sources is chosen, as they had
+        the most rounds to spread the infection.
+
+        Args:
+            player: The infected player.
+
+        Returns:
+            The (player, infection round, infection city) of each infection, from the
+            earliest known source to the player (empty if the player was never infected).
+        """
+
+        chain = []
+        seen = set()
+        current: Player | None = player
+        while current is not None and current not in seen and current in self._infections:
+            seen.add(current)
+            game_round, city = self._infections[current]
+            chain.append((current, game_round, city))
+            sources = self.possible_sources(current)
+            current = sources[0] if sources else None
+        chain.reverse()
+        return chain
+
+    def transmission_tree(self) -> dict[Player, Player | None]:
+        """The likeliest source of every infection (for analytics).
+
+        Returns:
+            The likeliest source of each infected player (None if there is none), in order of infection.
+        """
+
+        infected = sorted(self._infections, key=lambda player: self._infections[player][0])
+        return {player: next(iter(self.possible_sources(player)), None) for player in infected}
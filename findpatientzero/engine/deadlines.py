@@ -0,0 +1,218 @@
+"""A single scheduler for the prompt deadlines of many concurrent games."""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+from findpatientzero.engine.game import Game, GamePhase
+from findpatientzero.engine.hooks import Hook
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Expires the prompts of every watched game when their deadline passes.
+
+    Deadlines are kept in one heap ordered by time, whatever the number of games, and
+    scheduled from the PHASE_CHANGED hook of each game. Entries are never removed early:
+    when an entry comes due, it is skipped if its game is no longer watched or has moved
+    on to another phase since (the game's `prompt_deadline` no longer matches it).
+
+    Deadlines can be expired by calling `poll` from an existing event loop, or by a
+    background thread started with `start`. Games are not thread-safe, so every watched
+    game has a lock (see `lock`), which the scheduler holds while expiring the game's
+    prompts; threads that answer prompts or otherwise change the game must hold it too.
+    Errors raised while expiring a game are logged, and do not stop the other deadlines.
+    """
+
+    _expire: Callable[[Game, float], Any]
+    """Called with each game whose deadline passed, and the deadline."""
+
+    _watched: dict[Game, AbstractContextManager]
+    """The lock of each watched game."""
+
+    _heap: list[tuple[float, int, Game]]
+    """The (deadline, insertion order, game) of every scheduled deadline."""
+
+    _order: "itertools.count[int]"
+    """Breaks ties between equal deadlines, so that games are never compared."""
+
+    _condition: threading.Condition
+    """Guards the heap and the watched games, and wakes the background thread when an earlier deadline is scheduled."""
+
+    _thread: threading.Thread | None
+    """The background thread expiring deadlines, if started."""
+
+    _stopping: bool
+    """Whether the background thread was asked to stop."""
+
+    def __init__(self, expire: Callable[[Game, float], Any] | None = None) -> None:
+        """Create a scheduler without any games.
+
+        Args:
+            expire: Called with each game whose deadline passed and the deadline, as the
+                current time of `Game.expire_prompts` (which it defaults to).
+        """
+
+        self._expire = Game.expire_prompts if expire is None else expire
+        self._watched = dict()
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        """The number of scheduled deadlines (including ones of games that have moved on)."""
+        with self._condition:
+            return len(self._heap)
+
+    def watch(self, game: Game, lock: AbstractContextManager | None = None) -> Callable[[], None]:
+        """Schedule the prompt deadlines of a game from now on.
+
+        Args:
+            game: The game to watch (its configuration sets the deadlines).
+            lock: The lock that serializes changes to the game, such as a `threading.RLock`
+                (a new `threading.RLock` if not given).
+
+        Returns:
+            A function that stops watching the game; deadlines already scheduled are then skipped.
+        """
+
+        with self._condition:
+            self._watched[game] = threading.RLock() if lock is None else lock
+        self.schedule(game)
+        unsubscribe = game.hooks.subscribe(Hook.PHASE_CHANGED, self._phase_changed)
+
+        def unwatch() -> None:
+            unsubscribe()
+            with self._condition:
+                self._watched.pop(game, None)
+
+        return unwatch
+
+    def lock(self, game: Game) -> AbstractContextManager:
+        """The lock to hold while changing a watched game, such as when submitting responses.
+
+        Args:
+            game: The watched game.
+
+        Returns:
+            The lock, which the scheduler holds while expiring the game's prompts.
+
+        Raises:
+            KeyError: If the game is not watched.
+        """
+
+        with self._condition:
+            return self._watched[game]
+
+    def _phase_changed(self, game: Game, previous: GamePhase, phase: GamePhase) -> None:
+        """Schedule the deadline of the phase a watched game entered."""
+        self.schedule(game)
+
+    def schedule(self, game: Game) -> None:
+        """Schedule the deadline of the game's current prompts, if they have one.
+
+        Args:
+            game: The game.
+        """
+
+        deadline = game.prompt_deadline
+        if deadline is None:
+            return
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._order), game))
+            if self._heap[0][2] is game:
+                self._condition.notify()
+
+    def next_deadline(self) -> float | None:
+        """The earliest scheduled deadline, in `time.monotonic` seconds (None if there is none)."""
+        with self._condition:
+            return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self, now: float) -> list[tuple[Game, float]]:
+        """Remove the deadlines that have passed and are still current (the caller holds the lock)."""
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, game = heapq.heappop(self._heap)
+            if game in self._watched and game.prompt_deadline == deadline:
+                due.append((game, deadline))
+        return due
+
+    def _expire_due(self, game: Game, deadline: float) -> bool:
+        """Expire a game's prompts under its lock, unless it was unwatched or moved on in the meantime.
+
+        Returns:
+            Whether the prompts were expired (errors are logged).
+        """
+
+        with self._condition:
+            lock = self._watched.get(game)
+        if lock is None:
+            return False
+        with lock:
+            if game.prompt_deadline != deadline:
+                return False
+            try:
+                self._expire(game, deadline)
+            except Exception:
+                logger.exception("Failed to expire the prompts of a game at deadline %s", deadline)
+                return False
+        return True
+
+    def poll(self, now: float | None = None) -> list[Game]:
+        """Expire the prompts of every game whose deadline has passed.
+
+        Args:
+            now: The current `time.monotonic` time (read from the clock if not given).
+
+        Returns:
+            The games whose prompts expired.
+        """
+
+        with self._condition:
+            due = self._pop_due(time.monotonic() if now is None else now)
+        return [game for game, deadline in due if self._expire_due(game, deadline)]
+
+    def start(self) -> None:
+        """Expire deadlines in a background thread until `stop` is called."""
+
+        if self._thread is not None:
+            raise RuntimeError("The deadline scheduler is already running.")
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="prompt-deadlines", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and wait for it to finish."""
+
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """Sleep until the earliest deadline (or until an earlier one is scheduled), then expire it."""
+
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._condition.wait(self._heap[0][0] - now if self._heap else None)
+                if self._stopping:
+                    return
+                due = self._pop_due(time.monotonic())
+            for game, deadline in due:
+                self._expire_due(game, deadline)
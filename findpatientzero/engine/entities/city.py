@@ -1,7 +1,7 @@
 """Code related to the City entity, which represents a location in the game."""
 
-from dataclasses import dataclass, field
-from random import randint
+from dataclasses import dataclass, field, replace
+from random import Random, randint
 from findpatientzero.engine.entities.event import Event
 
 
@@ -127,32 +127,55 @@ class City:
         return True
 
     @staticmethod
-    def survey(current: CityState, advantage: bool) -> bool:
+    def survey(current: CityState, advantage: bool, rng: Random | None = None) -> bool:
         """Survey a city for infection.
 
         Args:
             current: The current state of the city.
             advantage: Whether the survey has advantage.
+            rng: The random number generator to roll with (defaults to the global one).
 
         Returns:
             True if the city is detected to be infected; False otherwise.
         """
 
+        roll = randint if rng is None else rng.randint
+
         # Roll a d100, twice if the survey has advantage
         for _ in range(1 + advantage):
 
             # If the roll is no greater than the threshold, the city is detected to be infected
             # (At stage 0, the threshold is 0, so the city is never detected to be infected.)
-            if randint(1, 100) <= City.SURVEY_THRESHOLDS[
+            if roll(1, 100) <= City.SURVEY_THRESHOLDS[
                 current.infection_stage
             ]:
                 return True
 
         return False
 
-    def add_state(self, state: CityState) -> None:
+    def fork(self) -> "City":
+        """Create an independent copy of the city for a forked game.
+
+        The committed history is shared by reference; only the current state is copied.
+
+        Returns:
+            The copy of the city.
+        """
+
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._history = self._history.copy()
+        if clone._history:
+            clone._history[-1] = replace(self.state, conditions=self.state.conditions.copy())
+        return clone
+
+    def add_state(self, state: CityState, keep_history: bool = True) -> None:
         """Add a new state to the city's history.
 
         Args:
-            state: The new state to add."""
-        self._history.append(state)
+            state: The new state to add.
+            keep_history: Whether to keep the previous states (otherwise the state replaces them)."""
+        if keep_history:
+            self._history.append(state)
+        else:
+            self._history[-1:] = [state]
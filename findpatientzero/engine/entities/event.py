@@ -76,11 +76,12 @@ class Event:
 
         return output
 
-def _get_events() -> dict[EventCategory, list[Event]]:
+def _get_event_frequencies() -> dict[EventCategory, list[tuple[Event, int]]]:
     """Load all events from the data files.
 
     Returns:
-        dict[EventCategory, list[Event]]: A dictionary of event categories and their respective event lists, including repeats based on frequency."""
+        dict[EventCategory, list[tuple[Event, int]]]: A dictionary of event categories and their respective events
+            with their frequencies, in the order of the data files."""
 
     # Load event types and conditions
     evt_types = {
@@ -93,7 +94,7 @@ def _get_events() -> dict[EventCategory, list[Event]]:
     }
 
     # Load events by category
-    events: dict[EventCategory, list[Event]] = dict()
+    events: dict[EventCategory, list[tuple[Event, int]]] = dict()
     for cat in EventCategory:
 
         # Skip the NONE category
@@ -141,13 +142,33 @@ def _get_events() -> dict[EventCategory, list[Event]]:
                 condition=event.get('condition'),
             )
 
-            # Add the event to the list, repeating based on frequency
-            events[cat].extend([new_event] * event['frequency'])
+            # Add the event to the list with its frequency
+            events[cat].append((new_event, event['frequency']))
 
     return events
 
 
-EVENTS = _get_events()
+def repeat_events(
+            frequencies: dict[EventCategory, list[tuple[Event, int]]]
+        ) -> dict[EventCategory, list[Event]]:
+    """Build event lists from events and their frequencies.
+
+    Args:
+        frequencies (dict[EventCategory, list[tuple[Event, int]]]): The events of each category with their frequencies.
+
+    Returns:
+        dict[EventCategory, list[Event]]: A dictionary of event categories and their respective event lists, including repeats based on frequency."""
+
+    return {
+        cat: [event for event, frequency in cat_events for _ in range(frequency)]
+        for cat, cat_events in frequencies.items()
+    }
+
+
+EVENT_FREQUENCIES = _get_event_frequencies()
+"""A dictionary of event categories and their respective events with their frequencies, in the order of the data files."""
+
+EVENTS = repeat_events(EVENT_FREQUENCIES)
 """A dictionary of event categories and their respective event lists, including repeats based on frequency."""
 
 NULL_EVENT = Event(
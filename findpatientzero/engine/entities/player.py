@@ -1,12 +1,13 @@
 """Player entity and related classes."""
 
 import random
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 from findpatientzero.engine.entities.city import City
 from findpatientzero.engine.entities.event import EVENTS, Event, EventCategory, NULL_EVENT
-from findpatientzero.gamedata.load import load_cpu_names
+from findpatientzero.engine.hooks import Hook, HookBus, Prompt
+from findpatientzero.engine.names import NamePool, cpu_names
 
 
 class InfectionState(Enum):
@@ -94,6 +95,12 @@ class Player:
     _city_prompt_response: City | None
     """The player's response to the city choice prompt."""
 
+    hooks: HookBus | None
+    """The hooks of the player's game, which are notified when the player answers a prompt."""
+
+    events: dict[EventCategory, list[Event]] = EVENTS
+    """The events the player can roll, including repeats based on frequency (set by games that override them)."""
+
     def __init__(self, name: str) -> None:
         """Initialize a player.
 
@@ -115,6 +122,7 @@ class Player:
 
         self._next_event = NULL_EVENT
         self._is_cpu = False
+        self.hooks = None
 
     def __str__(self) -> str:
         return self._name
@@ -248,10 +256,13 @@ class Player:
 
         return category
 
-    def roll_next_event(self) -> None:
-        """Roll the next event."""
-        # If an event has not been chosen yet, choose one at random
-        pool = EVENTS[self.next_event_category].copy()
+    def event_pool(self) -> list[Event]:
+        """The events the player can roll next.
+
+        Returns:
+            list[Event]: The events of the next event category, including repeats based on frequency."""
+
+        pool = self.events[self.next_event_category].copy()
 
         # Remove the last event from the pool to avoid repeats
         try:
@@ -260,14 +271,37 @@ class Player:
         except ValueError:
             pass
 
-        if self._roll_prompt_response is not None:
-            index = min((self._roll_prompt_response - 1) * len(pool) // 100, len(pool) - 1)
+        return pool
+
+    def roll_next_event(self, rng: random.Random | None = None) -> None:
+        """Roll the next event.
+
+        Args:
+            rng (random.Random | None): The random number generator to roll with (defaults to the global one).
+        """
+        # If an event has not been chosen yet, choose one at random
+        pool = self.event_pool()
+
+        roll = self._roll_prompt_response
+        if roll is None:
+            # Without a roll prompt, the player may still steer the roll
+            roll = self.choose_unprompted_roll()
+
+        if roll is not None:
+            index = min((roll - 1) * len(pool) // 100, len(pool) - 1)
             event = pool[index]
         else:
-            event = random.choice(pool)
+            event = (random if rng is None else rng).choice(pool)
 
         self._next_event = event
 
+    def choose_unprompted_roll(self) -> int | None:
+        """The roll the player chooses when events are rolled without a roll prompt (auto-roll games).
+
+        Returns:
+            int | None: A roll between 1 and 100, or None to roll at random."""
+        return None
+
     def can_move(self, dest: City) -> bool:
         """Whether the player can move to a given city.
 
@@ -363,13 +397,41 @@ class Player:
         self.state.health = InfectionState.ASYMPTOMATIC
         self.state.infected_round = 0
 
-    def add_state(self, state: PlayerState) -> None:
+    def fork(self, cities: dict[City, City], rng: random.Random) -> "Player":
+        """Create an independent copy of the player for a forked game.
+
+        The committed history is shared by reference; only the current state and pending
+        prompts are copied, with cities mapped to their copies in the fork.
+
+        Args:
+            cities (dict[City, City]): The cities of the original game mapped to their copies.
+            rng (random.Random): The random number generator of the forked game.
+
+        Returns:
+            Player: The copy of the player.
+        """
+
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._history = self._history.copy()
+        if clone._history:
+            state = self.state
+            clone._history[-1] = replace(state, city=cities.get(state.city) if state.city is not None else None)
+        if self._city_prompt_response is not None:
+            clone._city_prompt_response = cities[self._city_prompt_response]
+        return clone
+
+    def add_state(self, state: PlayerState, keep_history: bool = True) -> None:
         """Add a state to the player's history.
 
         Args:
             state (PlayerState): The state to add.
+            keep_history (bool): Whether to keep the previous states (otherwise the state replaces them).
         """
-        self._history.append(state)
+        if keep_history:
+            self._history.append(state)
+        else:
+            self._history[-1:] = [state]
 
     def reset(self) -> None:
         """Reset for the next round."""
@@ -378,9 +440,12 @@ class Player:
         self._roll_prompt_response = None
         self._city_prompt_response = None
 
-    def prompt_suspicious(self) -> None:
+    def prompt_suspicious(self, game_round: int | None = None) -> None:
         """Update flags indicating that the player has a pending Suspicious
-        event prompt."""
+        event prompt.
+
+        Args:
+            game_round (int | None): The current round (used by CPU players)."""
 
         self._sus_prompt_pending = True
 
@@ -392,6 +457,8 @@ class Player:
 
         self._sus_prompt_response = response
         self._sus_prompt_pending = False
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.SUSPICIOUS, response)
 
     def prompt_roll(self):
         """Update flags indicating that the player has a pending Roll."""
@@ -403,6 +470,8 @@ class Player:
 
         self._roll_prompt_pending = False
         self._roll_prompt_response = response
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.ROLL, response)
 
     def prompt_city_choice(self) -> None:
         """Update flags indicating that the player has a pending city choice
@@ -418,38 +487,146 @@ class Player:
 
         self._pending_city_prompt = False
         self._city_prompt_response = city
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.CITY_CHOICE, city)
 
     def kill(self) -> None:
         """Kill the player in the next resolve phase."""
         self.state.to_be_killed = True
 
+class CPUStrategy:
+    """Decision logic that can be attached to CPU players.
+
+    Each method may return None to let the CPU player fall back to its default decision, so
+    strategies only need to implement the decisions they care about."""
+
+    def choose_suspicious(self, player: "CPUPlayer", game_round: int | None) -> bool | None:
+        """Choose whether a governor rolls a Suspicious event.
+
+        Args:
+            player (CPUPlayer): The governor deciding.
+            game_round (int | None): The current round, if known.
+
+        Returns:
+            bool | None: Whether to roll, or None to always roll."""
+        return None
+
+    def choose_roll(self, player: "CPUPlayer") -> int | None:
+        """Choose the roll for the player's next event.
+
+        Args:
+            player (CPUPlayer): The player rolling.
+
+        Returns:
+            int | None: A roll between 1 and 100, or None to roll at random."""
+        return None
+
+    def choose_city(self, player: "CPUPlayer", options: list[City]) -> City | None:
+        """Choose the city the player moves to.
+
+        Args:
+            player (CPUPlayer): The player choosing.
+            options (list[City]): The cities the player can choose from.
+
+        Returns:
+            City | None: One of the options, or None to choose at random."""
+        return None
+
+
 class CPUPlayer(Player):
     """A player that is controlled by the game engine."""
 
-    names: list[str] = load_cpu_names()
-    """The list of available CPU player names."""
+    _rng: random.Random
+    """The random number generator the CPU player makes decisions with."""
+
+    strategy: CPUStrategy | None
+    """The decision logic of the CPU player as a traveler (decisions are random if None)."""
 
-    def __init__(self, cities: list[City]) -> None:
-        """Initialize a CPU player with a random name.
+    governor_strategy: CPUStrategy | None
+    """The decision logic of the CPU player as a governor (decisions are random if None)."""
+
+    def __init__(self, cities: list[City], rng: random.Random | None = None, name: str | None = None) -> None:
+        """Initialize a CPU player.
 
         Args:
             cities (list[City]): The list of cities in the game.
+            rng (random.Random | None): The random number generator of the game (defaults to a new one).
+            name (str | None): The name of the player (defaults to a random CPU name).
         """
 
-        index = random.randint(0, len(CPUPlayer.names) - 1)
-        super().__init__(CPUPlayer.names.pop(index))
+        self._rng = random.Random() if rng is None else rng
+        super().__init__(NamePool(cpu_names(), self._rng).draw() if name is None else name)
         self._cities = cities
         self._is_cpu = True
+        self.strategy = None
+        self.governor_strategy = None
+
+    def fork(self, cities: dict[City, City], rng: random.Random) -> "CPUPlayer":
+        """Create an independent copy of the CPU player for a forked game.
+
+        Args:
+            cities (dict[City, City]): The cities of the original game mapped to their copies.
+            rng (random.Random): The random number generator of the forked game.
+
+        Returns:
+            CPUPlayer: The copy of the player.
+        """
+
+        clone = super().fork(cities, rng)
+        clone._cities = list(cities.values())
+        clone._rng = rng
+        # Strategies are bound to the original game, so forks fall back to random decisions
+        clone.strategy = None
+        return clone
+
+    @property
+    def active_strategy(self) -> CPUStrategy | None:
+        """The decision logic for the CPU player's current role."""
+        return self.governor_strategy if self.is_governor else self.strategy
+
+    def prompt_suspicious(self, game_round: int | None = None) -> None:
+        """Automatically set the CPU player's response to the Suspicious event prompt.
+
+        Args:
+            game_round (int | None): The current round."""
+
+        strategy = self.active_strategy
+        choice = None if strategy is None else strategy.choose_suspicious(self, game_round)
+        self._sus_prompt_response = True if choice is None else choice
+        self._sus_prompt_pending = False
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.SUSPICIOUS, self._sus_prompt_response)
 
     def prompt_roll(self):
         """Automatically set the CPU player's response to the Roll event prompt."""
 
-        self._roll_prompt_response = random.randint(1, 100)
+        strategy = self.active_strategy
+        roll = None if strategy is None else strategy.choose_roll(self)
+        self._roll_prompt_response = self._rng.randint(1, 100) if roll is None else roll
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.ROLL, self._roll_prompt_response)
+
+    def choose_unprompted_roll(self) -> int | None:
+        """The roll the CPU player's governor strategy chooses in auto-roll games.
+
+        Travelers roll at random: auto-roll games leave their dice to chance, while governor
+        policies steer the Epidemic events of alerted cities in every game.
+
+        Returns:
+            int | None: A roll between 1 and 100, or None to roll at random."""
+
+        if not self.is_governor or self.governor_strategy is None:
+            return None
+        return self.governor_strategy.choose_roll(self)
 
     def prompt_city_choice(self) -> None:
         """Automatically set the CPU player's response to the city choice prompt."""
 
-        self._city_prompt_response = random.choice(self.city_options(self._cities))
+        options = self.city_options(self._cities)
+        city = None if self.strategy is None else self.strategy.choose_city(self, options)
+        self._city_prompt_response = self._rng.choice(options) if city is None else city
+        if self.hooks is not None and self.hooks.active:
+            self.hooks.publish(Hook.PROMPT_ANSWERED, self, Prompt.CITY_CHOICE, self._city_prompt_response)
 
     def __str__(self) -> str:
         return f"{self._name} (AI)"
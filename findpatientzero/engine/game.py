@@ -1,11 +1,16 @@
 """The game module contains the overarching Game class and related classes/functions."""
 
 import random
+import secrets
+import sys
+import time
+from collections.abc import Mapping
 from dataclasses import dataclass, replace
 from enum import Enum
 
+from findpatientzero.engine.contacts import ContactIndex
 from findpatientzero.engine.entities.city import City, CityState
-from findpatientzero.engine.entities.event import NULL_EVENT
+from findpatientzero.engine.entities.event import NULL_EVENT, Event, EventCategory
 from findpatientzero.engine.entities.player import (
     CPUPlayer,
     InfectionState,
@@ -13,6 +18,12 @@ from findpatientzero.engine.entities.player import (
     PlayerRole,
     PlayerState,
 )
+from findpatientzero.engine.governor import GovernorPolicy
+from findpatientzero.engine.hooks import Hook, HookBus, Prompt
+from findpatientzero.engine.metrics import EpidemicMetrics
+from findpatientzero.engine.names import NamePool, cpu_names
+from findpatientzero.engine.registry import PlayerRegistry
+from findpatientzero.engine.transitions import INFECTED_STATES, ROLLS, HealthTransitions
 
 
 @dataclass
@@ -37,11 +48,40 @@ class GameConfig:
     survey_threshold: int = 3
     """The threshold for automatic surveying a city for infections."""
 
+    cpu_governors: bool = False
+    """Whether dead CPU players can become governors (using the compiled governor policy)."""
+
+    collect_metrics: bool = False
+    """Whether to collect epidemic metrics as the game is played (see `Game.metrics`)."""
+
+    track_contacts: bool = False
+    """Whether to index which travelers shared a city and when, as the game is played (see `Game.contacts`)."""
+
+    keep_history: bool = True
+    """Whether to keep every committed state, or only the latest one (of the game and of each player and city)."""
+
+    health_transitions: HealthTransitions | None = None
+    """How infected travelers progress (defaults to the table in the game data)."""
+
+    events: dict[EventCategory, list[Event]] | None = None
+    """The events players roll, including repeats based on frequency (defaults to the events in the game data)."""
+
+    sus_prompt_deadline: float | None = None
+    """Seconds governors have to answer Suspicious event prompts (no deadline if None)."""
+
+    roll_prompt_deadline: float | None = None
+    """Seconds players have to input their dice rolls (no deadline if None)."""
+
+    city_prompt_deadline: float | None = None
+    """Seconds travelers have to choose a city (no deadline if None)."""
+
     def __post_init__(self):
         assert self.num_players >= 2
         assert self.num_cities >= 2
         assert self.suspicious_cooldown >= 0
         assert self.lockdown_duration >= 0
+        for deadline in (self.sus_prompt_deadline, self.roll_prompt_deadline, self.city_prompt_deadline):
+            assert deadline is None or deadline >= 0
 
 
 @dataclass
@@ -73,20 +113,66 @@ class GamePhase(Enum):
     ERROR = "An error occurred"
 
 
+class ResponseError(ValueError):
+    """Raised when a batch of prompt responses is rejected (none of them are applied)."""
+
+    errors: dict[int, str]
+    """What is wrong with the response of each rejected player, by player ID."""
+
+    def __init__(self, errors: dict[int, str]) -> None:
+        self.errors = errors
+        super().__init__("Invalid responses: " + "; ".join(
+            f"player {player_id}: {error}" for player_id, error in errors.items()
+        ))
+
+
 class Game:
-    """The main control class for a game of Find Patient Zero."""
+    """The main control class for a game of Find Patient Zero.
+
+    All mutable state (including the random number generator) belongs to a single game, so
+    separate games can be played concurrently in threads. The game data they share is
+    immutable, and the caches it is loaded into are guarded by locks. A single game is not
+    thread-safe and must only be used by one thread at a time.
+    """
 
     config: GameConfig
     """The configuration of the game."""
 
-    _players: list[Player]
-    """The list of players in the game."""
+    _players: tuple[Player, ...]
+    """The players in the game, in game order (their positions are their IDs)."""
+
+    _cities: tuple[City, ...]
+    """The cities in the game, in game order (their positions are their IDs)."""
+
+    _player_ids: dict[Player, int]
+    """The ID of each player."""
+
+    _player_names: dict[str, Player]
+    """The first player with each (case-folded) name."""
+
+    _city_ids: dict[City, int]
+    """The ID of each city."""
 
-    _cities: list[City]
-    """The list of cities in the game."""
+    _city_names: dict[str, City]
+    """The first city with each (case-folded) name."""
+
+    _registry: PlayerRegistry
+    """The players of the game, partitioned by role."""
 
     _history: list[GameState]
-    """The history of the game's states."""
+    """The history of the game's states (only the latest one if `config.keep_history` is False)."""
+
+    _transitions: HealthTransitions
+    """How infected travelers progress."""
+
+    metrics: EpidemicMetrics | None
+    """The epidemic metrics of the game, if `config.collect_metrics` is True."""
+
+    contacts: ContactIndex | None
+    """The co-location index of the game, if `config.track_contacts` is True."""
+
+    hooks: HookBus
+    """The subscribers notified of what happens in the game (see `Hook`)."""
 
     _round: int
     """The current round number of the game."""
@@ -97,49 +183,179 @@ class Game:
     _prompts_pending: bool
     """If any players have pending prompts"""
 
+    _deadlines: dict["GamePhase", float]
+    """The seconds players have to answer the prompts of each phase with a deadline."""
+
+    prompt_deadline: float | None
+    """When the prompts of the current phase expire (in `time.monotonic` seconds), if they have a deadline."""
+
     _patient_zero: Player
     """The player who is patient zero of the epidemic."""
 
     patient_zero_suspect: Player | None
     """The player who is suspected of being patient zero of the epidemic."""
 
-    def __init__(self, config: GameConfig, player_names: list[str], city_names: list[str]):
+    _seed: int
+    """The seed of the game's random number generator."""
+
+    _rng: random.Random
+    """The random number generator used for every roll in the game."""
+
+    _forks: int
+    """The number of forks created from this game."""
+
+    def __init__(
+                self,
+                config: GameConfig,
+                player_names: list[str],
+                city_names: list[str],
+                seed: int | None = None,
+            ):
         """Initialize a new game with the given configuration and player names.
 
         Args:
             config: The configuration of the game.
             player_names: The names of the players in the game.
             city_names: The names of the cities in the game.
+            seed: The seed for the game's random number generator (random if not given).
         """
 
         self.config = config
-        self._cities = [City(name) for name in city_names]
-        self._players = [Player(name) for name in player_names]
-        self._players += [
-            CPUPlayer(self._cities) for _ in range(config.num_players - len(player_names))
-        ]
+        self._seed = secrets.randbits(64) if seed is None else seed
+        self._rng = random.Random(self._seed)
+        self._forks = 0
+        self._cities = tuple(City(name) for name in city_names)
+        cpu_name_pool = NamePool(cpu_names(), self._rng, taken=player_names)
+        cpu_cities = list(self._cities)
+        self._players = tuple(Player(name) for name in player_names) + tuple(
+            CPUPlayer(cpu_cities, self._rng, cpu_name_pool.draw())
+            for _ in range(config.num_players - len(player_names))
+        )
+        self._index_members()
+        self.hooks = HookBus(self)
+        for player in self._players:
+            player.hooks = self.hooks
+            if config.events is not None:
+                player.events = config.events
+        if config.cpu_governors:
+            policy = GovernorPolicy.default()
+            if config.events is not None:
+                policy = policy.with_events(config.events[EventCategory.CITY_EPIDEMIC])
+            for player in self._players:
+                if isinstance(player, CPUPlayer):
+                    player.governor_strategy = policy
+        self._transitions = config.health_transitions or HealthTransitions.default()
         self._history = []
+        self.metrics = EpidemicMetrics() if config.collect_metrics else None
+        self.contacts = ContactIndex() if config.track_contacts else None
         self._round = 0
         self._prompts_pending = False
+        self._deadlines = {
+            phase: deadline
+            for phase, deadline in (
+                (GamePhase.SUS_PROMPTS, config.sus_prompt_deadline),
+                (GamePhase.ROLL_DICE, config.roll_prompt_deadline),
+                (GamePhase.CITY_PROMPTS, config.city_prompt_deadline),
+            )
+            if deadline is not None
+        }
+        self.prompt_deadline = None
         self.patient_zero_suspect = None
 
         self.game_start()
 
     @property
-    def players(self) -> list[Player]:
-        """The list of players in the game."""
-        return self._players.copy()
+    def players(self) -> tuple[Player, ...]:
+        """The players in the game, in game order (a read-only view that is not copied)."""
+        return self._players
 
     @property
-    def cities(self) -> list[City]:
-        """The list of cities in the game."""
-        return self._cities.copy()
+    def cities(self) -> tuple[City, ...]:
+        """The cities in the game, in game order (a read-only view that is not copied)."""
+        return self._cities
+
+    def _index_members(self) -> None:
+        """Index the players and cities by ID and by name."""
+
+        self._player_ids = {player: index for index, player in enumerate(self._players)}
+        self._city_ids = {city: index for index, city in enumerate(self._cities)}
+        self._player_names = dict()
+        for player in self._players:
+            self._player_names.setdefault(player.name.casefold(), player)
+        self._city_names = dict()
+        for city in self._cities:
+            self._city_names.setdefault(city.name.casefold(), city)
+
+    def get_player(self, key: int | str) -> Player | None:
+        """Look up a player by ID or by name.
+
+        Args:
+            key: The ID of the player (their position in `players`), or their name (case-insensitive).
+
+        Returns:
+            The player, or None if there is no such player.
+        """
+
+        if isinstance(key, str):
+            return self._player_names.get(key.casefold())
+        return self._players[key] if 0 <= key < len(self._players) else None
+
+    def get_city(self, key: int | str) -> City | None:
+        """Look up a city by ID or by name.
+
+        Args:
+            key: The ID of the city (its position in `cities`), or its name (case-insensitive).
+
+        Returns:
+            The city, or None if there is no such city.
+        """
+
+        if isinstance(key, str):
+            return self._city_names.get(key.casefold())
+        return self._cities[key] if 0 <= key < len(self._cities) else None
+
+    def player_id(self, player: Player) -> int:
+        """The ID of a player (their position in `players`).
+
+        Args:
+            player: The player.
+
+        Returns:
+            The ID of the player.
+        """
+        return self._player_ids[player]
+
+    def city_id(self, city: City) -> int:
+        """The ID of a city (its position in `cities`).
+
+        Args:
+            city: The city.
+
+        Returns:
+            The ID of the city.
+        """
+        return self._city_ids[city]
 
     @property
     def patient_zero(self) -> Player:
         """The player who is patient zero of the epidemic."""
         return self._patient_zero
 
+    @property
+    def seed(self) -> int:
+        """The seed of the game's random number generator."""
+        return self._seed
+
+    @property
+    def health_transitions(self) -> HealthTransitions:
+        """The health transition table the game's travelers progress by."""
+        return self._transitions
+
+    @property
+    def last_state(self) -> GameState:
+        """The most recently committed state of the game."""
+        return self._history[-1]
+
     @property
     def round(self) -> int:
         """The current round number of the game."""
@@ -168,8 +384,9 @@ class Game:
     @property
     def all_dead_or_immune(self) -> bool:
         """If all players are dead or immune."""
+        # Players who are not travelers anymore have died
         return all(player.state.health == InfectionState.IMMUNE or player.state.health == InfectionState.DEAD
-                   for player in self._players)
+                   for player in self._registry.travelers)
 
     @property
     def suspect_is_patient_zero(self) -> bool:
@@ -194,29 +411,28 @@ class Game:
         if self._phase == GamePhase.SUS_PROMPTS:
             return all(
                 not player.sus_prompt_pending
-                for player in self._players
-                if player.is_governor
+                for player in self._registry.governors.values()
             )
 
         if self._phase == GamePhase.ROLL_DICE:
             return all(
                 isinstance(player.roll_prompt_response, int)
                 and 1 <= player.roll_prompt_response <= 100
-                for player in self._players
-                if player.is_traveler
+                for player in self._registry.travelers
             )
 
         if self._phase == GamePhase.ROLL_EVENTS:
+            # Players who are not travelers anymore have died
             return all(
                 player.state.health == InfectionState.DEAD or player.next_event is not NULL_EVENT
-                for player in self._players
+                for player in self._registry.travelers
             )
 
         if self._phase == GamePhase.CITY_PROMPTS:
             return all(
                 isinstance(player.city_prompt_response, City)
-                for player in self._players
-                if player.is_traveler and player.next_event_choice
+                for player in self._registry.travelers
+                if player.next_event_choice
             )
 
         if self._phase == GamePhase.GUESS_PATIENT_ZERO:
@@ -240,27 +456,199 @@ class Game:
         city_choices = list()
         for player in self._players:
             if len(city_choices) == 0:
-                city_choices = random.sample(self._cities, len(self._cities))
+                city_choices = self._rng.sample(self._cities, len(self._cities))
             city = city_choices.pop()
             player.add_state(PlayerState(city=city))
 
         # Pick a random player to be patient zero and infect them
-        self._patient_zero = random.choice(self._players)
+        self._patient_zero = self._rng.choice(self._players)
         self._patient_zero.infect_patient_zero()
 
         # Initialize city states
         for city in self._cities:
             city.add_state(CityState())
+        self._registry = PlayerRegistry(self._players)
 
         # Commit initial states to history
-        self._history.append(
+        self._commit(
             GameState(
                 round=self._round,
                 players={player: player.state for player in self._players},
                 cities={city: city.state for city in self._cities},
-            )
+            ),
+            dict(),
         )
 
+    def _commit(self, state: GameState, previous: dict[Player, PlayerState]) -> None:
+        """Commit a game state to history and update the metrics and contact index.
+
+        Args:
+            state: The state to commit.
+            previous: The previous states of the players whose state changed.
+        """
+
+        if self.config.keep_history:
+            self._history.append(state)
+        else:
+            self._history[-1:] = [state]
+        if self.metrics is not None:
+            self.metrics.record(state.round, previous, state.players, state.cities)
+        if self.contacts is not None:
+            self.contacts.record(state.round, state.players, state.cities)
+
+    def fork(self, seed: int | None = None) -> "Game":
+        """Create an independent copy of the game to explore alternative outcomes.
+
+        Forking is cheap: committed states are immutable, so the fork shares them with this
+        game and only copies the current state of each player and city. States committed
+        before the fork keep referring to this game's players and cities; states committed
+        afterwards refer to the fork's own copies, which are listed in the same order.
+        The fork starts without hook subscribers.
+
+        Args:
+            seed: The seed for the fork's random number generator. If not given, one is derived
+                from this game's seed without advancing this game's random number generator.
+
+        Returns:
+            The forked game.
+        """
+
+        if seed is None:
+            seed = random.Random(f"{self._seed}/{self._forks}").getrandbits(64)
+        self._forks += 1
+
+        fork = object.__new__(Game)
+        fork.__dict__.update(self.__dict__)
+        fork._seed = seed
+        fork._rng = random.Random(seed)
+        fork._forks = 0
+
+        cities = {city: city.fork() for city in self._cities}
+        players = {player: player.fork(cities, fork._rng) for player in self._players}
+        fork._cities = tuple(cities.values())
+        fork._players = tuple(players.values())
+        fork._index_members()
+        fork._registry = PlayerRegistry(fork._players)
+        fork.hooks = HookBus(fork)
+        for player in fork._players:
+            player.hooks = fork.hooks
+        fork._history = self._history.copy()
+        if self.metrics is not None:
+            fork.metrics = self.metrics.copy()
+        if self.contacts is not None:
+            fork.contacts = self.contacts.copy(players, cities)
+        fork._patient_zero = players[self._patient_zero]
+        if self.patient_zero_suspect is not None:
+            fork.patient_zero_suspect = players[self.patient_zero_suspect]
+
+        return fork
+
+    def answer_pending_prompts(self) -> None:
+        """Answer every outstanding prompt of the current phase the way a CPU player would.
+
+        Governors always roll a Suspicious event, rolls are random and city choices are
+        picked at random from the player's options.
+        """
+
+        if self._phase == GamePhase.SUS_PROMPTS:
+            for player in self._registry.governors.values():
+                if player.sus_prompt_pending:
+                    player.respond_suspicious(True)
+
+        elif self._phase == GamePhase.ROLL_DICE:
+            for player in self._registry.active:
+                if (player.is_traveler or player.roll_prompt_pending) and player.roll_prompt_response is None:
+                    player.respond_roll(self._rng.randint(1, 100))
+
+        elif self._phase == GamePhase.CITY_PROMPTS:
+            for player in self._registry.travelers:
+                if player.next_event_choice and player.city_prompt_response is None:
+                    player.respond_city_choice(self._rng.choice(player.city_options(self._cities)))
+
+    def submit_responses(self, responses: Mapping[int, bool | int | City], advance: bool = True) -> bool:
+        """Answer prompts of the current phase for several players at once.
+
+        Every response is validated before any is applied, so either all of them are
+        recorded or none are. If the phase is then complete, the game moves to the next
+        phase in the same call.
+
+        Args:
+            responses: The response of each player, by player ID: a bool in SUS_PROMPTS, a
+                roll from 1 to 100 in ROLL_DICE, and a City or city ID in CITY_PROMPTS.
+            advance: Whether to move to the next phase once every prompt is answered.
+
+        Returns:
+            True if the game moved to the next phase.
+
+        Raises:
+            RuntimeError: If the current phase has no prompts.
+            ResponseError: If any response is invalid (listing every invalid response).
+        """
+
+        if self._phase not in (GamePhase.SUS_PROMPTS, GamePhase.ROLL_DICE, GamePhase.CITY_PROMPTS):
+            raise RuntimeError(f"Cannot submit responses: phase '{self._phase.name}' has no prompts.")
+
+        errors = dict()
+        answers = []
+        for player_id, response in responses.items():
+            player = self.get_player(player_id) if isinstance(player_id, int) else None
+            if player is None:
+                errors[player_id] = "no such player"
+
+            elif self._phase == GamePhase.SUS_PROMPTS:
+                if not player.sus_prompt_pending:
+                    errors[player_id] = "no pending Suspicious event prompt"
+                elif not isinstance(response, bool):
+                    errors[player_id] = f"expected yes or no, got {response!r}"
+                else:
+                    answers.append((player.respond_suspicious, response))
+
+            elif self._phase == GamePhase.ROLL_DICE:
+                if not player.roll_prompt_pending:
+                    errors[player_id] = "no pending roll prompt"
+                elif isinstance(response, bool) or not isinstance(response, int) or not 1 <= response <= ROLLS:
+                    errors[player_id] = f"expected a roll from 1 to {ROLLS}, got {response!r}"
+                else:
+                    answers.append((player.respond_roll, response))
+
+            else:
+                city = self.get_city(response) if isinstance(response, int) and not isinstance(response, bool) else response
+                if not player.pending_city_prompt:
+                    errors[player_id] = "no pending city choice prompt"
+                elif not isinstance(city, City) or city not in player.city_options(self._cities):
+                    errors[player_id] = f"{response!r} is not one of the player's city options"
+                else:
+                    answers.append((player.respond_city_choice, city))
+
+        if errors:
+            raise ResponseError(errors)
+        for respond, response in answers:
+            respond(response)
+
+        if advance and self.phase_complete:
+            return self.go_to_next_phase()
+        return False
+
+    def expire_prompts(self, now: float | None = None) -> bool:
+        """Answer the prompts of the current phase the way a CPU player would once their deadline has passed.
+
+        Prompts that are still pending are answered by `answer_pending_prompts` and the game
+        moves to the next phase, so an idle player cannot stall the game.
+
+        Args:
+            now: The current `time.monotonic` time (read from the clock if not given).
+
+        Returns:
+            True if the deadline had passed and the game moved to the next phase.
+        """
+
+        if self.prompt_deadline is None:
+            return False
+        if (time.monotonic() if now is None else now) < self.prompt_deadline:
+            return False
+        self.answer_pending_prompts()
+        return self.go_to_next_phase()
+
     def get_governor(self, city: City) -> Player | None:
         """Get the governor of a city, if one exists.
 
@@ -271,10 +659,7 @@ class Game:
             The governor of the city, or None if there is no governor.
         """
 
-        for player in self._players:
-            if player.city == city and player.is_governor:
-                return player
-        return None
+        return self._registry.governors.get(city)
 
     def go_to_next_phase(self) -> bool:
         """
@@ -288,55 +673,144 @@ class Game:
             raise RuntimeError(f"Cannot advance phase: phase '{self._phase.name}' is not complete.")
 
         if self._phase == GamePhase.GAME_START:
-            self._phase = GamePhase.ROUND_START
             self.round_start()
+            self._enter_phase(GamePhase.ROUND_START)
 
         elif self._phase == GamePhase.ROUND_START:
-            self._phase = GamePhase.SUS_PROMPTS
+            self._enter_phase(GamePhase.SUS_PROMPTS)
             self.sus_prompts()
 
         elif self._phase == GamePhase.SUS_PROMPTS:
             self._prompts_pending = False
             if self.config.auto_roll:
-                self._phase = GamePhase.ROLL_EVENTS
+                self._enter_phase(GamePhase.ROLL_EVENTS)
                 self.roll_events()
             else:
-                self._phase = GamePhase.ROLL_DICE
+                self._enter_phase(GamePhase.ROLL_DICE)
                 self.roll_prompts()
 
         elif self._phase == GamePhase.ROLL_DICE:
             self._prompts_pending = False
-            self._phase = GamePhase.ROLL_EVENTS
+            self._enter_phase(GamePhase.ROLL_EVENTS)
             self.roll_events()
 
         elif self._phase == GamePhase.ROLL_EVENTS:
-            self._phase = GamePhase.CITY_PROMPTS
+            self._enter_phase(GamePhase.CITY_PROMPTS)
             self.city_prompts()
 
         elif self._phase == GamePhase.CITY_PROMPTS:
             self._prompts_pending = False
-            self._phase = GamePhase.GUESS_PATIENT_ZERO
+            self._enter_phase(GamePhase.GUESS_PATIENT_ZERO)
 
         elif self._phase == GamePhase.GUESS_PATIENT_ZERO:
             if not self.suspect_is_patient_zero and self.patient_zero_suspect is not None:
                 self.patient_zero_suspect.kill()
-            self._phase = GamePhase.RESOLVE_MOVES
+            self._enter_phase(GamePhase.RESOLVE_MOVES)
 
         elif self._phase == GamePhase.RESOLVE_MOVES:
             self.resolve_moves()
             if self.game_over:
-                self._phase = GamePhase.GAME_OVER
+                self._enter_phase(GamePhase.GAME_OVER)
             else:
                 self.patient_zero_suspect = None
-                self._phase = GamePhase.ROUND_START
                 self.round_start()
+                self._enter_phase(GamePhase.ROUND_START)
 
         else:
-            self._phase = GamePhase.ERROR
+            self._enter_phase(GamePhase.ERROR)
             return False
 
         return True
 
+    def run_rounds(self, rounds: int) -> int:
+        """Play an all-CPU game forward by a number of rounds.
+
+        Instead of walking every phase with go_to_next_phase, each round is resolved in one
+        pass: CPU players answer their prompts as soon as they are issued, so the prompt
+        phases need no completion checks, and phases without any work are skipped. The
+        outcome is the same as stepping phase by phase.
+
+        Args:
+            rounds: The number of rounds to play.
+
+        Returns:
+            The number of rounds that were played (fewer if the game ended).
+        """
+
+        self._finish_round()
+        played = 0
+        while played < rounds and self._phase == GamePhase.ROUND_START:
+            self._run_round()
+            played += 1
+
+        return played
+
+    def run_to_end(self, max_round: int | None = None) -> int:
+        """Play an all-CPU game until it is over.
+
+        Args:
+            max_round: Stop at the start of this round if the game is not over by then
+                (games where nobody catches the infection can go on forever).
+
+        Returns:
+            The number of rounds that were played.
+        """
+
+        self._finish_round()
+        return self.run_rounds(sys.maxsize if max_round is None else max(0, max_round - self._round))
+
+    def _finish_round(self) -> None:
+        """Step an all-CPU game phase by phase to the start of the next round (or the end of the game)."""
+
+        if not all(player.is_cpu for player in self._players):
+            raise RuntimeError("Cannot fast-forward a game with human players.")
+
+        while self._phase not in (GamePhase.ROUND_START, GamePhase.GAME_OVER):
+            self.go_to_next_phase()
+
+    def _run_round(self) -> None:
+        """Resolve a round of an all-CPU game, from ROUND_START to the next ROUND_START (or GAME_OVER)."""
+
+        # CPU players answer prompts as soon as they are issued
+        self._enter_phase(GamePhase.SUS_PROMPTS)
+        self.sus_prompts()
+        if not self.config.auto_roll:
+            self._enter_phase(GamePhase.ROLL_DICE)
+            self.roll_prompts()
+        self._enter_phase(GamePhase.ROLL_EVENTS)
+        self.roll_events()
+        self._enter_phase(GamePhase.CITY_PROMPTS)
+        self.city_prompts()
+        self._prompts_pending = False
+
+        self._enter_phase(GamePhase.GUESS_PATIENT_ZERO)
+        if not self.suspect_is_patient_zero and self.patient_zero_suspect is not None:
+            self.patient_zero_suspect.kill()
+
+        self._enter_phase(GamePhase.RESOLVE_MOVES)
+        self.resolve_moves()
+        if self.game_over:
+            self._enter_phase(GamePhase.GAME_OVER)
+        else:
+            self.patient_zero_suspect = None
+            self.round_start()
+            self._enter_phase(GamePhase.ROUND_START)
+
+    def _enter_phase(self, phase: GamePhase) -> None:
+        """Move the game to a phase, start the deadline of its prompts and notify the PHASE_CHANGED subscribers.
+
+        Args:
+            phase: The phase to enter.
+        """
+
+        previous = self._phase
+        self._phase = phase
+        if self._deadlines:
+            deadline = self._deadlines.get(phase)
+            self.prompt_deadline = None if deadline is None else time.monotonic() + deadline
+        if self.hooks.active:
+            self.hooks.publish(Hook.PHASE_CHANGED, previous, phase)
+
     def round_start(self) -> None:
         """Carry out the setup phase of a new round."""
 
@@ -345,42 +819,51 @@ class Game:
     def sus_prompts(self) -> None:
         """Prompt governors to roll a Suspicious event."""
 
+        governors = self._registry.governors
+        if not governors:
+            return
+
+        hooks = self.hooks
         for city in self._cities:
-            if city.can_roll_suspicious(
+            governor = governors.get(city)
+            if governor is not None and city.can_roll_suspicious(
                 self._round, self.config.suspicious_cooldown
             ):
-                governor = self.get_governor(city)
-                if governor is not None:
-                    self._prompts_pending = True
-                    governor.prompt_suspicious()
+                self._prompts_pending = True
+                if hooks.active:
+                    hooks.publish(Hook.PROMPT_ISSUED, governor, Prompt.SUSPICIOUS)
+                governor.prompt_suspicious(self._round)
 
     def roll_prompts(self):
         """Prompt players to input dice rolls """
 
-        for player in self._players:
-            if player.is_traveler:
-                self._prompts_pending = True
-                player.prompt_roll()
-            elif player.is_governor and (player.sus_prompt_response or player.city.alerted):
+        hooks = self.hooks
+        for player in self._registry.active:
+            if player.is_traveler or (player.is_governor and (player.sus_prompt_response or player.city.alerted)):
                 self._prompts_pending = True
+                if hooks.active:
+                    hooks.publish(Hook.PROMPT_ISSUED, player, Prompt.ROLL)
                 player.prompt_roll()
 
     def roll_events(self) -> None:
         """Roll events for all players."""
 
-        for player in self._players:
-            if player.is_traveler:
-                player.roll_next_event()
-            elif player.is_governor:
-                if player.sus_prompt_response or player.city.alerted:
-                    player.roll_next_event()
+        hooks = self.hooks
+        for player in self._registry.active:
+            if player.is_traveler or (player.is_governor and (player.sus_prompt_response or player.city.alerted)):
+                player.roll_next_event(self._rng)
+                if hooks.active:
+                    hooks.publish(Hook.EVENT_ROLLED, player, player.next_event)
 
     def city_prompts(self) -> None:
         """Prompt players to choose what city to move to."""
 
-        for player in self._players:
-            if player.next_event_choice and not player.is_observer:
+        hooks = self.hooks
+        for player in self._registry.active:
+            if player.next_event_choice:
                 self._prompts_pending = True
+                if hooks.active:
+                    hooks.publish(Hook.PROMPT_ISSUED, player, Prompt.CITY_CHOICE)
                 player.prompt_city_choice()
 
     def update_city_state(self, city: City, state: CityState) -> CityState:
@@ -423,7 +906,7 @@ class Game:
                 new.infection_pause = new.event.amount
             elif new.event.action.startswith("survey") and new.alerted == False:
                 new.alerted = City.survey(
-                    state, new.event.action.endswith("adv")
+                    state, new.event.action.endswith("adv"), self._rng
                 )
             elif new.event.action == "rollback":
                 new.infection_stage = max(
@@ -447,7 +930,7 @@ class Game:
                 and not new.alerted
                 and city.can_roll_suspicious(self._round, self.config.suspicious_cooldown)
             ):
-                new.alerted = City.survey(state, False)
+                new.alerted = City.survey(state, False, self._rng)
                 new.last_sus_roll = self.round
 
         return new
@@ -457,6 +940,7 @@ class Game:
                 current_player: PlayerState,
                 dest: City,
                 dest_state: CityState,
+                roll: int | None = None,
             ) -> tuple[PlayerState, CityState]:
         """
         Determine the next state of a player and the city they are moving to.
@@ -465,6 +949,7 @@ class Game:
             current_player: The current state of the player.
             dest: The city the player is moving to.
             dest_state: The next state of the destination city.
+            roll: The player's health roll, if they are infected (rolled now if not given).
 
         Returns:
             A tuple containing the next state of the player and the city.
@@ -487,26 +972,15 @@ class Game:
             ):
                 new.health = InfectionState.ASYMPTOMATIC
                 new.infected_round = self._round
-            elif current_player.health in (InfectionState.ASYMPTOMATIC, InfectionState.SYMPTOMATIC):
+            elif current_player.health in INFECTED_STATES:
                 assert current_player.infected_round is not None
-                roll = random.randint(1, 100)
-                if self._round - current_player.infected_round <= 4:
-                    if roll > 50 and dest_state.infection_stage == 0:
-                        dest_state.infection_stage += 1
-                elif self._round - current_player.infected_round <= 9:
-                    if dest_state.infection_stage == 0:
-                        dest_state.infection_stage += 1
-                    if 40 < roll <= 87:
-                        new.health = InfectionState.SYMPTOMATIC
-                    elif roll > 87:
-                        new.health = InfectionState.DEAD
-                else:
-                    if dest_state.infection_stage == 0:
-                        dest_state.infection_stage += 1
-                    if roll <= 50:
-                        new.health = InfectionState.IMMUNE
-                    else:
-                        new.health = InfectionState.DEAD
+                if roll is None:
+                    roll = self._rng.randint(1, ROLLS)
+                new.health, spread = self._transitions.apply(
+                    current_player.health, self._round - current_player.infected_round, roll
+                )
+                if spread and dest_state.infection_stage == 0:
+                    dest_state.infection_stage += 1
 
         return new, dest_state
 
@@ -526,15 +1000,12 @@ class Game:
             A pair of dictionaries containing the updated states of the players and cities.
         """
 
-        open_cities = list(cities.keys())
-        for player in self._players:
-            if player.is_governor:
-                assert player.city is not None
-                open_cities.remove(player.city)
+        governors = self._registry.governors
+        open_cities = [city for city in cities if city not in governors]
 
         for player, state in dead_players.items():
-            #CPU players should never be governors, city resolve method handles automatic City logic.
-            if len(open_cities) == 0 or player.is_cpu:
+            #CPU players are only governors if enabled, otherwise city resolve method handles automatic City logic.
+            if len(open_cities) == 0 or (player.is_cpu and not self.config.cpu_governors):
                 state.role = PlayerRole.OBSERVER
                 state.city = None
                 continue
@@ -556,17 +1027,24 @@ class Game:
             ) for city in self._cities
         }
 
-        # Update player states
+        # Roll for every infected traveler at once (in player order), then update player states
+        travelers = self._registry.travelers
+        active = self._registry.active
+        randint = self._rng.randint
+        rolls = iter([
+            randint(1, ROLLS)
+            for player in travelers
+            if player.state.health in INFECTED_STATES and not player.state.to_be_killed
+        ])
         new_player_states = dict()
-        for player in self._players:
-            if not player.is_traveler:
-                continue
-
+        for player in travelers:
+            state = player.state
             dest = player.city_move_destination(self._cities)
             assert dest is not None
+            roll = next(rolls) if state.health in INFECTED_STATES and not state.to_be_killed else None
             new_player_states[player], new_city_states[dest] = \
                 self.update_player_state(
-                    player.state, dest, new_city_states[dest]
+                    state, dest, new_city_states[dest], roll
                 )
 
         # Reassign dead players to new roles
@@ -581,17 +1059,60 @@ class Game:
         new_player_states.update(dead_players)
 
         # Commit changes to history
-        self._history.append(
-            GameState(
-                round=self._round,
-                players=new_player_states,
-                cities=new_city_states,
-            )
+        keep_history = self.config.keep_history
+        hooks_active = self.hooks.active
+        previous = (
+            {player: player.state for player in new_player_states}
+            if self.metrics is not None or hooks_active
+            else dict()
         )
+        previous_cities = {city: city.state for city in new_city_states} if hooks_active else dict()
+        governors = self._registry.governors
         for player, state in new_player_states.items():
             state.event = player.next_event
-            player.add_state(state)
-        for player in self._players:
+            player.add_state(state, keep_history)
+        for player in active:
             player.reset()
         for city, state in new_city_states.items():
-            city.add_state(state)
+            city.add_state(state, keep_history)
+        self._registry.update(dead_players)
+        self._commit(
+            GameState(
+                round=self._round,
+                players=new_player_states,
+                cities=new_city_states,
+            ),
+            previous,
+        )
+        if hooks_active:
+            self._publish_changes(previous, previous_cities, governors)
+
+    def _publish_changes(
+                self,
+                previous: dict[Player, PlayerState],
+                previous_cities: dict[City, CityState],
+                governors: dict[City, Player],
+            ) -> None:
+        """Notify the subscribers of the state changes committed by resolve_moves.
+
+        Args:
+            previous: The previous states of the players whose state changed.
+            previous_cities: The previous states of the cities.
+            governors: The governors who resolved their city's event this round.
+        """
+
+        hooks = self.hooks
+        for player, old in previous.items():
+            state = player.state
+            if old.health == InfectionState.HEALTHY and state.health == InfectionState.ASYMPTOMATIC:
+                hooks.publish(Hook.INFECTED, player, state.city)
+            if state.health == InfectionState.DEAD and old.health != InfectionState.DEAD:
+                hooks.publish(Hook.DIED, player)
+            if state.role != old.role:
+                hooks.publish(Hook.ROLE_REASSIGNED, player, state.role, state.city)
+        for city, old in previous_cities.items():
+            state = city.state
+            if state.alerted and not old.alerted:
+                hooks.publish(Hook.CITY_ALERTED, city)
+            if city in governors and state.event.condition == "lockdown":
+                hooks.publish(Hook.LOCKDOWN, city)
@@ -0,0 +1,233 @@
+"""Precompiled decision tables for CPU governors."""
+
+import copy
+import threading
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.event import EVENTS, Event, EventCategory
+from findpatientzero.engine.entities.player import CPUPlayer, CPUStrategy
+from findpatientzero.gamedata.load import load_governor_policy
+from findpatientzero.gamedata.schema import GovernorPolicyData
+
+
+def event_key(event: Event) -> str:
+    """The key identifying what an event does, ignoring its flavor text.
+
+    Args:
+        event: The event.
+
+    Returns:
+        The key, formatted as "action:amount:condition".
+    """
+    return f"{event.action}:{event.amount}:{event.condition or ''}"
+
+
+class GovernorPolicy(CPUStrategy):
+    """CPU governor decisions looked up from a table compiled offline by simulation.
+
+    The table is indexed by the governed city's infection stage bucket, whether it is in
+    lockdown and how many rounds ago it last rolled a Suspicious event. Unalerted cities look
+    up whether to roll a Suspicious event; alerted cities look up which kind of Epidemic
+    event to steer their roll towards (alerted cities no longer roll Suspicious events, so
+    that table ignores the cooldown). All lookups are constant time.
+    """
+
+    stage_buckets: list[int]
+    """The lowest infection stage of each bucket, in ascending order."""
+
+    since_buckets: list[int]
+    """The fewest rounds since the last Suspicious roll of each bucket, in ascending order.
+    Cities that never rolled one use an extra, final bucket."""
+
+    _suspicious: list[bool]
+    """Whether to roll a Suspicious event, flattened over (stage, lockdown, since) buckets."""
+
+    _epidemic: list[str | None]
+    """The Epidemic event key to roll for, flattened over (stage, lockdown) buckets."""
+
+    _stage_index: list[int]
+    """The bucket of each infection stage."""
+
+    _since_index: list[int]
+    """The bucket of each number of rounds since the last Suspicious roll, up to the last bucket."""
+
+    _positions: dict[str, list[int]]
+    """The positions of each Epidemic event key in the Epidemic event list."""
+
+    _first_index: dict[int, int]
+    """The first position of each Epidemic event (by identity) in the Epidemic event list."""
+
+    _num_events: int
+    """The length of the Epidemic event list."""
+
+    _default: "GovernorPolicy | None" = None
+    """The policy compiled into the game data, once loaded (shared by all games, never modified)."""
+
+    _default_lock: threading.Lock = threading.Lock()
+    """Guards loading the default policy, so that concurrent games load it only once."""
+
+    def __init__(self, data: GovernorPolicyData) -> None:
+        """Create a policy from compiled table data.
+
+        Args:
+            data: The compiled table.
+        """
+
+        self.stage_buckets = list(data["stage_buckets"])
+        self.since_buckets = list(data["since_buckets"])
+        assert self.stage_buckets[0] == 0 and self.since_buckets[0] == 0
+
+        self._stage_index = [
+            sum(stage >= bound for bound in self.stage_buckets) - 1
+            for stage in range(City.MAX_INFECTION_STAGE + 1)
+        ]
+        self._since_index = [
+            sum(since >= bound for bound in self.since_buckets) - 1
+            for since in range(self.since_buckets[-1] + 1)
+        ]
+
+        num_since = len(self.since_buckets) + 1
+        self._suspicious = [
+            bool(data["suspicious"][stage][lockdown][since])
+            for stage in range(len(self.stage_buckets))
+            for lockdown in range(2)
+            for since in range(num_since)
+        ]
+        self._epidemic = [
+            data["epidemic"][stage][lockdown]
+            for stage in range(len(self.stage_buckets))
+            for lockdown in range(2)
+        ]
+
+        self._index_events(EVENTS[EventCategory.CITY_EPIDEMIC])
+
+    def _index_events(self, events: list[Event]) -> None:
+        """Index the positions of the events of an Epidemic event list."""
+
+        self._positions = dict()
+        self._first_index = dict()
+        for position, event in enumerate(events):
+            self._positions.setdefault(event_key(event), []).append(position)
+            self._first_index.setdefault(id(event), position)
+        self._num_events = len(events)
+
+    def with_events(self, events: list[Event]) -> "GovernorPolicy":
+        """The same policy for games that roll from another Epidemic event list.
+
+        Args:
+            events: The Epidemic event list, including repeats based on frequency.
+
+        Returns:
+            The policy (the tables are shared with this one).
+        """
+
+        policy = copy.copy(self)
+        policy._index_events(events)
+        return policy
+
+    @classmethod
+    def default(cls) -> "GovernorPolicy":
+        """The policy compiled into the game data."""
+
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls(load_governor_policy())
+        return cls._default
+
+    @classmethod
+    def neutral(cls, stage_buckets: list[int], since_buckets: list[int]) -> "GovernorPolicy":
+        """A policy that always rolls Suspicious events and rolls Epidemic events at random.
+
+        Args:
+            stage_buckets: The lowest infection stage of each bucket.
+            since_buckets: The fewest rounds since the last Suspicious roll of each bucket.
+
+        Returns:
+            The policy.
+        """
+
+        return cls(GovernorPolicyData(
+            stage_buckets=stage_buckets,
+            since_buckets=since_buckets,
+            suspicious=[[[True] * (len(since_buckets) + 1)] * 2] * len(stage_buckets),
+            epidemic=[[None, None]] * len(stage_buckets),
+        ))
+
+    def suspicious_index(self, state: CityState, game_round: int | None) -> int:
+        """The position of a city's cell in the flattened Suspicious table.
+
+        Args:
+            state: The current state of the city.
+            game_round: The current round, if known.
+
+        Returns:
+            The position in the table.
+        """
+
+        if state.last_sus_roll is None or game_round is None:
+            since = len(self.since_buckets)
+        else:
+            since = self._since_index[min(game_round - state.last_sus_roll, self.since_buckets[-1])]
+        lockdown = 1 if state.lockdown > 0 else 0
+        return ((self._stage_index[state.infection_stage] * 2) + lockdown) * (len(self.since_buckets) + 1) + since
+
+    def epidemic_index(self, state: CityState) -> int:
+        """The position of a city's cell in the flattened Epidemic table.
+
+        Args:
+            state: The current state of the city.
+
+        Returns:
+            The position in the table.
+        """
+
+        return self._stage_index[state.infection_stage] * 2 + (1 if state.lockdown > 0 else 0)
+
+    def roll_for(self, player: CPUPlayer, key: str) -> int | None:
+        """The roll that gives a governor an Epidemic event with the given key.
+
+        Mirrors the pool construction in Player.roll_next_event, where the last event is
+        removed from the pool, without building the pool.
+
+        Args:
+            player: The governor of an alerted city.
+            key: The Epidemic event key.
+
+        Returns:
+            The roll, or None if no event with the key is in the player's pool.
+        """
+
+        occurrences = self._positions.get(key)
+        if not occurrences:
+            return None
+
+        size = self._num_events
+        index = occurrences[0]
+        removed = self._first_index.get(id(player.last_event))
+        if removed is not None:
+            size -= 1
+            if removed == index:
+                if len(occurrences) == 1:
+                    return None
+                index = occurrences[1] - 1
+            elif removed < index:
+                index -= 1
+
+        # The smallest roll that maps to the index
+        return -(-index * 100 // size) + 1
+
+    def choose_suspicious(self, player: CPUPlayer, game_round: int | None) -> bool | None:
+        """Look up whether the governor rolls a Suspicious event."""
+
+        assert player.city is not None
+        return self._suspicious[self.suspicious_index(player.city.state, game_round)]
+
+    def choose_roll(self, player: CPUPlayer) -> int | None:
+        """Look up which Epidemic event the governor of an alerted city rolls for."""
+
+        if not player.is_governor or player.city is None or not player.city.alerted:
+            return None
+
+        key = self._epidemic[self.epidemic_index(player.city.state)]
+        return None if key is None else self.roll_for(player, key)
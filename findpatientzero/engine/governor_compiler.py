@@ -0,0 +1,167 @@
+"""Offline compiler for the CPU governor policy tables.
+
+Run `python -m findpatientzero.engine.governor_compiler` from the repository root to
+regenerate `gamedata/governor_policy.yml`.
+"""
+
+import random
+from dataclasses import dataclass
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.event import EVENTS, EventCategory
+from findpatientzero.engine.entities.player import CPUPlayer, CPUStrategy
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.governor import GovernorPolicy, event_key
+from findpatientzero.gamedata.load import save_governor_policy
+from findpatientzero.gamedata.schema import GovernorPolicyData
+
+DEFAULT_STAGE_BUCKETS = [0, 1, 3, 6, 9, 11]
+"""The default lowest infection stage of each bucket."""
+
+DEFAULT_SINCE_BUCKETS = [0, 3, 5, 8]
+"""The default fewest rounds since the last Suspicious roll of each bucket."""
+
+
+@dataclass
+class _Decision:
+    """A decision made by an exploring governor."""
+
+    city: City
+    """The governed city."""
+
+    table: str
+    """The table the decision belongs to ("suspicious" or "epidemic")."""
+
+    index: int
+    """The position of the decision's cell in the flattened table."""
+
+    choice: bool | str
+    """The decision taken."""
+
+    round: int | None = None
+    """The round the decision was taken in."""
+
+
+class _ExplorationStrategy(CPUStrategy):
+    """Governor strategy that takes random decisions and records them."""
+
+    def __init__(self, policy: GovernorPolicy, rng: random.Random) -> None:
+        self.policy = policy
+        self.rng = rng
+        self.decisions: list[_Decision] = []
+
+    def choose_suspicious(self, player: CPUPlayer, game_round: int | None) -> bool | None:
+        assert player.city is not None
+        choice = self.rng.random() < 0.5
+        index = self.policy.suspicious_index(player.city.state, game_round)
+        self.decisions.append(_Decision(player.city, "suspicious", index, choice))
+        return choice
+
+    def choose_roll(self, player: CPUPlayer) -> int | None:
+        if not player.is_governor or player.city is None or not player.city.alerted:
+            return None
+        keys = sorted({event_key(event) for event in player.event_pool()})
+        choice = self.rng.choice(keys)
+        index = self.policy.epidemic_index(player.city.state)
+        self.decisions.append(_Decision(player.city, "epidemic", index, choice))
+        return self.policy.roll_for(player, choice)
+
+
+def compile_policy(
+            games: int = 120,
+            horizon: int = 3,
+            seed: int = 0,
+            num_players: int = 8,
+            num_cities: int = 6,
+            max_rounds: int = 40,
+            stage_buckets: list[int] | None = None,
+            since_buckets: list[int] | None = None,
+        ) -> GovernorPolicyData:
+    """Compile governor policy tables by simulating all-CPU games.
+
+    Governors take random decisions, and each decision is scored by the infection stage of
+    the governed city a few rounds later. Each table cell then picks the decision with the
+    lowest mean stage, which is one step of policy improvement over random play. Cells that
+    never occurred default to rolling Suspicious events and random Epidemic events.
+
+    Args:
+        games: The number of games to simulate.
+        horizon: The number of rounds after a decision at which it is scored.
+        seed: The seed for the simulations.
+        num_players: The number of players per game.
+        num_cities: The number of cities per game.
+        max_rounds: The round at which an unfinished game is stopped.
+        stage_buckets: The lowest infection stage of each bucket.
+        since_buckets: The fewest rounds since the last Suspicious roll of each bucket.
+
+    Returns:
+        The compiled tables.
+    """
+
+    stage_buckets = stage_buckets or DEFAULT_STAGE_BUCKETS
+    since_buckets = since_buckets or DEFAULT_SINCE_BUCKETS
+    policy = GovernorPolicy.neutral(stage_buckets, since_buckets)
+    rng = random.Random(seed)
+
+    # (table, index, choice) -> [count, total stage]
+    scores: dict[tuple[str, int, bool | str], list[int]] = dict()
+    config = GameConfig(num_players=num_players, num_cities=num_cities, auto_roll=False, cpu_governors=True)
+    for _ in range(games):
+        game = Game(config, [], [f"City {i}" for i in range(num_cities)], seed=rng.getrandbits(64))
+        explorer = _ExplorationStrategy(policy, rng)
+        for player in game.players:
+            if isinstance(player, CPUPlayer):
+                player.governor_strategy = explorer
+
+        stages: dict[tuple[City, int], int] = dict()
+        while game.phase != GamePhase.GAME_OVER and game.round < max_rounds:
+            resolving = game.phase == GamePhase.RESOLVE_MOVES
+            game.go_to_next_phase()
+            for decision in explorer.decisions:
+                if decision.round is None:
+                    decision.round = game.round
+            if resolving:
+                for city in game.cities:
+                    stages[city, game.last_state.round] = city.infection_stage
+
+        for decision in explorer.decisions:
+            assert decision.round is not None
+            stage = stages.get((decision.city, decision.round + horizon))
+            if stage is None:
+                continue
+            score = scores.setdefault((decision.table, decision.index, decision.choice), [0, 0])
+            score[0] += 1
+            score[1] += stage
+
+    def best(table: str, index: int, choices: list, default):
+        means = {
+            choice: scores[table, index, choice][1] / scores[table, index, choice][0]
+            for choice in choices
+            if (table, index, choice) in scores
+        }
+        return min(means, key=means.__getitem__) if means else default
+
+    keys = sorted({event_key(event) for event in EVENTS[EventCategory.CITY_EPIDEMIC]})
+    num_since = len(since_buckets) + 1
+    return GovernorPolicyData(
+        stage_buckets=stage_buckets,
+        since_buckets=since_buckets,
+        suspicious=[
+            [
+                [
+                    best("suspicious", (stage * 2 + lockdown) * num_since + since, [True, False], True)
+                    for since in range(num_since)
+                ]
+                for lockdown in range(2)
+            ]
+            for stage in range(len(stage_buckets))
+        ],
+        epidemic=[
+            [best("epidemic", stage * 2 + lockdown, keys, None) for lockdown in range(2)]
+            for stage in range(len(stage_buckets))
+        ],
+    )
+
+
+if __name__ == "__main__":
+    save_governor_policy(compile_policy())
@@ -0,0 +1,142 @@
+"""Publish/subscribe hooks for observing a game as it is played."""
+
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+
+
+class Hook(Enum):
+    """Something that happened in a game, which subscribers can be notified of.
+
+    Callbacks are called with the game followed by the arguments listed for each hook.
+    """
+
+    PHASE_CHANGED = "Phase changed"
+    """The game entered a new phase: (game, previous phase, phase)."""
+
+    EVENT_ROLLED = "Event rolled"
+    """A player rolled their next event: (game, player, event)."""
+
+    PROMPT_ISSUED = "Prompt issued"
+    """A player was prompted: (game, player, prompt)."""
+
+    PROMPT_ANSWERED = "Prompt answered"
+    """A player answered a prompt: (game, player, prompt, response)."""
+
+    INFECTED = "Infected"
+    """A traveler was infected: (game, player, city where they were infected)."""
+
+    DIED = "Died"
+    """A player died: (game, player)."""
+
+    ROLE_REASSIGNED = "Role reassigned"
+    """A player was given a new role: (game, player, role, city they govern or None)."""
+
+    CITY_ALERTED = "City alerted"
+    """A city was alerted to the epidemic: (game, city)."""
+
+    LOCKDOWN = "Lockdown"
+    """A city was put in lockdown: (game, city)."""
+
+
+class Prompt(Enum):
+    """The kind of a player prompt."""
+
+    SUSPICIOUS = "Suspicious"
+    """Whether a governor rolls a Suspicious event (answered with a bool)."""
+
+    ROLL = "Roll"
+    """The player's dice roll (answered with an int)."""
+
+    CITY_CHOICE = "City choice"
+    """The city a traveler moves to (answered with a City)."""
+
+
+Callback = Callable[..., Any]
+"""A hook subscriber, called with the game followed by the arguments of the hook."""
+
+
+class HookBus:
+    """The subscribers to the hooks of a game.
+
+    Publishing is synchronous: callbacks run in the order they subscribed, inside the game
+    method that triggered the hook, and exceptions they raise propagate to its caller.
+    State-change hooks (infection, death, role, alert and lockdown) are published after the
+    new states are committed, so callbacks see the game as it is after the change.
+
+    Games check `active` before doing any work for their hooks, so a game without
+    subscribers does not collect or compare anything.
+    """
+
+    game: Any
+    """The game whose hooks these are."""
+
+    active: bool
+    """Whether any callback is subscribed to any hook."""
+
+    _subscribers: dict[Hook, tuple[Callback, ...]]
+    """The callbacks subscribed to each hook (replaced rather than modified, so that
+    callbacks can subscribe and unsubscribe while a hook is being published)."""
+
+    def __init__(self, game: Any) -> None:
+        """Create a hook bus without subscribers.
+
+        Args:
+            game: The game whose hooks these are.
+        """
+
+        self.game = game
+        self.active = False
+        self._subscribers = dict()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle the bus without its subscribers, which belong to the running process."""
+        return {"game": self.game, "active": False, "_subscribers": dict()}
+
+    def subscribe(self, hook: Hook, callback: Callback) -> Callable[[], None]:
+        """Call a function every time a hook is published.
+
+        Args:
+            hook: The hook to subscribe to.
+            callback: The function to call with the game and the arguments of the hook.
+
+        Returns:
+            A function that unsubscribes the callback.
+        """
+
+        self._subscribers[hook] = self._subscribers.get(hook, ()) + (callback,)
+        self.active = True
+        return lambda: self.unsubscribe(hook, callback)
+
+    def unsubscribe(self, hook: Hook, callback: Callback) -> None:
+        """Stop calling a function when a hook is published (does nothing if it is not subscribed).
+
+        Args:
+            hook: The hook the function is subscribed to.
+            callback: The function to stop calling.
+        """
+
+        callbacks = list(self._subscribers.get(hook, ()))
+        if callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if callbacks:
+            self._subscribers[hook] = tuple(callbacks)
+        else:
+            del self._subscribers[hook]
+        self.active = bool(self._subscribers)
+
+    def wants(self, hook: Hook) -> bool:
+        """Whether any callback is subscribed to a hook."""
+        return hook in self._subscribers
+
+    def publish(self, hook: Hook, *args: Any) -> None:
+        """Call every callback subscribed to a hook.
+
+        Args:
+            hook: The hook to publish.
+            *args: The arguments of the hook (see `Hook`).
+        """
+
+        for callback in self._subscribers.get(hook, ()):
+            callback(self.game, *args)
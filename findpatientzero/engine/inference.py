@@ -0,0 +1,288 @@
+"""Bayesian inference of which player is Patient Zero from observable game history."""
+
+import math
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.player import InfectionState, Player, PlayerState
+from findpatientzero.engine.game import Game, GameState
+from findpatientzero.engine.transitions import HealthTransitions
+
+ONSET_STATES = (InfectionState.SYMPTOMATIC, InfectionState.DEAD, InfectionState.IMMUNE)
+"""Health states that are visible to other players (a traveler's symptoms, death or recovery)."""
+
+
+def onset_hazard(age: int, transitions: HealthTransitions | None = None) -> float:
+    """The probability that an infected traveler shows onset at the given infection age,
+    given that they had not shown onset before.
+
+    Read from the health transition table that drives Game.update_player_state.
+
+    Args:
+        age: The number of rounds since the traveler was infected.
+        transitions: The game's health transition table (defaults to the one of the game data).
+
+    Returns:
+        The conditional probability of onset at this age.
+    """
+    return (HealthTransitions.default() if transitions is None else transitions).onset_probability(age)
+
+
+class PatientZeroInference:
+    """Incremental posterior over which player is Patient Zero.
+
+    Each player's evidence is kept as a log likelihood ratio between the hypotheses
+    "this player is Patient Zero" and "this player is not Patient Zero". Under the first
+    hypothesis the player was infected on round 0; under the second, a small hidden Markov
+    filter tracks whether (and how long ago) they picked up the infection from the cities
+    they moved into. Every committed game state updates each filter in constant time, so an
+    update costs O(players) regardless of how long the game has been running.
+    """
+
+    base_exposure: float
+    """The per-round probability that a traveler is infected by an unalerted city."""
+
+    alert_exposure: float
+    """The per-round probability that a traveler is infected by an alerted city."""
+
+    contact_exposure: float
+    """The per-round probability of infection per unit of Patient Zero posterior mass sharing the city."""
+
+    transitions: HealthTransitions
+    """The health transition table of the game, which gives the onset probability at each infection age."""
+
+    _players: list[Player]
+    """The players being tracked, in game order."""
+
+    _log_ratio: dict[Player, float]
+    """The log likelihood ratio of each player being Patient Zero."""
+
+    _not_pz: dict[Player, list[float]]
+    """Filter over [uninfected, infection age 0, ..., max age] for each player not being Patient Zero,
+    where ages from the table's `max_age` on share a transition row and are merged into the last one."""
+
+    _onset: dict[Player, int | None]
+    """The round in which each player first showed onset, if they have."""
+
+    _previous: dict[Player, PlayerState]
+    """The last observed state of each player."""
+
+    _posterior: dict[Player, float]
+    """The cached normalized posterior."""
+
+    _round: int | None
+    """The round of the last observed game state."""
+
+    def __init__(
+                self,
+                players: list[Player],
+                base_exposure: float = 0.05,
+                alert_exposure: float = 0.5,
+                contact_exposure: float = 0.5,
+                transitions: HealthTransitions | None = None,
+            ) -> None:
+        """Create a new inference engine with a uniform prior over the players.
+
+        Args:
+            players: The players in the game.
+            base_exposure: The per-round infection probability in an unalerted city.
+            alert_exposure: The per-round infection probability in an alerted city.
+            contact_exposure: The per-round infection probability per unit of Patient Zero
+                posterior mass sharing a city.
+            transitions: The health transition table of the game (defaults to the one of the
+                game data; see `from_history` to take it from a game).
+        """
+
+        self.base_exposure = base_exposure
+        self.alert_exposure = alert_exposure
+        self.contact_exposure = contact_exposure
+        self.transitions = HealthTransitions.default() if transitions is None else transitions
+
+        self._players = list(players)
+        self._log_ratio = {player: 0.0 for player in self._players}
+        self._not_pz = {player: [1.0] + [0.0] * (self.transitions.max_age + 1) for player in self._players}
+        self._onset = {player: None for player in self._players}
+        self._previous = {}
+        self._posterior = {player: 1 / len(self._players) for player in self._players}
+        self._round = None
+
+    @classmethod
+    def from_history(cls, game: Game, history: list[GameState], **kwargs) -> "PatientZeroInference":
+        """Create an inference engine for a game and replay an existing history into it.
+
+        Args:
+            game: The game, whose players and health transition table are used.
+            history: The committed game states so far.
+            **kwargs: Exposure parameters passed to the constructor.
+
+        Returns:
+            The inference engine, up to date with the history.
+        """
+
+        inference = cls(list(game.players), transitions=game.health_transitions, **kwargs)
+        for state in history:
+            inference.observe(state)
+        return inference
+
+    @property
+    def posterior(self) -> dict[Player, float]:
+        """The probability of each player being Patient Zero."""
+        return self._posterior.copy()
+
+    @property
+    def round(self) -> int | None:
+        """The round of the last observed game state."""
+        return self._round
+
+    def probability(self, player: Player) -> float:
+        """The probability of a player being Patient Zero.
+
+        Args:
+            player: The player to check.
+
+        Returns:
+            The posterior probability.
+        """
+        return self._posterior[player]
+
+    def most_likely(self, candidates: list[Player] | None = None) -> Player:
+        """The player most likely to be Patient Zero.
+
+        Args:
+            candidates: Restrict the answer to these players (defaults to all players).
+
+        Returns:
+            The player with the highest posterior probability.
+        """
+
+        pool = self._players if candidates is None else candidates
+        return max(pool, key=self._posterior.__getitem__)
+
+    def ranking(self) -> list[tuple[Player, float]]:
+        """The players ordered from most to least likely to be Patient Zero."""
+        return sorted(self._posterior.items(), key=lambda item: item[1], reverse=True)
+
+    def observe(self, state: GameState) -> None:
+        """Update the posterior with a newly committed game state.
+
+        Only players present in the state are updated, so it is safe to pass the states
+        produced by every resolve phase (which only contain travelers) as well as the
+        initial state.
+
+        Args:
+            state: The committed game state.
+        """
+
+        if self._round is not None and state.round <= self._round:
+            raise ValueError(f"Game state for round {state.round} was already observed.")
+
+        if self._round is None:
+            # The initial state only tells us where everyone starts
+            self._previous.update(state.players)
+            self._round = state.round
+            return
+
+        # Patient Zero posterior mass per city, used as the contact exposure
+        mass: dict[City, float] = dict()
+        for player, previous in self._previous.items():
+            if previous.city is not None:
+                mass[previous.city] = mass.get(previous.city, 0.0) + self._posterior[player]
+
+        for player, new in state.players.items():
+            previous = self._previous.get(player)
+            self._previous[player] = new
+            if previous is None or self._onset[player] is not None:
+                continue
+
+            # A wrongly accused suspect is killed while the game goes on, so they were not Patient Zero
+            if previous.to_be_killed:
+                self._log_ratio[player] = -math.inf
+                self._onset[player] = state.round
+                continue
+
+            onset = new.health in ONSET_STATES
+            if onset:
+                self._onset[player] = state.round
+
+            dest_state = state.cities.get(new.city) if new.city is not None else None
+            alerted = dest_state.alerted if dest_state is not None else False
+            contact = mass.get(new.city, 0.0)
+            if previous.city == new.city:
+                contact -= self._posterior[player]
+            exposure = 1 - (
+                (1 - self.base_exposure)
+                * (1 - (self.alert_exposure if alerted else 0.0))
+                * (1 - self.contact_exposure * min(1.0, max(0.0, contact)))
+            )
+
+            pz = self._log_likelihood_pz(state.round, onset)
+            not_pz = self._update_not_pz(self._not_pz[player], onset, exposure)
+            if pz == -math.inf:
+                self._log_ratio[player] = -math.inf
+            elif not_pz == -math.inf:
+                self._log_ratio[player] = math.inf
+            elif abs(self._log_ratio[player]) != math.inf:
+                self._log_ratio[player] += pz - not_pz
+
+        self._round = state.round
+        self._normalize()
+
+    def _log_likelihood_pz(self, game_round: int, onset: bool) -> float:
+        """The log likelihood of this round's observation if the player is Patient Zero."""
+
+        hazard = self.transitions.onset_probability(game_round)
+        likelihood = hazard if onset else 1 - hazard
+        return math.log(likelihood) if likelihood > 0 else -math.inf
+
+    def _update_not_pz(self, belief: list[float], onset: bool, exposure: float) -> float:
+        """Advance the filter of a player who is not Patient Zero by one round, in place.
+
+        Args:
+            belief: The filter over [uninfected, age 0, ..., max age].
+            onset: Whether the player showed onset this round.
+            exposure: The probability of being infected this round.
+
+        Returns:
+            The log likelihood of the observation.
+        """
+
+        # Infected travelers age and may show onset; newly infected travelers don't progress this round
+        max_age = self.transitions.max_age
+        aged = [0.0] * (max_age + 1)
+        for age, p in enumerate(belief[1:]):
+            aged[min(age + 1, max_age)] += p
+
+        evidence = 0.0
+        for age, p in enumerate(aged):
+            hazard = self.transitions.onset_probability(age)
+            aged[age] = p * (hazard if onset else 1 - hazard)
+            evidence += aged[age]
+
+        uninfected = 0.0 if onset else belief[0]
+        evidence += uninfected
+        if evidence <= 0:
+            return -math.inf
+
+        belief[0] = uninfected * (1 - exposure) / evidence
+        belief[1] = uninfected * exposure / evidence + aged[0] / evidence
+        for age in range(1, max_age + 1):
+            belief[age + 1] = aged[age] / evidence
+
+        return math.log(evidence)
+
+    def _normalize(self) -> None:
+        """Recompute the cached posterior from the log likelihood ratios."""
+
+        certain = [player for player, ratio in self._log_ratio.items() if ratio == math.inf]
+        if certain:
+            self._posterior = {player: (1 / len(certain) if player in certain else 0.0) for player in self._players}
+            return
+
+        top = max(self._log_ratio.values())
+        if top == -math.inf:
+            # Every hypothesis was ruled out by the model; fall back to the prior
+            self._posterior = {player: 1 / len(self._players) for player in self._players}
+            return
+
+        weights = {player: math.exp(ratio - top) for player, ratio in self._log_ratio.items()}
+        total = sum(weights.values())
+        self._posterior = {player: weight / total for player, weight in weights.items()}
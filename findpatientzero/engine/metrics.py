@@ -0,0 +1,183 @@
+"""Epidemic metrics collected incrementally while a game is played."""
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.player import InfectionState, Player, PlayerState
+from findpatientzero.engine.transitions import INFECTED_STATES
+
+if TYPE_CHECKING:
+    from findpatientzero.engine.game import GameState
+
+
+class EpidemicMetrics:
+    """Summary of how the epidemic unfolds, updated as each round's states are committed.
+
+    Each update only looks at the states committed in that round, so the metrics do not need
+    the game's history (see `GameConfig.keep_history`). Every per-round list has one entry per
+    committed state, starting with the initial state (round 0).
+    """
+
+    rounds: list[int]
+    """The round of each committed state."""
+
+    infected: list[int]
+    """The number of infected travelers (asymptomatic or symptomatic) after each round."""
+
+    new_infections: list[int]
+    """The number of travelers infected in each round."""
+
+    deaths: list[int]
+    """The number of players who died in each round."""
+
+    infected_cities: list[int]
+    """The number of cities with a non-zero infection stage after each round."""
+
+    max_stage: list[int]
+    """The highest infection stage of any city after each round."""
+
+    first_alert_round: int | None
+    """The first round in which a city was alerted to the epidemic (None if none has been)."""
+
+    peak_stage: int
+    """The highest infection stage any city has reached."""
+
+    peak_stage_round: int | None
+    """The first round in which the peak stage was reached (None if no city was ever infected)."""
+
+    _health: Counter[InfectionState]
+    """The number of players in each health state."""
+
+    _stages: dict[City, int]
+    """The last committed infection stage of each city."""
+
+    _num_infected_cities: int
+    """The number of cities with a non-zero infection stage."""
+
+    def __init__(self) -> None:
+        self.rounds = []
+        self.infected = []
+        self.new_infections = []
+        self.deaths = []
+        self.infected_cities = []
+        self.max_stage = []
+        self.first_alert_round = None
+        self.peak_stage = 0
+        self.peak_stage_round = None
+        self._health = Counter()
+        self._stages = dict()
+        self._num_infected_cities = 0
+
+    @classmethod
+    def from_history(cls, history: "list[GameState]") -> "EpidemicMetrics":
+        """Compute the metrics of a finished game from its history.
+
+        Args:
+            history: The committed states of the game.
+
+        Returns:
+            The metrics.
+        """
+
+        metrics = cls()
+        previous: dict[Player, PlayerState] = dict()
+        for state in history:
+            metrics.record(state.round, previous, state.players, state.cities)
+            previous = {**previous, **state.players}
+        return metrics
+
+    def copy(self) -> "EpidemicMetrics":
+        """An independent copy of the metrics (for a forked game)."""
+
+        clone = object.__new__(EpidemicMetrics)
+        clone.__dict__.update(self.__dict__)
+        for name in ("rounds", "infected", "new_infections", "deaths", "infected_cities", "max_stage"):
+            setattr(clone, name, getattr(self, name).copy())
+        clone._health = self._health.copy()
+        clone._stages = self._stages.copy()
+        return clone
+
+    def record(
+                self,
+                game_round: int,
+                previous: dict[Player, PlayerState],
+                players: dict[Player, PlayerState],
+                cities: dict[City, CityState],
+            ) -> None:
+        """Update the metrics with the states committed in a round.
+
+        Args:
+            game_round: The round of the committed states.
+            previous: The previous states of the players in `players` (missing for new players).
+            players: The committed states of the players whose state changed.
+            cities: The committed states of the cities.
+        """
+
+        new_infections = 0
+        deaths = 0
+        for player, state in players.items():
+            before = previous.get(player)
+            if before is not None:
+                if before.health == state.health:
+                    continue
+                self._health[before.health] -= 1
+            self._health[state.health] += 1
+            if state.health in INFECTED_STATES and (before is None or before.health == InfectionState.HEALTHY):
+                new_infections += 1
+            elif state.health == InfectionState.DEAD:
+                deaths += 1
+
+        max_stage = 0
+        for city, state in cities.items():
+            self._num_infected_cities += (state.infection_stage > 0) - (self._stages.get(city, 0) > 0)
+            self._stages[city] = state.infection_stage
+            max_stage = max(max_stage, state.infection_stage)
+            if state.alerted and self.first_alert_round is None:
+                self.first_alert_round = game_round
+        if max_stage > self.peak_stage:
+            self.peak_stage = max_stage
+            self.peak_stage_round = game_round
+
+        self.rounds.append(game_round)
+        self.infected.append(sum(self._health[health] for health in INFECTED_STATES))
+        self.new_infections.append(new_infections)
+        self.deaths.append(deaths)
+        self.infected_cities.append(self._num_infected_cities)
+        self.max_stage.append(max_stage)
+
+    @property
+    def total_infections(self) -> int:
+        """The number of travelers who have been infected (including Patient Zero)."""
+        return sum(self.new_infections)
+
+    @property
+    def total_deaths(self) -> int:
+        """The number of players who have died."""
+        return sum(self.deaths)
+
+    @property
+    def time_to_first_alert(self) -> int | None:
+        """The number of rounds until a city was first alerted (None if none has been)."""
+        return None if self.first_alert_round is None else self.first_alert_round - self.rounds[0]
+
+    def summary(self) -> dict[str, Any]:
+        """The metrics as plain values, ready to be serialized.
+
+        Returns:
+            The summary of the epidemic.
+        """
+
+        return {
+            "rounds": self.rounds[-1] - self.rounds[0] if self.rounds else 0,
+            "infected": self.infected.copy(),
+            "new_infections": self.new_infections.copy(),
+            "deaths": self.deaths.copy(),
+            "infected_cities": self.infected_cities.copy(),
+            "max_stage": self.max_stage.copy(),
+            "total_infections": self.total_infections,
+            "total_deaths": self.total_deaths,
+            "time_to_first_alert": self.time_to_first_alert,
+            "peak_stage": self.peak_stage,
+            "peak_stage_round": self.peak_stage_round,
+        }
@@ -0,0 +1,133 @@
+"""Per-game allocation of names for CPU players and cities.
+
+The name lists are loaded once per process and shared by all games (and threads), so they
+are immutable; loading them is guarded by `_names_lock`. Everything that changes as names
+are drawn lives in a `NamePool` owned by a single game.
+"""
+
+import random
+import threading
+from collections.abc import Iterable, Sequence
+
+from findpatientzero.gamedata.load import load_city_names, load_cpu_names
+from findpatientzero.gamedata.shared import attached
+
+_cpu_names: Sequence[str] | None = None
+_city_names: Sequence[str] | None = None
+_names_lock = threading.Lock()
+
+
+def cpu_names() -> Sequence[str]:
+    """The CPU player names, loaded once and never modified.
+
+    Returns:
+        Sequence[str]: The names, read in place from shared game data if attached.
+    """
+
+    global _cpu_names
+    if _cpu_names is None:
+        with _names_lock:
+            if _cpu_names is None:
+                shared = attached()
+                _cpu_names = shared.names("cpu_names") if shared is not None else tuple(load_cpu_names())
+    return _cpu_names
+
+
+def city_names() -> Sequence[str]:
+    """The city names, loaded once and never modified.
+
+    Returns:
+        Sequence[str]: The names, read in place from shared game data if attached.
+    """
+
+    global _city_names
+    if _city_names is None:
+        with _names_lock:
+            if _city_names is None:
+                shared = attached()
+                _city_names = shared.names("city_names") if shared is not None else tuple(load_city_names())
+    return _city_names
+
+
+class NamePool:
+    """Draws names at random without replacement from an immutable list of names.
+
+    The pool never modifies the list: it runs a Fisher-Yates shuffle lazily, recording only
+    the positions it has swapped, so each draw is O(1) and many pools can share one list.
+    Once the list is used up, the pool generates names ("<fallback> 1", "<fallback> 2", ...).
+    """
+
+    _names: Sequence[str]
+    """The names to draw from."""
+
+    _rng: random.Random
+    """The random number generator names are drawn with."""
+
+    _swapped: dict[int, int]
+    """The positions of the shuffle that hold a different index than their own."""
+
+    _drawn: int
+    """The number of names drawn from the list so far."""
+
+    _taken: set[str]
+    """The names that must not be drawn (because they are already used in the game)."""
+
+    _fallback: str
+    """The prefix of generated names."""
+
+    _generated: int
+    """The number of names generated so far."""
+
+    def __init__(
+                self,
+                names: Sequence[str],
+                rng: random.Random,
+                taken: Iterable[str] = (),
+                fallback: str = "CPU",
+            ) -> None:
+        """Create a pool of names.
+
+        Args:
+            names (Sequence[str]): The names to draw from.
+            rng (random.Random): The random number generator names are drawn with.
+            taken (Iterable[str]): Names that must not be drawn.
+            fallback (str): The prefix of generated names.
+        """
+
+        self._names = names
+        self._rng = rng
+        self._swapped = dict()
+        self._drawn = 0
+        self._taken = set(taken)
+        self._fallback = fallback
+        self._generated = 0
+
+    def __len__(self) -> int:
+        """The number of names left in the list (generated names are unlimited)."""
+        return len(self._names) - self._drawn
+
+    def draw(self) -> str:
+        """Draw a name that has not been drawn from this pool before.
+
+        Returns:
+            str: The name.
+        """
+
+        while self._drawn < len(self._names):
+            position = self._drawn
+            chosen = self._rng.randint(position, len(self._names) - 1)
+            index = self._swapped.pop(chosen, chosen)
+            if chosen != position:
+                self._swapped[chosen] = self._swapped.pop(position, position)
+            self._drawn += 1
+            name = self._names[index]
+            if name not in self._taken:
+                self._taken.add(name)
+                return name
+
+        while True:
+            self._generated += 1
+            name = f"{self._fallback} {self._generated}"
+            if name not in self._taken:
+                self._taken.add(name)
+                return name
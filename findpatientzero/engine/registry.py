@@ -0,0 +1,74 @@
+"""Players of a game, partitioned by role."""
+
+from collections.abc import Iterable
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.player import Player, PlayerRole
+
+
+class PlayerRegistry:
+    """The players of a game, partitioned by role so that each phase only visits the players it concerns.
+
+    Every partition keeps the players in game order, so phases that roll dice still draw
+    from the game's random number generator in the same order as a loop over all players.
+    Roles only change when states are committed, so the game calls `update` after each commit.
+    """
+
+    players: list[Player]
+    """All players, in game order."""
+
+    travelers: list[Player]
+    """The travelers, in game order."""
+
+    governors: dict[City, Player]
+    """The governor of each governed city, in game order."""
+
+    observers: list[Player]
+    """The observers, in game order."""
+
+    active: list[Player]
+    """The travelers and governors, in game order."""
+
+    _roles: dict[Player, PlayerRole]
+    """The role each player was partitioned by."""
+
+    def __init__(self, players: list[Player]) -> None:
+        """Partition players by their current role.
+
+        Args:
+            players: The players, in game order (they must have a state).
+        """
+
+        self.players = players
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Partition the players again from their current states."""
+
+        self.travelers = []
+        self.governors = dict()
+        self.observers = []
+        self.active = []
+        self._roles = dict()
+        for player in self.players:
+            role = player.state.role
+            self._roles[player] = role
+            if role == PlayerRole.TRAVELER:
+                self.travelers.append(player)
+                self.active.append(player)
+            elif role == PlayerRole.GOVERNOR:
+                assert player.city is not None
+                self.governors.setdefault(player.city, player)
+                self.active.append(player)
+            else:
+                self.observers.append(player)
+
+    def update(self, changed: Iterable[Player]) -> None:
+        """Update the partitions after players were given new states.
+
+        Args:
+            changed: The players whose state changed.
+        """
+
+        if any(player.state.role != self._roles[player] for player in changed):
+            self.refresh()
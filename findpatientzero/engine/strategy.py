@@ -0,0 +1,270 @@
+"""Search-based decision logic for CPU players."""
+
+import math
+from concurrent.futures import Executor, wait
+from time import perf_counter
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.player import CPUPlayer, CPUStrategy, InfectionState
+from findpatientzero.engine.game import Game, GamePhase
+
+SURVIVAL_SCORES: dict[InfectionState, float] = {
+    InfectionState.HEALTHY: 1.0,
+    InfectionState.IMMUNE: 1.0,
+    InfectionState.ASYMPTOMATIC: 0.45,
+    InfectionState.SYMPTOMATIC: 0.4,
+    InfectionState.DEAD: 0.0,
+}
+"""The approximate chance of a traveler surviving the epidemic in each health state."""
+
+Action = tuple[str, int]
+"""A decision to evaluate: ("city", city index) or ("roll", roll)."""
+
+
+def rollout(game: Game, player_index: int, action: Action, horizon: int) -> float:
+    """Apply a decision to a (forked) game and play it forward with random decisions.
+
+    Args:
+        game: The game to play out. It is modified in place.
+        player_index: The index of the deciding player in the game.
+        action: The decision to apply.
+        horizon: The number of rounds to play forward.
+
+    Returns:
+        The survival score of the deciding player at the end of the rollout.
+    """
+
+    player = game.players[player_index]
+    kind, value = action
+    if kind == "city":
+        player.respond_city_choice(game.cities[value])
+    else:
+        player.respond_roll(value)
+
+    end = game.round + horizon
+    while game.phase != GamePhase.GAME_OVER and game.round < end:
+        if not game.phase_complete:
+            game.answer_pending_prompts()
+        game.go_to_next_phase()
+
+    return SURVIVAL_SCORES[player.health]
+
+
+def rollout_batch(
+            game: Game,
+            player_index: int,
+            action: Action,
+            horizon: int,
+            time_budget: float,
+            max_rollouts: int,
+        ) -> tuple[int, float]:
+    """Run rollouts of a single decision until the time budget is spent.
+
+    This is the unit of work sent to worker pools, so it only takes picklable arguments.
+
+    Args:
+        game: The game to fork for each rollout.
+        player_index: The index of the deciding player in the game.
+        action: The decision to evaluate.
+        horizon: The number of rounds to play forward.
+        time_budget: The time budget in seconds.
+        max_rollouts: The maximum number of rollouts.
+
+    Returns:
+        The number of rollouts and the sum of their scores.
+    """
+
+    deadline = perf_counter() + time_budget
+    count, total = 0, 0.0
+    while count < max_rollouts and (count == 0 or perf_counter() < deadline):
+        total += rollout(game.fork(), player_index, action, horizon)
+        count += 1
+    return count, total
+
+
+class RolloutStrategy(CPUStrategy):
+    """Chooses rolls and cities for CPU travelers with Monte Carlo rollouts.
+
+    Each candidate decision is applied to a fork of the live game, which is then played
+    forward with random decisions for a few rounds. Candidates are sampled with UCB1 until
+    the per-decision time budget runs out, and the candidate with the best mean survival
+    score is chosen.
+    """
+
+    game: Game
+    """The game the strategy plays in."""
+
+    time_budget: float
+    """The time budget per decision, in seconds."""
+
+    horizon: int
+    """The number of rounds each rollout plays forward."""
+
+    max_rollouts: int
+    """The maximum number of rollouts per decision."""
+
+    executor: Executor | None
+    """The worker pool to spread rollouts across, if any."""
+
+    exploration: float
+    """The UCB1 exploration constant."""
+
+    def __init__(
+                self,
+                game: Game,
+                time_budget: float = 0.005,
+                horizon: int = 4,
+                max_rollouts: int = 256,
+                executor: Executor | None = None,
+                exploration: float = math.sqrt(2),
+            ) -> None:
+        """Create a rollout strategy for a game.
+
+        Args:
+            game: The game the strategy plays in.
+            time_budget: The time budget per decision, in seconds.
+            horizon: The number of rounds each rollout plays forward.
+            max_rollouts: The maximum number of rollouts per decision.
+            executor: A thread or process pool to spread rollouts across.
+            exploration: The UCB1 exploration constant.
+        """
+
+        assert time_budget > 0
+        assert horizon >= 1
+        assert max_rollouts >= 1
+
+        self.game = game
+        self.time_budget = time_budget
+        self.horizon = horizon
+        self.max_rollouts = max_rollouts
+        self.executor = executor
+        self.exploration = exploration
+
+    @classmethod
+    def attach(cls, game: Game, **kwargs) -> "RolloutStrategy":
+        """Create a rollout strategy and attach it to every CPU player in a game.
+
+        Args:
+            game: The game to attach the strategy to.
+            **kwargs: Options passed to the constructor.
+
+        Returns:
+            The attached strategy.
+        """
+
+        strategy = cls(game, **kwargs)
+        for player in game.players:
+            if isinstance(player, CPUPlayer):
+                player.strategy = strategy
+        return strategy
+
+    def choose_roll(self, player: CPUPlayer) -> int | None:
+        """Choose the roll that leads to the event with the best rollout score."""
+
+        if not player.is_traveler:
+            return None
+
+        # One representative roll per distinct event in the pool
+        pool = player.event_pool()
+        rolls: dict[int, int] = dict()
+        for roll in range(1, 101):
+            event = pool[min((roll - 1) * len(pool) // 100, len(pool) - 1)]
+            rolls.setdefault(id(event), roll)
+
+        actions = [("roll", roll) for roll in rolls.values()]
+        return self._search(player, actions)[1]
+
+    def choose_city(self, player: CPUPlayer, options: list[City]) -> City | None:
+        """Choose the city option with the best rollout score."""
+
+        if len(options) == 1:
+            return options[0]
+
+        actions = [("city", self.game.city_id(city)) for city in options]
+        return self.game.cities[self._search(player, actions)[1]]
+
+    def _search(self, player: CPUPlayer, actions: list[Action]) -> Action:
+        """Find the best action for a player within the time budget.
+
+        Args:
+            player: The deciding player.
+            actions: The candidate actions.
+
+        Returns:
+            The action with the best mean rollout score.
+        """
+
+        player_index = self.game.player_id(player)
+        if self.executor is not None:
+            stats = self._search_parallel(player_index, actions)
+        else:
+            stats = self._search_serial(player_index, actions)
+
+        return max(
+            zip(actions, stats),
+            key=lambda item: item[1][1] / item[1][0] if item[1][0] else -1.0,
+        )[0]
+
+    def _search_serial(self, player_index: int, actions: list[Action]) -> list[list]:
+        """Sample actions with UCB1 in this thread until the time budget runs out."""
+
+        stats = [[0, 0.0] for _ in actions]
+        deadline = perf_counter() + self.time_budget
+        total = 0
+        while total < self.max_rollouts and (total == 0 or perf_counter() < deadline):
+            # Try every action once before exploiting
+            index = next((i for i, (count, _) in enumerate(stats) if count == 0), None)
+            if index is None:
+                log_total = math.log(total)
+                index = max(
+                    range(len(actions)),
+                    key=lambda i: stats[i][1] / stats[i][0]
+                    + self.exploration * math.sqrt(log_total / stats[i][0]),
+                )
+
+            stats[index][0] += 1
+            stats[index][1] += rollout(self.game.fork(), player_index, actions[index], self.horizon)
+            total += 1
+
+        return stats
+
+    def _search_parallel(self, player_index: int, actions: list[Action]) -> list[list]:
+        """Spread the actions across the worker pool, one batch of rollouts each.
+
+        Actions whose batch is not back within the time budget (such as while a new process
+        pool is still starting its workers) are sampled in this thread instead, for up to
+        another time budget, so that a slow pool does not leave them unevaluated.
+        """
+
+        assert self.executor is not None
+        per_action = max(1, self.max_rollouts // len(actions))
+        futures = [
+            self.executor.submit(
+                rollout_batch,
+                self.game.fork(),
+                player_index,
+                action,
+                self.horizon,
+                self.time_budget,
+                per_action,
+            )
+            for action in actions
+        ]
+
+        # Don't wait for stragglers longer than the budget; they are cancelled or ignored
+        done, _ = wait(futures, timeout=self.time_budget)
+        stats = []
+        missing = []
+        for index, future in enumerate(futures):
+            if future in done and future.exception() is None:
+                stats.append(list(future.result()))
+            else:
+                future.cancel()
+                stats.append([0, 0.0])
+                missing.append(index)
+
+        if missing:
+            fallback = self._search_serial(player_index, [actions[index] for index in missing])
+            for index, (count, total) in zip(missing, fallback):
+                stats[index] = [count, total]
+        return stats
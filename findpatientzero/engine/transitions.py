@@ -0,0 +1,126 @@
+"""Data-driven health transitions for infected travelers."""
+
+import threading
+
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.gamedata.load import load_health_transitions
+from findpatientzero.gamedata.schema import HealthTransitionData
+
+INFECTED_STATES = (InfectionState.ASYMPTOMATIC, InfectionState.SYMPTOMATIC)
+"""Health states that progress according to the transition table."""
+
+ROLLS = 100
+"""Infected travelers roll 1 to ROLLS each round."""
+
+
+class HealthTransitions:
+    """Transition table for infected travelers, indexed by (health, rounds since infection).
+
+    The stages of the game data are compiled into one row per infected health state and
+    infection age. A row holds the roll above which the traveler infects an uninfected
+    destination city, and the traveler's new health for every possible roll, so applying a
+    transition is a pair of lookups.
+    """
+
+    max_age: int
+    """The first infection age whose row is shared by all older ages."""
+
+    _rows: dict[InfectionState, list[tuple[int, list[InfectionState]]]]
+    """The (spread threshold, new health by roll) row of each infected health state and age."""
+
+    _onset: list[float]
+    """The probability of onset for an asymptomatic traveler at each age."""
+
+    _default: "HealthTransitions | None" = None
+    """The transition table of the game data, once loaded (shared by all games, never modified)."""
+
+    _default_lock: threading.Lock = threading.Lock()
+    """Guards loading the default table, so that concurrent games load it only once."""
+
+    def __init__(self, data: HealthTransitionData) -> None:
+        """Compile a transition table from its stages.
+
+        Args:
+            data: The stages of the table (see gamedata/health_transitions.yml).
+        """
+
+        stages = data["stages"]
+        if not stages or "max_age" in stages[-1]:
+            raise ValueError("The last health transition stage must cover all remaining ages.")
+        bounds = [stage["max_age"] for stage in stages[:-1]]
+        if bounds != sorted(bounds):
+            raise ValueError("Health transition stages must be ordered by max_age.")
+        self.max_age = bounds[-1] + 1 if bounds else 0
+
+        self._rows = {health: [] for health in INFECTED_STATES}
+        for age in range(self.max_age + 1):
+            stage = next(stage for stage in stages if age <= stage.get("max_age", age))
+            outcomes = sorted(stage["outcomes"], key=lambda outcome: outcome["above"])
+            for health, row in self._rows.items():
+                by_roll = [health] * (ROLLS + 1)
+                for roll in range(1, ROLLS + 1):
+                    for outcome in outcomes:
+                        if roll > outcome["above"]:
+                            by_roll[roll] = InfectionState(outcome["health"])
+                row.append((stage["spread_above"], by_roll))
+
+        self._onset = [
+            sum(health != InfectionState.ASYMPTOMATIC for health in by_roll[1:]) / ROLLS
+            for _, by_roll in self._rows[InfectionState.ASYMPTOMATIC]
+        ]
+
+    @classmethod
+    def default(cls) -> "HealthTransitions":
+        """The transition table of the game data."""
+
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls(load_health_transitions())
+        return cls._default
+
+    def apply(self, health: InfectionState, age: int, roll: int) -> tuple[InfectionState, bool]:
+        """Look up the transition of an infected traveler.
+
+        Args:
+            health: The traveler's health (asymptomatic or symptomatic).
+            age: The number of rounds since the traveler was infected.
+            roll: The traveler's roll (1 to ROLLS).
+
+        Returns:
+            The traveler's new health, and whether they infect an uninfected destination city.
+        """
+
+        spread_above, by_roll = self._rows[health][min(age, self.max_age)]
+        return by_roll[roll], roll > spread_above
+
+    def outcome_probabilities(self, health: InfectionState, age: int) -> tuple[dict[InfectionState, float], float]:
+        """The probabilities of the transitions of an infected traveler, over all rolls.
+
+        Args:
+            health: The traveler's health (asymptomatic or symptomatic).
+            age: The number of rounds since the traveler was infected.
+
+        Returns:
+            The probability of each new health (including the current one), and the
+            probability that the traveler infects an uninfected destination city.
+        """
+
+        spread_above, by_roll = self._rows[health][min(age, self.max_age)]
+        counts: dict[InfectionState, int] = dict()
+        for new_health in by_roll[1:]:
+            counts[new_health] = counts.get(new_health, 0) + 1
+        outcomes = {new_health: count / ROLLS for new_health, count in counts.items()}
+        return outcomes, (ROLLS - min(max(spread_above, 0), ROLLS)) / ROLLS
+
+    def onset_probability(self, age: int) -> float:
+        """The probability that an asymptomatic traveler shows onset (becomes symptomatic, immune or dead).
+
+        Args:
+            age: The number of rounds since the traveler was infected.
+
+        Returns:
+            The probability over all rolls.
+        """
+
+        return self._onset[min(age, self.max_age)]
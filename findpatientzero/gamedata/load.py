@@ -1,8 +1,8 @@
-"""Load game data from YAML files."""
+"""Load game data from YAML files (and save compiled game data to them)."""
 
 import os
-from yaml import safe_load as load
 
+from findpatientzero.gamedata.shared import attached
 from findpatientzero.gamedata.schema import (
     ConditionData,
     ConditionList,
@@ -10,6 +10,8 @@ from findpatientzero.gamedata.schema import (
     EventList,
     EventTypeData,
     EventTypeList,
+    GovernorPolicyData,
+    HealthTransitionData,
     NameList,
     ConsoleTextData,
 )
@@ -19,20 +21,29 @@ _event_dir = os.path.join(_cwd, "events")
 
 
 def _load_file(file: str):
+    # Imported here so that processes attached to shared game data never load the YAML parser
+    from yaml import safe_load as load
+
     with open(file, "r", encoding="utf-8") as f:
         data = load(f)
     return data
 
 
 def load_cpu_names() -> NameList:
+    if (shared := attached()) is not None:
+        return list(shared.names("cpu_names"))
     return _load_file(os.path.join(_cwd, "cpu_names.yml"))
 
 
 def load_city_names() -> NameList:
+    if (shared := attached()) is not None:
+        return list(shared.names("city_names"))
     return _load_file(os.path.join(_cwd, "city_names.yml"))
 
 
 def load_event_types(key: str) -> list[EventTypeData]:
+    if (shared := attached()) is not None:
+        return shared.event_types(key)
     loaded: EventTypeList = _load_file(
         os.path.join(_event_dir, "event_types", f"{key}.yml")
     )
@@ -40,6 +51,8 @@ def load_event_types(key: str) -> list[EventTypeData]:
 
 
 def load_conditions(key: str) -> list[ConditionData]:
+    if (shared := attached()) is not None:
+        return shared.conditions(key)
     loaded: ConditionList = _load_file(
         os.path.join(_event_dir, "conditions", f"{key}.yml")
     )
@@ -47,9 +60,37 @@ def load_conditions(key: str) -> list[ConditionData]:
 
 
 def load_events(key: str) -> list[EventData]:
+    if (shared := attached()) is not None:
+        return shared.events(key)
     loaded: EventList = _load_file(os.path.join(_event_dir, f"{key}.yml"))
     return loaded["events"]
 
 
+def load_governor_policy() -> GovernorPolicyData:
+    if (shared := attached()) is not None:
+        return shared.governor_policy()
+    return _load_file(os.path.join(_cwd, "governor_policy.yml"))
+
+
+def load_health_transitions() -> HealthTransitionData:
+    if (shared := attached()) is not None:
+        return shared.health_transitions()
+    return _load_file(os.path.join(_cwd, "health_transitions.yml"))
+
+
+def save_governor_policy(data: GovernorPolicyData, file: str | None = None) -> None:
+    from yaml import safe_dump as dump
+
+    with open(file or os.path.join(_cwd, "governor_policy.yml"), "w", encoding="utf-8") as f:
+        dump(dict(data), f, sort_keys=False, default_flow_style=None)
+
+
+def save_events(key: str, data: list[EventData], file: str | None = None) -> None:
+    from yaml import safe_dump as dump
+
+    with open(file or os.path.join(_event_dir, f"{key}.yml"), "w", encoding="utf-8") as f:
+        dump(EventList(events=data), f, sort_keys=False, allow_unicode=True, width=120)
+
+
 def load_console_text() -> ConsoleTextData:
     return _load_file(os.path.join(_cwd, "console_dynamic_text.yml"))
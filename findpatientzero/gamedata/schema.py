@@ -40,6 +40,28 @@ class EventData(TypedDict):
 class EventList(TypedDict):
     events: Required[list[EventData]]
 
+# Define the schema for compiled governor policies
+class GovernorPolicyData(TypedDict):
+    stage_buckets: Required[list[int]]
+    since_buckets: Required[list[int]]
+    suspicious: Required[list[list[list[bool]]]]
+    epidemic: Required[list[list[str | None]]]
+
+# Define the schema for health transition tables
+class HealthOutcomeData(TypedDict):
+    above: Required[int]
+    health: Required[str]
+
+
+class HealthStageData(TypedDict):
+    max_age: NotRequired[int]
+    spread_above: Required[int]
+    outcomes: Required[list[HealthOutcomeData]]
+
+
+class HealthTransitionData(TypedDict):
+    stages: Required[list[HealthStageData]]
+
 # Schema for dynamic console text
 class ConsoleTextData(TypedDict):
     yes_no_map: dict[str, bool]
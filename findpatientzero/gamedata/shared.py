@@ -0,0 +1,393 @@
+"""Game data compiled once into a flat read-only buffer that worker processes attach to.
+
+The parent process parses the YAML game data once with `SharedGameData.create()`, which
+packs it into a buffer in shared memory (or an mmap'd file). Worker processes attach to the
+buffer instead of parsing YAML themselves, either through the environment variable set by
+`SharedGameData.publish()` (inherited by spawned workers) or through the `init_worker`
+pool initializer. Once attached, every `load_*` function in the load module reads from the
+buffer.
+
+Buffer layout (native byte order):
+    magic (4 bytes) | version (u32) | index length (u32) | JSON index | sections | string tables
+
+The JSON index only holds the offset and length of each section and string table. A section
+is the JSON encoding of one event list, or of the event types, conditions, governor policy
+or health transitions, and is decoded the first time it is read: a worker only decodes what
+it loads, and a worker that never loads anything decodes nothing. A string table is an array
+of (count + 1) u32 offsets followed by the UTF-8 bytes of its strings, so names can be read
+in place without copying.
+
+Decoded sections are private to each worker, as are the `Event` objects the engine builds
+from them; together they take about 35 KiB per worker (see
+`benchmarks/bench_shared_gamedata.py`), so only the name lists are worth reading in place.
+"""
+
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import Iterator, Sequence
+from multiprocessing import shared_memory
+
+MAGIC = b"FPZD"
+"""The magic bytes at the start of a game data buffer."""
+
+VERSION = 3
+"""The version of the buffer layout."""
+
+ENV_VAR = "FINDPATIENTZERO_GAMEDATA"
+"""The environment variable through which worker processes find the shared game data."""
+
+EVENT_KEYS = ["traveler_healthy", "traveler_infected", "city_suspicious", "city_epidemic"]
+"""The event lists included in the buffer."""
+
+PLAYER_TYPES = ["city", "traveler"]
+"""The player types whose event types and conditions are included in the buffer."""
+
+NAME_TABLES = ["cpu_names", "city_names"]
+"""The name lists included in the buffer."""
+
+_HEADER = struct.Struct("=4sII")
+
+logger = logging.getLogger(__name__)
+
+
+class StringTable(Sequence[str]):
+    """A read-only sequence of strings backed by a game data buffer."""
+
+    _offsets: memoryview
+    """The offsets of each string in the blob, plus the end offset."""
+
+    _blob: memoryview
+    """The UTF-8 bytes of the strings."""
+
+    def __init__(self, buffer: memoryview, offset: int, count: int) -> None:
+        """Create a view of a string table in a buffer.
+
+        Args:
+            buffer: The game data buffer.
+            offset: The position of the table in the buffer.
+            count: The number of strings in the table.
+        """
+
+        end = offset + 4 * (count + 1)
+        self._offsets = buffer[offset:end].cast("I")
+        self._blob = buffer[end:end + self._offsets[count]]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def release(self) -> None:
+        """Release the views of the buffer."""
+
+        self._offsets.release()
+        self._blob.release()
+
+
+class GameDataBuffer:
+    """A read-only view of packed game data."""
+
+    _buffer: memoryview
+    """The packed game data."""
+
+    _index: dict
+    """The decoded JSON index of sections and string tables."""
+
+    _sections: dict[str, object]
+    """The sections decoded so far, by name."""
+
+    _tables: dict[str, StringTable]
+    """The string tables, by name."""
+
+    def __init__(self, buffer: memoryview) -> None:
+        """Create a view of packed game data.
+
+        Args:
+            buffer: The packed game data.
+        """
+
+        magic, version, length = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compatible game data buffer.")
+
+        self._buffer = buffer
+        self._index = json.loads(str(buffer[_HEADER.size:_HEADER.size + length], "utf-8"))
+        self._sections = {}
+        self._tables = {
+            name: StringTable(buffer, offset, count)
+            for name, (offset, count) in self._index["tables"].items()
+        }
+
+    def _section(self, name: str):
+        """A section, decoded from the buffer the first time it is read."""
+
+        if name not in self._sections:
+            offset, length = self._index["sections"][name]
+            self._sections[name] = json.loads(str(self._buffer[offset:offset + length], "utf-8"))
+        return self._sections[name]
+
+    def event_types(self, key: str) -> list:
+        """The event types for a player type."""
+        return self._section(f"event_types/{key}")
+
+    def conditions(self, key: str) -> list:
+        """The conditions for a player type."""
+        return self._section(f"conditions/{key}")
+
+    def events(self, key: str) -> list:
+        """The events of an event list."""
+        return self._section(f"events/{key}")
+
+    def governor_policy(self) -> dict:
+        """The compiled CPU governor policy."""
+        return self._section("governor_policy")
+
+    def health_transitions(self) -> dict:
+        """The health transition table."""
+        return self._section("health_transitions")
+
+    def names(self, table: str) -> StringTable:
+        """A name list, read in place from the buffer."""
+        return self._tables[table]
+
+    def release(self) -> None:
+        """Release the views of the buffer, so that it can be closed."""
+
+        for table in self._tables.values():
+            table.release()
+        self._buffer.release()
+
+
+def pack_game_data() -> bytes:
+    """Parse the YAML game data and pack it into a buffer.
+
+    Returns:
+        The packed game data.
+    """
+
+    # Imported here: the load module reads from attached buffers through this module
+    from findpatientzero.gamedata import load
+
+    sections = {
+        **{f"event_types/{key}": load.load_event_types(key) for key in PLAYER_TYPES},
+        **{f"conditions/{key}": load.load_conditions(key) for key in PLAYER_TYPES},
+        **{f"events/{key}": load.load_events(key) for key in EVENT_KEYS},
+        "governor_policy": load.load_governor_policy(),
+        "health_transitions": load.load_health_transitions(),
+    }
+    names = {"cpu_names": load.load_cpu_names(), "city_names": load.load_city_names()}
+
+    # The index stores offsets, so lay out the body for a fixed-width placeholder index first
+    index = {
+        "sections": {name: [0xFFFFFFFF, 0xFFFFFFFF] for name in sections},
+        "tables": {name: [0xFFFFFFFF, len(names[name])] for name in NAME_TABLES},
+    }
+    length = len(json.dumps(index).encode("utf-8"))
+
+    body = bytearray()
+    start = _HEADER.size + length + (-(_HEADER.size + length) % 4)
+    for name, section in sections.items():
+        encoded = json.dumps(section).encode("utf-8")
+        index["sections"][name] = [start + len(body), len(encoded)]
+        body += encoded
+    body += bytes(-len(body) % 4)
+    for name in NAME_TABLES:
+        encoded = [value.encode("utf-8") for value in names[name]]
+        offsets = [0]
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        index["tables"][name] = [start + len(body), len(encoded)]
+        body += struct.pack(f"={len(offsets)}I", *offsets) + b"".join(encoded)
+        body += bytes(-len(body) % 4)
+
+    encoded_index = json.dumps(index).encode("utf-8").ljust(length)
+    header = _HEADER.pack(MAGIC, VERSION, length) + encoded_index
+    return header + bytes(start - len(header)) + bytes(body)
+
+
+class SharedGameData:
+    """Packed game data published by a parent process for its workers.
+
+    Usage:
+        with SharedGameData.create() as shared:
+            shared.publish()
+            with ProcessPoolExecutor(initializer=init_worker, initargs=(shared.spec,)) as pool:
+                ...
+    """
+
+    spec: str
+    """Where workers find the data: "shm:<name>" or "file:<path>"."""
+
+    _shm: shared_memory.SharedMemory | None
+    """The shared memory block, if the data is in shared memory."""
+
+    _path: str | None
+    """The path of the file, if the data is in an mmap'd file."""
+
+    def __init__(self, spec: str, shm: shared_memory.SharedMemory | None, path: str | None) -> None:
+        self.spec = spec
+        self._shm = shm
+        self._path = path
+
+    @classmethod
+    def create(cls, path: str | None = None) -> "SharedGameData":
+        """Pack the game data and place it in shared memory or a file.
+
+        Args:
+            path: Write the data to this file (to be mmap'd by workers) instead of shared memory.
+
+        Returns:
+            The published game data.
+        """
+
+        data = pack_game_data()
+        if path is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+            return cls(f"file:{os.path.abspath(path)}", None, path)
+
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(f"shm:{shm.name}", shm, None)
+
+    def publish(self) -> None:
+        """Make worker processes started from now on attach to this data."""
+        os.environ[ENV_VAR] = self.spec
+
+    def close(self) -> None:
+        """Stop publishing the data and release it."""
+
+        if os.environ.get(ENV_VAR) == self.spec:
+            del os.environ[ENV_VAR]
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
+            self._path = None
+
+    def __enter__(self) -> "SharedGameData":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_attached: GameDataBuffer | None = None
+"""The game data this process is attached to."""
+
+_mapping: shared_memory.SharedMemory | mmap.mmap | None = None
+"""The shared memory block or mmap backing the attached game data."""
+
+_unavailable: str | None = None
+"""The published location that could not be attached, so that it is not retried."""
+
+_attach_lock = threading.RLock()
+"""Guards attaching and detaching, so that concurrent threads attach only once."""
+
+
+def attach(spec: str) -> GameDataBuffer:
+    """Attach this process to published game data.
+
+    Shared memory blocks are tracked by the resource tracker of the process that created
+    them, so workers should be started with multiprocessing by that process (which makes
+    them share its tracker) to keep the block alive until `SharedGameData.close()`.
+
+    Args:
+        spec: Where the data is: "shm:<name>" or "file:<path>".
+
+    Returns:
+        The attached game data.
+    """
+
+    global _attached, _mapping
+
+    with _attach_lock:
+        detach()
+        kind, _, location = spec.partition(":")
+        if kind == "shm":
+            if sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=location, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=location)
+            _mapping = shm
+            buffer = shm.buf
+        elif kind == "file":
+            with open(location, "rb") as f:
+                _mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = memoryview(_mapping)
+        else:
+            raise ValueError(f"Unrecognized game data location: {spec}")
+
+        _attached = GameDataBuffer(buffer)
+        return _attached
+
+
+@atexit.register
+def detach() -> None:
+    """Detach this process from the game data it is attached to, if any."""
+
+    global _attached, _mapping
+
+    with _attach_lock:
+        if _attached is not None:
+            _attached.release()
+            _attached = None
+        if _mapping is not None:
+            _mapping.close()
+            _mapping = None
+
+
+def attached() -> GameDataBuffer | None:
+    """The game data this process is attached to, attaching through the environment if published.
+
+    If the published data can no longer be attached (its parent closed it, say), a warning is
+    logged once and the caller falls back to the YAML files.
+
+    Returns:
+        The attached game data, or None if no game data was published or it is unavailable.
+    """
+
+    global _unavailable
+
+    spec = os.environ.get(ENV_VAR)
+    if _attached is None and spec and spec != _unavailable:
+        with _attach_lock:
+            if _attached is None and spec != _unavailable:
+                try:
+                    attach(spec)
+                except (OSError, ValueError) as error:
+                    detach()
+                    _unavailable = spec
+                    logger.warning("Cannot attach to game data %s (%s), reading YAML instead.", spec, error)
+    return _attached
+
+
+def init_worker(spec: str) -> None:
+    """Process pool initializer that attaches workers to published game data.
+
+    Args:
+        spec: Where the data is: "shm:<name>" or "file:<path>".
+    """
+
+    with _attach_lock:
+        if _attached is None:
+            attach(spec)
@@ -0,0 +1,257 @@
+"""Fan-out of game updates to spectators, sharing encoded frames between viewers."""
+
+import threading
+from collections import deque
+from collections.abc import Callable
+
+from findpatientzero.engine.game import Game, GamePhase, GameState
+from findpatientzero.engine.hooks import Hook
+from findpatientzero.server.protocol import StateDelta, Visibility, diff, encode, encode_json, snapshot
+
+
+class Subscription:
+    """The frames waiting to be sent to one spectator.
+
+    Frames are encoded state deltas (see `server.protocol`), to be applied in order to a
+    `StateMirror`; the first frame is a snapshot. A subscriber that falls `max_pending`
+    frames behind has its queue coalesced into a single snapshot frame of the latest state,
+    so slow connections cost a bounded amount of memory and catch up in one frame.
+    """
+
+    visibility: Visibility
+    """What the spectator is allowed to see."""
+
+    binary: bool
+    """Whether frames are encoded as binary (otherwise as JSON text, encoded as UTF-8)."""
+
+    max_pending: int
+    """The most frames queued before they are coalesced into a snapshot."""
+
+    coalesced: int
+    """The number of frames that were replaced by snapshots."""
+
+    _frames: deque[bytes]
+    """The frames waiting to be sent, oldest first."""
+
+    _condition: threading.Condition
+    """Guards the queue, and wakes a consumer waiting for frames."""
+
+    _closed: bool
+    """Whether the broadcast ended or the spectator left."""
+
+    def __init__(self, visibility: Visibility, binary: bool, max_pending: int) -> None:
+        """Create an empty subscription (see `Broadcaster.subscribe`).
+
+        Args:
+            visibility: What the spectator is allowed to see.
+            binary: Whether frames are encoded as binary (otherwise as JSON).
+            max_pending: The most frames queued before they are coalesced into a snapshot.
+        """
+
+        self.visibility = visibility
+        self.binary = binary
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self._frames = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    @property
+    def key(self) -> tuple[Visibility, bool]:
+        """The subscriptions that share frames: their visibility and encoding."""
+        return self.visibility, self.binary
+
+    @property
+    def closed(self) -> bool:
+        """Whether the broadcast ended or the spectator left."""
+        return self._closed
+
+    def __len__(self) -> int:
+        """The number of frames waiting to be sent."""
+        with self._condition:
+            return len(self._frames)
+
+    def _push(self, frame: bytes, snapshot: Callable[[], bytes]) -> None:
+        """Queue a frame, or replace the whole queue with a snapshot if the spectator fell behind."""
+
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._frames) >= self.max_pending:
+                self.coalesced += len(self._frames) + 1
+                self._frames.clear()
+                frame = snapshot()
+            self._frames.append(frame)
+            self._condition.notify()
+
+    def get(self, timeout: float | None = None) -> bytes | None:
+        """Take the oldest waiting frame, waiting for one if there is none.
+
+        Args:
+            timeout: The most seconds to wait (forever if None).
+
+        Returns:
+            The frame, or None if the subscription is closed or the timeout expired.
+        """
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+            return self._frames.popleft() if self._frames else None
+
+    def drain(self) -> list[bytes]:
+        """Take every waiting frame without waiting.
+
+        Returns:
+            The frames, oldest first.
+        """
+
+        with self._condition:
+            frames = list(self._frames)
+            self._frames.clear()
+            return frames
+
+    def close(self) -> None:
+        """Stop receiving frames (frames already queued can still be taken)."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class Broadcaster:
+    """Sends every committed state of a game to any number of spectators.
+
+    Spectators include players who became observers, and external viewers. Each update is
+    diffed once and encoded once per visibility class and encoding that has subscribers,
+    and the same bytes are queued for every subscriber of that class. Updates are sent when
+    the game enters a phase after committing a new state (at the start of each round and at
+    the end of the game), from the game's PHASE_CHANGED hook.
+    """
+
+    game: Game
+    """The game being broadcast."""
+
+    max_pending: int
+    """The default number of frames a subscriber can fall behind before they are coalesced."""
+
+    encodings: int
+    """The number of frames encoded so far (for monitoring the fan-out)."""
+
+    _state: GameState
+    """The state the subscribers have."""
+
+    _subscriptions: list[Subscription]
+    """The open subscriptions."""
+
+    _snapshots: dict[tuple[Visibility, bool], bytes]
+    """The snapshot frame of `_state` for each subscription key, once encoded."""
+
+    _lock: threading.Lock
+    """Guards the subscriptions and the snapshot cache."""
+
+    _unsubscribe: Callable[[], None]
+    """Stops listening to the game's hooks."""
+
+    def __init__(self, game: Game, max_pending: int = 8) -> None:
+        """Start broadcasting a game.
+
+        Args:
+            game: The game to broadcast.
+            max_pending: The default number of frames a subscriber can fall behind before
+                they are coalesced into a snapshot.
+        """
+
+        self.game = game
+        self.max_pending = max_pending
+        self.encodings = 0
+        self._state = game.last_state
+        self._subscriptions = []
+        self._snapshots = dict()
+        self._lock = threading.Lock()
+        self._unsubscribe = game.hooks.subscribe(Hook.PHASE_CHANGED, self._phase_changed)
+
+    def subscribe(
+                self,
+                visibility: Visibility = Visibility.PUBLIC,
+                binary: bool = True,
+                max_pending: int | None = None,
+            ) -> Subscription:
+        """Add a spectator, whose first frame is a snapshot of the current state.
+
+        Args:
+            visibility: What the spectator is allowed to see.
+            binary: Whether to send binary frames (otherwise JSON).
+            max_pending: The number of frames the spectator can fall behind before they are
+                coalesced (defaults to the broadcaster's).
+
+        Returns:
+            The spectator's subscription.
+        """
+
+        subscription = Subscription(visibility, binary, self.max_pending if max_pending is None else max_pending)
+        with self._lock:
+            subscription._frames.append(self._snapshot(subscription.key))
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a spectator and close their subscription.
+
+        Args:
+            subscription: The spectator's subscription.
+        """
+
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+        subscription.close()
+
+    def close(self) -> None:
+        """Stop broadcasting and close every subscription."""
+
+        self._unsubscribe()
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close()
+
+    def _encode(self, delta: StateDelta, key: tuple[Visibility, bool]) -> bytes:
+        """Encode a delta for the subscriptions with a key."""
+
+        visibility, binary = key
+        self.encodings += 1
+        delta = delta.redact(visibility)
+        return encode(delta) if binary else encode_json(delta).encode()
+
+    def _snapshot(self, key: tuple[Visibility, bool]) -> bytes:
+        """The snapshot frame of the current state for a key (the caller holds the lock)."""
+
+        frame = self._snapshots.get(key)
+        if frame is None:
+            frame = self._snapshots[key] = self._encode(snapshot(self.game), key)
+        return frame
+
+    def _phase_changed(self, game: Game, previous: GamePhase, phase: GamePhase) -> None:
+        """Broadcast the newly committed state, if there is one."""
+        if game.last_state is not self._state:
+            self.publish()
+
+    def publish(self) -> None:
+        """Send the changes since the last update to every subscriber."""
+
+        state = self.game.last_state
+        with self._lock:
+            delta = diff(self.game, self._state, state)
+            self._state = state
+            self._snapshots = dict()
+            frames: dict[tuple[Visibility, bool], bytes] = dict()
+            for subscription in self._subscriptions:
+                key = subscription.key
+                frame = frames.get(key)
+                if frame is None:
+                    frame = frames[key] = self._encode(delta, key)
+                subscription._push(frame, lambda: self._snapshot(key))
+            self._subscriptions = [
+                subscription for subscription in self._subscriptions if not subscription.closed
+            ]
@@ -0,0 +1,507 @@
+"""State deltas between committed game states, and their wire encodings for remote clients.
+
+A server sends a client one `StateDelta` per committed state instead of the whole state:
+only the fields of the players and cities that changed, with players and cities identified
+by their IDs. Deltas are redacted per viewer before they are encoded, as compact binary
+(varint-packed) or as JSON for clients that cannot decode binary.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.event import EVENTS, NULL_EVENT, Event
+from findpatientzero.engine.entities.player import InfectionState, PlayerRole, PlayerState
+from findpatientzero.engine.game import Game, GameState
+from findpatientzero.gamedata.load import load_conditions
+
+PROTOCOL_VERSION = 1
+"""The version of the binary encoding (its first byte)."""
+
+PLAYER_FIELDS = ("health", "role", "city", "event")
+"""The player state fields sent to clients, in wire order."""
+
+CITY_FIELDS = ("infection_stage", "alerted", "lockdown", "infection_pause", "conditions", "event")
+"""The city state fields sent to clients, in wire order."""
+
+_PLAYER_BITS = {name: 1 << bit for bit, name in enumerate(PLAYER_FIELDS)}
+"""The bit of each player field in the field mask."""
+
+_CITY_BITS = {name: 1 << bit for bit, name in enumerate(CITY_FIELDS)}
+"""The bit of each city field in the field mask."""
+
+_HEALTH = list(InfectionState)
+"""Health states in wire order."""
+
+_ROLES = list(PlayerRole)
+"""Player roles in wire order."""
+
+
+class Visibility(Enum):
+    """What a viewer of a game is allowed to see."""
+
+    PUBLIC = "Public"
+    """Players and spectators: no health states, no infection stages and no Patient Zero."""
+
+    GAME_MASTER = "Game master"
+    """Everything."""
+
+
+@dataclass
+class StateDelta:
+    """What changed between two committed states of a game.
+
+    Players and cities are identified by their IDs, and only the fields that changed are
+    listed. City fields hold city IDs (None for no city), and event fields hold events of
+    the event catalogue (see `event_catalogue`).
+    """
+
+    round: int
+    """The round of the newer state."""
+
+    players: dict[int, dict[str, Any]] = field(default_factory=dict)
+    """The changed fields of each changed player, by player ID."""
+
+    cities: dict[int, dict[str, Any]] = field(default_factory=dict)
+    """The changed fields of each changed city, by city ID."""
+
+    patient_zero: int | None = None
+    """The ID of Patient Zero (only in snapshots for game masters)."""
+
+    def redact(self, visibility: Visibility) -> "StateDelta":
+        """The delta as a viewer is allowed to see it.
+
+        Args:
+            visibility: What the viewer is allowed to see.
+
+        Returns:
+            This delta for game masters, otherwise a copy without health states, city
+            infection stages or Patient Zero.
+        """
+
+        if visibility == Visibility.GAME_MASTER:
+            return self
+        players = dict()
+        for player_id, fields in self.players.items():
+            public = {name: value for name, value in fields.items() if name != "health"}
+            if public:
+                players[player_id] = public
+        cities = dict()
+        for city_id, fields in self.cities.items():
+            public = {name: value for name, value in fields.items() if name != "infection_stage"}
+            if public:
+                cities[city_id] = public
+        return StateDelta(self.round, players, cities)
+
+
+_catalogue: tuple[list[Event], dict[int, int], list[str], dict[str, int]] | None = None
+"""The event catalogue, the index of each event by identity, and the same for city conditions."""
+
+_catalogue_lock = threading.Lock()
+"""Guards building the catalogues, so that concurrent servers build them only once."""
+
+
+def _catalogues() -> tuple[list[Event], dict[int, int], list[str], dict[str, int]]:
+    """Build the event and condition catalogues on first use."""
+
+    global _catalogue
+    if _catalogue is None:
+        with _catalogue_lock:
+            if _catalogue is None:
+                events = [Event(), NULL_EVENT]
+                seen = {id(event) for event in events}
+                for category_events in EVENTS.values():
+                    for event in category_events:
+                        # Frequent events are repeated in EVENTS
+                        if id(event) not in seen:
+                            seen.add(id(event))
+                            events.append(event)
+                conditions = [condition["name"] for condition in load_conditions("city")]
+                _catalogue = (
+                    events,
+                    {id(event): index for index, event in enumerate(events)},
+                    conditions,
+                    {name: index for index, name in enumerate(conditions)},
+                )
+    return _catalogue
+
+
+def event_catalogue() -> list[Event]:
+    """Every event a state can hold, in wire order (the same on both ends, as they share the game data).
+
+    Index 0 is the empty event of a new state and index 1 is NULL_EVENT.
+    """
+    return _catalogues()[0]
+
+
+def _event_index(event: Event) -> int:
+    """The index of an event in the catalogue (by identity, or by value for copies)."""
+    events, indexes, _, _ = _catalogues()
+    index = indexes.get(id(event))
+    if index is None:
+        index = events.index(event)
+    return index
+
+
+def _player_fields(state: PlayerState, city_ids: dict[City, int]) -> dict[str, Any]:
+    """The fields of a player state sent to clients."""
+    return {
+        "health": state.health,
+        "role": state.role,
+        "city": None if state.city is None else city_ids[state.city],
+        "event": state.event,
+    }
+
+
+def _city_fields(state: CityState) -> dict[str, Any]:
+    """The fields of a city state sent to clients."""
+    return {
+        "infection_stage": state.infection_stage,
+        "alerted": state.alerted,
+        "lockdown": state.lockdown,
+        "infection_pause": state.infection_pause,
+        "conditions": list(state.conditions),
+        "event": state.event,
+    }
+
+
+def _changed(old: dict[str, Any] | None, new: dict[str, Any]) -> dict[str, Any]:
+    """The fields whose value differs between two states (all of them if there is no old state)."""
+    if old is None:
+        return new
+    # Events are compared by identity: states share the catalogue's event objects
+    return {
+        name: value for name, value in new.items()
+        if (old[name] is not value if name == "event" else old[name] != value)
+    }
+
+
+def diff(game: Game, old: GameState | None, new: GameState) -> StateDelta:
+    """Compute what changed between two committed states of a game.
+
+    A committed state only holds the players whose state changed that round, so players
+    missing from `new` are unchanged, and players missing from `old` are sent in full.
+
+    Args:
+        game: The game the states belong to (for player and city IDs).
+        old: The state the client has, or None to send every field of `new`.
+        new: The newer state.
+
+    Returns:
+        The delta, with Patient Zero included when `old` is None.
+    """
+
+    city_ids = {city: game.city_id(city) for city in game.cities}
+    delta = StateDelta(new.round)
+    for player, state in new.players.items():
+        old_state = None if old is None else old.players.get(player)
+        fields = _changed(
+            None if old_state is None else _player_fields(old_state, city_ids),
+            _player_fields(state, city_ids),
+        )
+        if fields:
+            delta.players[game.player_id(player)] = fields
+    for city, state in new.cities.items():
+        old_state = None if old is None else old.cities.get(city)
+        fields = _changed(None if old_state is None else _city_fields(old_state), _city_fields(state))
+        if fields:
+            delta.cities[city_ids[city]] = fields
+    if old is None:
+        delta.patient_zero = game.player_id(game.patient_zero)
+    return delta
+
+
+def snapshot(game: Game) -> StateDelta:
+    """Every field of the current state of a game (for clients that join mid-game).
+
+    Args:
+        game: The game.
+
+    Returns:
+        The current state as a delta from nothing.
+    """
+
+    state = GameState(
+        round=game.last_state.round,
+        players={player: player.state for player in game.players},
+        cities={city: city.state for city in game.cities},
+    )
+    return diff(game, None, state)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 varint."""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """Read an unsigned LEB128 varint, returning it and the offset after it."""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_optional(out: bytearray, value: int | None) -> None:
+    """Append an optional ID as a varint (0 for None)."""
+    _write_varint(out, 0 if value is None else value + 1)
+
+
+def _read_optional(data: bytes, offset: int) -> tuple[int | None, int]:
+    """Read an optional ID written by `_write_optional`."""
+    value, offset = _read_varint(data, offset)
+    return (None if value == 0 else value - 1), offset
+
+
+def _write_conditions(out: bytearray, conditions: list[str]) -> None:
+    """Append a list of city conditions as catalogue indexes."""
+    indexes = _catalogues()[3]
+    _write_varint(out, len(conditions))
+    for condition in conditions:
+        index = indexes.get(condition)
+        if index is not None:
+            _write_varint(out, index + 1)
+        else:
+            # Conditions outside the game data are sent as text
+            text = condition.encode()
+            _write_varint(out, 0)
+            _write_varint(out, len(text))
+            out += text
+
+
+def _read_conditions(data: bytes, offset: int) -> tuple[list[str], int]:
+    """Read a list of city conditions written by `_write_conditions`."""
+    names = _catalogues()[2]
+    count, offset = _read_varint(data, offset)
+    conditions = []
+    for _ in range(count):
+        index, offset = _read_varint(data, offset)
+        if index:
+            conditions.append(names[index - 1])
+        else:
+            length, offset = _read_varint(data, offset)
+            conditions.append(data[offset:offset + length].decode())
+            offset += length
+    return conditions, offset
+
+
+def encode(delta: StateDelta) -> bytes:
+    """Encode a delta as compact binary.
+
+    The layout is the protocol version, the round, Patient Zero (0 for none, ID + 1
+    otherwise), then the players and the cities: a count, and for each entity its ID, a
+    bit mask of the fields that follow (in `PLAYER_FIELDS` or `CITY_FIELDS` order) and
+    their values. Every integer is an unsigned LEB128 varint, so most values take one byte.
+
+    Args:
+        delta: The delta to encode.
+
+    Returns:
+        The encoded delta.
+    """
+
+    out = bytearray((PROTOCOL_VERSION,))
+    _write_varint(out, delta.round)
+    _write_optional(out, delta.patient_zero)
+
+    _write_varint(out, len(delta.players))
+    for player_id, fields in delta.players.items():
+        _write_varint(out, player_id)
+        _write_varint(out, sum(_PLAYER_BITS[name] for name in fields))
+        if "health" in fields:
+            _write_varint(out, _HEALTH.index(fields["health"]))
+        if "role" in fields:
+            _write_varint(out, _ROLES.index(fields["role"]))
+        if "city" in fields:
+            _write_optional(out, fields["city"])
+        if "event" in fields:
+            _write_varint(out, _event_index(fields["event"]))
+
+    _write_varint(out, len(delta.cities))
+    for city_id, fields in delta.cities.items():
+        _write_varint(out, city_id)
+        _write_varint(out, sum(_CITY_BITS[name] for name in fields))
+        for name in ("infection_stage", "alerted", "lockdown", "infection_pause"):
+            if name in fields:
+                _write_varint(out, int(fields[name]))
+        if "conditions" in fields:
+            _write_conditions(out, fields["conditions"])
+        if "event" in fields:
+            _write_varint(out, _event_index(fields["event"]))
+    return bytes(out)
+
+
+def decode(data: bytes) -> StateDelta:
+    """Decode a delta encoded by `encode`.
+
+    Args:
+        data: The encoded delta.
+
+    Returns:
+        The delta.
+
+    Raises:
+        ValueError: If the data was encoded with another protocol version.
+    """
+
+    if not data or data[0] != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported state delta protocol version: {data[:1]!r}.")
+    events = event_catalogue()
+    game_round, offset = _read_varint(data, 1)
+    patient_zero, offset = _read_optional(data, offset)
+    delta = StateDelta(game_round, patient_zero=patient_zero)
+
+    count, offset = _read_varint(data, offset)
+    for _ in range(count):
+        player_id, offset = _read_varint(data, offset)
+        mask, offset = _read_varint(data, offset)
+        fields: dict[str, Any] = dict()
+        if mask & 1:
+            value, offset = _read_varint(data, offset)
+            fields["health"] = _HEALTH[value]
+        if mask & 2:
+            value, offset = _read_varint(data, offset)
+            fields["role"] = _ROLES[value]
+        if mask & 4:
+            fields["city"], offset = _read_optional(data, offset)
+        if mask & 8:
+            value, offset = _read_varint(data, offset)
+            fields["event"] = events[value]
+        delta.players[player_id] = fields
+
+    count, offset = _read_varint(data, offset)
+    for _ in range(count):
+        city_id, offset = _read_varint(data, offset)
+        mask, offset = _read_varint(data, offset)
+        fields = dict()
+        for bit, name in enumerate(CITY_FIELDS[:4]):
+            if mask & 1 << bit:
+                value, offset = _read_varint(data, offset)
+                fields[name] = bool(value) if name == "alerted" else value
+        if mask & 16:
+            fields["conditions"], offset = _read_conditions(data, offset)
+        if mask & 32:
+            value, offset = _read_varint(data, offset)
+            fields["event"] = events[value]
+        delta.cities[city_id] = fields
+    return delta
+
+
+def _to_wire(name: str, value: Any) -> Any:
+    """A field value as JSON."""
+    if name == "event":
+        return _event_index(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _from_wire(name: str, value: Any) -> Any:
+    """A field value from JSON."""
+    if name == "event":
+        return event_catalogue()[value]
+    if name == "health":
+        return InfectionState(value)
+    if name == "role":
+        return PlayerRole(value)
+    return value
+
+
+def encode_json(delta: StateDelta) -> str:
+    """Encode a delta as JSON (for clients that cannot decode binary).
+
+    Enums are sent as their values and events as their index in the event catalogue.
+
+    Args:
+        delta: The delta to encode.
+
+    Returns:
+        The encoded delta.
+    """
+
+    data: dict[str, Any] = {
+        "round": delta.round,
+        "players": {
+            player_id: {name: _to_wire(name, value) for name, value in fields.items()}
+            for player_id, fields in delta.players.items()
+        },
+        "cities": {
+            city_id: {name: _to_wire(name, value) for name, value in fields.items()}
+            for city_id, fields in delta.cities.items()
+        },
+    }
+    if delta.patient_zero is not None:
+        data["patient_zero"] = delta.patient_zero
+    return json.dumps(data, separators=(",", ":"))
+
+
+def decode_json(text: str) -> StateDelta:
+    """Decode a delta encoded by `encode_json`.
+
+    Args:
+        text: The encoded delta.
+
+    Returns:
+        The delta.
+    """
+
+    data = json.loads(text)
+    return StateDelta(
+        data["round"],
+        {
+            int(player_id): {name: _from_wire(name, value) for name, value in fields.items()}
+            for player_id, fields in data["players"].items()
+        },
+        {
+            int(city_id): {name: _from_wire(name, value) for name, value in fields.items()}
+            for city_id, fields in data["cities"].items()
+        },
+        data.get("patient_zero"),
+    )
+
+
+class StateMirror:
+    """A client's copy of a game's state, kept up to date by applying deltas."""
+
+    round: int
+    """The round of the latest applied delta."""
+
+    players: dict[int, dict[str, Any]]
+    """The known fields of each player, by player ID."""
+
+    cities: dict[int, dict[str, Any]]
+    """The known fields of each city, by city ID."""
+
+    patient_zero: int | None
+    """The ID of Patient Zero, if the client may know it."""
+
+    def __init__(self) -> None:
+        self.round = 0
+        self.players = dict()
+        self.cities = dict()
+        self.patient_zero = None
+
+    def apply(self, delta: StateDelta) -> None:
+        """Apply the changes of a delta.
+
+        Args:
+            delta: The delta, starting with a snapshot.
+        """
+
+        self.round = delta.round
+        for player_id, fields in delta.players.items():
+            self.players.setdefault(player_id, dict()).update(fields)
+        for city_id, fields in delta.cities.items():
+            self.cities.setdefault(city_id, dict()).update(fields)
+        if delta.patient_zero is not None:
+            self.patient_zero = delta.patient_zero
@@ -0,0 +1,543 @@
+"""An LRU store of game sessions that evicts idle games to disk and reloads them on demand."""
+
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.event import NULL_EVENT
+from findpatientzero.engine.game import Game
+from findpatientzero.engine.governor import GovernorPolicy
+from findpatientzero.engine.transitions import HealthTransitions
+from findpatientzero.server.protocol import event_catalogue
+
+
+def _shared_objects() -> dict[Any, Any]:
+    """The immutable game data objects that games share, by persistent ID.
+
+    Games compare some of these by identity (such as NULL_EVENT), so a reloaded game must
+    refer to the loaded objects rather than to copies.
+    """
+
+    shared: dict[Any, Any] = {("event", index): event for index, event in enumerate(event_catalogue())}
+    shared["null_event"] = NULL_EVENT
+    if GovernorPolicy._default is not None:
+        shared["governor_policy"] = GovernorPolicy._default
+    if HealthTransitions._default is not None:
+        shared["health_transitions"] = HealthTransitions._default
+    return shared
+
+
+class _GamePickler(pickle.Pickler):
+    """Pickles a game, writing references to the shared game data instead of copies."""
+
+    def __init__(self, file: io.BytesIO, shared: dict[int, Any]) -> None:
+        """Create a pickler.
+
+        Args:
+            file: The file to write to.
+            shared: The persistent ID of each shared object, by object identity.
+        """
+
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._shared = shared
+
+    def persistent_id(self, obj: Any) -> Any:
+        """The persistent ID of a shared object (None to pickle the object itself)."""
+        return self._shared.get(id(obj))
+
+
+class _GameUnpickler(pickle.Unpickler):
+    """Unpickles a game written by `_GamePickler`."""
+
+    def persistent_load(self, pid: Any) -> Any:
+        """The loaded shared object with a persistent ID."""
+        if pid == "governor_policy":
+            return GovernorPolicy.default()
+        if pid == "health_transitions":
+            return HealthTransitions.default()
+        if pid == "null_event":
+            return NULL_EVENT
+        _, index = pid
+        return event_catalogue()[index]
+
+
+def dump_game(game: Game) -> bytes:
+    """Serialize a game, keeping references to the shared game data.
+
+    Args:
+        game: The game (hook subscribers are not serialized).
+
+    Returns:
+        The serialized game.
+    """
+
+    shared = {id(obj): key for key, obj in _shared_objects().items()}
+    buffer = io.BytesIO()
+    _GamePickler(buffer, shared).dump(game)
+    return buffer.getvalue()
+
+
+def load_game(data: bytes) -> Game:
+    """Deserialize a game serialized by `dump_game` (only load data this server wrote).
+
+    Args:
+        data: The serialized game.
+
+    Returns:
+        The game.
+    """
+    return _GameUnpickler(io.BytesIO(data)).load()
+
+
+@dataclass
+class SessionMetrics:
+    """Counters of a session store."""
+
+    hits: int = 0
+    """Lookups of sessions that were in memory."""
+
+    misses: int = 0
+    """Lookups of sessions that had to be reloaded from disk."""
+
+    evictions: int = 0
+    """Sessions written to disk and removed from memory."""
+
+    resident_sessions: int = 0
+    """Sessions in memory."""
+
+    resident_bytes: int = 0
+    """The estimated memory of the sessions in memory (see `SessionStore`)."""
+
+    evicted_sessions: int = 0
+    """Sessions on disk."""
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups served from memory (0 if there were none)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+ROUND_BYTES_PER_ENTITY = 60
+"""The initial estimate of how much a game grows per round, per player and city (measured on
+all-CPU games of 10 to 70 players and cities), until the store has measured its own games."""
+
+
+@dataclass
+class _Session:
+    """A game held in memory."""
+
+    game: Game
+    """The game."""
+
+    last_used: float
+    """When the game was last looked up (in `time.monotonic` seconds)."""
+
+    size: int
+    """The estimated memory of the game: its measured size, plus its growth in the rounds played since."""
+
+    measured_size: int
+    """The serialized size of the game when it was stored or reloaded."""
+
+    measured_round: int
+    """The round of the game when it was measured."""
+
+    estimated_round: int
+    """The round of the game when its size was last estimated."""
+
+    users: int = 0
+    """The number of requests using the game (see `SessionStore.use`); a game in use is never evicted."""
+
+
+class SessionStore:
+    """Games by session ID, with idle games evicted to disk and reloaded on their next use.
+
+    Sessions are kept in least recently used order. `evict_idle` writes the sessions that
+    were not used for `idle_seconds` to disk, and storing, looking up or submitting to a
+    session evicts the least recently used ones while the resident size is over
+    `max_resident_bytes`. A game that a request is using (see `use`), or whose hooks have
+    subscribers (such as spectators or prompt deadlines), is in use, and is never evicted.
+
+    The resident size is estimated from the serialized size of each game, measured when it
+    is stored or reloaded, plus the rounds played since then (counted whenever the session
+    is looked up or submitted to) times the bytes a round adds per player and city. That
+    rate is learned from the growth of the games the store evicts (serializing resident
+    games again just to measure them would cost more than the estimate is worth).
+
+    Games are read, written and (de)serialized outside the store's lock, so reloading or
+    evicting a session does not block the others. While a session is in transit to or from
+    disk, other requests for it wait until it arrives.
+
+    The store is thread-safe, but games are not: callers must not use a game concurrently,
+    must change games only within `use` (or through `submit_responses`), so that a game is
+    not written to disk halfway through a change, and must look it up again for every
+    request instead of keeping it, since a game that was evicted is reloaded as a new object.
+    """
+
+    directory: str
+    """The directory evicted games are written to."""
+
+    idle_seconds: float
+    """How long a session can be unused before `evict_idle` writes it to disk."""
+
+    max_resident_bytes: int | None
+    """The estimated memory above which the least recently used sessions are evicted (no limit if None)."""
+
+    metrics: SessionMetrics
+    """The counters of the store."""
+
+    _sessions: "OrderedDict[str, _Session]"
+    """The sessions in memory, least recently used first."""
+
+    _evicted: set[str]
+    """The IDs of the sessions on disk."""
+
+    _in_transit: set[str]
+    """The IDs of the sessions being written to or read from disk (neither in memory nor on disk)."""
+
+    _growth_bytes: int
+    """The growth of the evicted games since they were measured."""
+
+    _growth_units: int
+    """The rounds played by the evicted games since they were measured, times their players and cities."""
+
+    _lock: threading.Lock
+    """Guards the sessions, the growth measurements and the metrics."""
+
+    _arrived: threading.Condition
+    """Notified when sessions finish their transit to or from disk."""
+
+    def __init__(self, directory: str, idle_seconds: float = 300.0, max_resident_bytes: int | None = None) -> None:
+        """Create an empty store.
+
+        Args:
+            directory: The directory evicted games are written to (created if needed).
+            idle_seconds: How long a session can be unused before `evict_idle` writes it to disk.
+            max_resident_bytes: The estimated memory above which the least recently used
+                sessions are evicted (no limit if None).
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.idle_seconds = idle_seconds
+        self.max_resident_bytes = max_resident_bytes
+        self.metrics = SessionMetrics()
+        self._sessions = OrderedDict()
+        self._evicted = set()
+        self._in_transit = set()
+        self._growth_bytes = 0
+        self._growth_units = 0
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+
+    def __contains__(self, session_id: str) -> bool:
+        """Whether a session is stored, in memory or on disk."""
+        with self._lock:
+            return session_id in self._sessions or session_id in self._evicted or session_id in self._in_transit
+
+    def __len__(self) -> int:
+        """The number of sessions, in memory or on disk."""
+        with self._lock:
+            return len(self._sessions) + len(self._evicted) + len(self._in_transit)
+
+    def _path(self, session_id: str) -> str:
+        """The file of an evicted session (named by a hash, so any session ID is a safe name)."""
+        digest = hashlib.sha256(session_id.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.game")
+
+    def put(self, session_id: str, game: Game) -> None:
+        """Store a game as the most recently used session.
+
+        Args:
+            session_id: The ID of the session (replaced if it exists).
+            game: The game.
+        """
+
+        size = len(dump_game(game))
+        with self._lock:
+            self._wait_for(session_id)
+            self._discard(session_id)
+            self._add(session_id, game, size)
+            victims = self._claim_over_limit()
+        self._evict_claimed(victims)
+
+    def get(self, session_id: str) -> Game:
+        """Look up a game, reloading it from disk if it was evicted.
+
+        The game is not pinned: to change it while other threads use the store, look it up
+        with `use` instead, so that it cannot be evicted halfway through the change.
+
+        Args:
+            session_id: The ID of the session.
+
+        Returns:
+            The game.
+
+        Raises:
+            KeyError: If there is no such session.
+        """
+        return self._acquire(session_id, pin=False).game
+
+    @contextmanager
+    def use(self, session_id: str) -> Iterator[Game]:
+        """Look up a game and keep it in memory while it is used, reloading it if it was evicted.
+
+        Usage:
+            with store.use(session_id) as game:
+                game.submit_responses(responses)
+
+        Args:
+            session_id: The ID of the session.
+
+        Yields:
+            The game, which is not evicted until the block exits.
+
+        Raises:
+            KeyError: If there is no such session.
+        """
+
+        session = self._acquire(session_id, pin=True)
+        try:
+            yield session.game
+        finally:
+            with self._lock:
+                session.users -= 1
+                if self._sessions.get(session_id) is not session:
+                    # Replaced or removed while in use
+                    return
+                self._estimate(session)
+                victims = self._claim_over_limit()
+            self._evict_claimed(victims)
+
+    def _acquire(self, session_id: str, pin: bool) -> _Session:
+        """Look up a session, reloading it from disk if it was evicted.
+
+        Args:
+            session_id: The ID of the session.
+            pin: Whether to count the caller as a user of the game (see `use`).
+
+        Returns:
+            The session.
+
+        Raises:
+            KeyError: If there is no such session.
+        """
+
+        with self._lock:
+            self._wait_for(session_id)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self.metrics.hits += 1
+                session.last_used = time.monotonic()
+                if pin:
+                    session.users += 1
+                self._sessions.move_to_end(session_id)
+                self._estimate(session)
+                victims = self._claim_over_limit()
+            elif session_id not in self._evicted:
+                raise KeyError(session_id)
+            else:
+                self._evicted.remove(session_id)
+                self.metrics.evicted_sessions -= 1
+                self._in_transit.add(session_id)
+        if session is not None:
+            self._evict_claimed(victims)
+            return session
+
+        path = self._path(session_id)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            game = load_game(data)
+        except BaseException:
+            with self._lock:
+                self._in_transit.remove(session_id)
+                self._evicted.add(session_id)
+                self.metrics.evicted_sessions += 1
+                self._arrived.notify_all()
+            raise
+        os.remove(path)
+
+        with self._lock:
+            self._in_transit.remove(session_id)
+            self.metrics.misses += 1
+            session = self._add(session_id, game, len(data))
+            if pin:
+                session.users += 1
+            self._arrived.notify_all()
+            victims = self._claim_over_limit()
+        self._evict_claimed(victims)
+        return session
+
+    def submit_responses(self, session_id: str, responses: Mapping[int, bool | int | City], advance: bool = True) -> bool:
+        """Submit prompt responses to a session's game, reloading it if it was evicted.
+
+        The game is kept in memory until the responses are applied (see `use`).
+
+        Args:
+            session_id: The ID of the session.
+            responses: The responses, by player ID (see `Game.submit_responses`).
+            advance: Whether to move to the next phase once every prompt is answered.
+
+        Returns:
+            True if the game moved to the next phase.
+        """
+
+        with self.use(session_id) as game:
+            return game.submit_responses(responses, advance)
+
+    def remove(self, session_id: str) -> None:
+        """Forget a session, in memory or on disk.
+
+        Args:
+            session_id: The ID of the session.
+        """
+
+        with self._lock:
+            self._wait_for(session_id)
+            self._discard(session_id)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Write every session that was not used for `idle_seconds` to disk.
+
+        Args:
+            now: The current `time.monotonic` time (read from the clock if not given).
+
+        Returns:
+            The number of sessions evicted.
+        """
+
+        cutoff = (time.monotonic() if now is None else now) - self.idle_seconds
+        with self._lock:
+            idle = [
+                session_id for session_id, session in self._sessions.items()
+                if session.last_used <= cutoff
+            ]
+            victims = [victim for victim in map(self._claim, idle) if victim is not None]
+        return self._evict_claimed(victims)
+
+    def _wait_for(self, session_id: str) -> None:
+        """Wait until a session is not in transit to or from disk (the caller holds the lock)."""
+        while session_id in self._in_transit:
+            self._arrived.wait()
+
+    def _round_bytes(self, game: Game) -> float:
+        """The estimated growth of a game per round (the caller holds the lock)."""
+
+        if not game.config.keep_history:
+            return 0.0
+        rate = self._growth_bytes / self._growth_units if self._growth_units else ROUND_BYTES_PER_ENTITY
+        return rate * (len(game.players) + len(game.cities))
+
+    def _estimate(self, session: _Session) -> None:
+        """Add the growth of a game in the rounds played since its last estimate (the caller holds the lock)."""
+
+        rounds = session.game.round - session.estimated_round
+        if rounds > 0:
+            size = session.measured_size + round(
+                (session.game.round - session.measured_round) * self._round_bytes(session.game)
+            )
+            self.metrics.resident_bytes += size - session.size
+            session.size = size
+            session.estimated_round = session.game.round
+
+    def _add(self, session_id: str, game: Game, size: int) -> _Session:
+        """Add a session to memory as the most recently used (the caller holds the lock)."""
+
+        session = self._sessions[session_id] = _Session(game, time.monotonic(), size, size, game.round, game.round)
+        self.metrics.resident_sessions += 1
+        self.metrics.resident_bytes += size
+        return session
+
+    def _discard(self, session_id: str) -> None:
+        """Remove a session from memory and disk (the caller holds the lock, and the session is not in transit)."""
+
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.metrics.resident_sessions -= 1
+            self.metrics.resident_bytes -= session.size
+        if session_id in self._evicted:
+            self._evicted.remove(session_id)
+            self.metrics.evicted_sessions -= 1
+            os.remove(self._path(session_id))
+
+    def _claim(self, session_id: str) -> tuple[str, _Session] | None:
+        """Take a session out of memory to be written to disk (the caller holds the lock).
+
+        Returns:
+            The session, or None if the game is in use and was kept in memory.
+        """
+
+        session = self._sessions[session_id]
+        if session.users or session.game.hooks.active:
+            return None
+        del self._sessions[session_id]
+        self._in_transit.add(session_id)
+        self.metrics.resident_sessions -= 1
+        self.metrics.resident_bytes -= session.size
+        return session_id, session
+
+    def _claim_over_limit(self) -> list[tuple[str, _Session]]:
+        """Claim the least recently used sessions while over the memory limit (the caller holds the lock)."""
+
+        victims: list[tuple[str, _Session]] = []
+        if self.max_resident_bytes is None:
+            return victims
+        for session_id in list(self._sessions)[:-1]:
+            if self.metrics.resident_bytes <= self.max_resident_bytes:
+                break
+            victim = self._claim(session_id)
+            if victim is not None:
+                victims.append(victim)
+        return victims
+
+    def _evict_claimed(self, victims: list[tuple[str, _Session]]) -> int:
+        """Write claimed sessions to disk (without holding the lock).
+
+        Args:
+            victims: The sessions claimed by `_claim`.
+
+        Returns:
+            The number of sessions evicted.
+        """
+
+        for index, (session_id, session) in enumerate(victims):
+            try:
+                data = dump_game(session.game)
+                descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(descriptor, "wb") as file:
+                    file.write(data)
+                os.replace(temporary, self._path(session_id))
+            except BaseException:
+                # Keep the games that were not written in memory
+                with self._lock:
+                    for session_id, session in victims[index:]:
+                        self._in_transit.remove(session_id)
+                        self._sessions[session_id] = session
+                        self._sessions.move_to_end(session_id, last=False)
+                        self.metrics.resident_sessions += 1
+                        self.metrics.resident_bytes += session.size
+                    self._arrived.notify_all()
+                raise
+
+            with self._lock:
+                units = (session.game.round - session.measured_round) * (len(session.game.players) + len(session.game.cities))
+                if units > 0 and session.game.config.keep_history:
+                    self._growth_bytes += len(data) - session.measured_size
+                    self._growth_units += units
+                self._in_transit.remove(session_id)
+                self._evicted.add(session_id)
+                self.metrics.evictions += 1
+                self.metrics.evicted_sessions += 1
+                self._arrived.notify_all()
+        return len(victims)
@@ -0,0 +1,510 @@
+"""Search for event frequencies and game parameters that make all-CPU games hit target metrics.
+
+The optimizer runs Nelder-Mead over a vector of event frequencies (the `frequency` fields of
+`gamedata/events/*.yml`) and integer `GameConfig` parameters. Every candidate plays the same
+seeds (common random numbers), so the loss is a deterministic function of the candidate and
+differences between candidates are not drowned in sampling noise. Frequencies and parameters
+are integers: the simplex moves through real vectors that are rounded into candidates, and
+each candidate is played once and cached (optionally in a file, so that runs can resume).
+
+The event data is parsed once, when the event module is imported (worker processes attached
+to shared game data do not parse it at all); candidates only repeat the already built events
+by their frequencies.
+
+Run `python -m findpatientzero.simulation.balance --help` from the repository root for the
+command line interface.
+"""
+
+import argparse
+import json
+import math
+import os
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import repeat
+
+from findpatientzero.engine.entities.event import EVENT_FREQUENCIES, Event, EventCategory, repeat_events
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.gamedata.load import load_events, save_events
+from findpatientzero.gamedata.shared import SharedGameData, init_worker
+from findpatientzero.simulation.runner import GameResult, game_seed, play_game
+from findpatientzero.simulation.sweep import config_to_data
+
+CATEGORIES = tuple(EVENT_FREQUENCIES)
+"""The event categories, in the order of candidate frequency vectors."""
+
+PARAMETERS = ("suspicious_cooldown", "lockdown_duration", "survey_threshold")
+"""The `GameConfig` parameters that can be searched."""
+
+
+@dataclass(frozen=True)
+class BalanceTargets:
+    """The metrics that balanced games should reach.
+
+    The loss of a candidate is the sum of the squared errors of its metrics: relative for
+    the game length, absolute for the death rate (which is already a fraction).
+    """
+
+    rounds: float | None = None
+    """The target mean game length in rounds (not targeted if None)."""
+
+    death_rate: float | None = None
+    """The target mean fraction of players who die (not targeted if None)."""
+
+    def loss(self, rounds: float, death_rate: float) -> float:
+        """The loss of a candidate's metrics.
+
+        Args:
+            rounds: The mean game length in rounds.
+            death_rate: The mean fraction of players who died.
+
+        Returns:
+            The loss (0 if every target is met).
+        """
+
+        loss = 0.0
+        if self.rounds is not None:
+            loss += ((rounds - self.rounds) / self.rounds) ** 2
+        if self.death_rate is not None:
+            loss += (death_rate - self.death_rate) ** 2
+        return loss
+
+    def loss_interval(self, rounds: tuple[float, float], death_rate: tuple[float, float]) -> tuple[float, float]:
+        """The range of the loss over confidence intervals of a candidate's metrics.
+
+        Args:
+            rounds: The interval of the mean game length in rounds.
+            death_rate: The interval of the mean fraction of players who died.
+
+        Returns:
+            The lowest and highest loss of any metrics within the intervals.
+        """
+
+        low, high = 0.0, 0.0
+        for target, (lowest, highest), scale in (
+                    (self.rounds, rounds, self.rounds),
+                    (self.death_rate, death_rate, 1.0),
+                ):
+            if target is None:
+                continue
+            errors = [((bound - target) / scale) ** 2 for bound in (lowest, highest)]
+            if not lowest <= target <= highest:
+                low += min(errors)
+            high += max(errors)
+        return low, high
+
+
+@dataclass(frozen=True)
+class BalanceCandidate:
+    """Event frequencies and game parameters to evaluate."""
+
+    frequencies: tuple[tuple[int, ...], ...]
+    """The frequency of every event of each category (in the order of `CATEGORIES` and of the data files)."""
+
+    parameters: tuple[tuple[str, int], ...] = ()
+    """The values of the searched `GameConfig` parameters, by name."""
+
+    @classmethod
+    def default(cls, config: GameConfig | None = None, parameters: Iterable[str] = ()) -> "BalanceCandidate":
+        """The frequencies of the game data, and the parameters of a configuration.
+
+        Args:
+            config: The configuration to take the parameters from.
+            parameters: The names of the parameters to include.
+
+        Returns:
+            The candidate.
+        """
+
+        return cls(
+            tuple(tuple(frequency for _, frequency in EVENT_FREQUENCIES[category]) for category in CATEGORIES),
+            tuple(sorted((name, getattr(config, name)) for name in parameters)),
+        )
+
+    @property
+    def feasible(self) -> bool:
+        """Whether games can be played: players must still have an event to roll once their last one is removed."""
+        return all(sum(frequencies) >= 2 for frequencies in self.frequencies)
+
+    def events(self) -> dict[EventCategory, list[Event]]:
+        """The event lists of the candidate, including repeats based on frequency."""
+
+        return repeat_events({
+            category: [(event, frequency) for (event, _), frequency in zip(EVENT_FREQUENCIES[category], frequencies)]
+            for category, frequencies in zip(CATEGORIES, self.frequencies)
+        })
+
+    def config(self, base: GameConfig) -> GameConfig:
+        """A configuration that plays with the candidate's events and parameters.
+
+        Args:
+            base: The configuration of everything that is not searched.
+
+        Returns:
+            The configuration.
+        """
+        return replace(base, events=self.events(), **dict(self.parameters))
+
+    def to_data(self) -> dict:
+        """Serialize the candidate for a cache file."""
+        return {"frequencies": [list(frequencies) for frequencies in self.frequencies], "parameters": dict(self.parameters)}
+
+    @classmethod
+    def from_data(cls, data: dict) -> "BalanceCandidate":
+        """Deserialize a candidate from a cache file."""
+        return cls(
+            tuple(tuple(frequencies) for frequencies in data["frequencies"]),
+            tuple(sorted(data["parameters"].items())),
+        )
+
+
+@dataclass
+class BalanceSpace:
+    """The searched coordinates of candidates, and how real vectors are rounded into candidates."""
+
+    base: BalanceCandidate
+    """The candidate whose unsearched coordinates every candidate keeps."""
+
+    categories: tuple[EventCategory, ...] = CATEGORIES
+    """The event categories whose frequencies are searched."""
+
+    bounds: dict[str, tuple[int, int]] = field(default_factory=dict)
+    """The lowest and highest value of each searched parameter."""
+
+    max_frequency: int = 20
+    """The highest frequency of an event."""
+
+    def encode(self, candidate: BalanceCandidate) -> list[float]:
+        """The searched coordinates of a candidate."""
+
+        parameters = dict(candidate.parameters)
+        vector = [
+            float(frequency)
+            for category in self.categories
+            for frequency in candidate.frequencies[CATEGORIES.index(category)]
+        ]
+        return vector + [float(parameters[name]) for name in self.bounds]
+
+    def decode(self, vector: list[float]) -> BalanceCandidate:
+        """The candidate nearest to a vector, within bounds.
+
+        Args:
+            vector: The searched coordinates.
+
+        Returns:
+            The candidate.
+        """
+
+        frequencies = list(self.base.frequencies)
+        position = 0
+        for category in self.categories:
+            index = CATEGORIES.index(category)
+            count = len(frequencies[index])
+            frequencies[index] = tuple(
+                min(max(round(value), 0), self.max_frequency) for value in vector[position:position + count]
+            )
+            position += count
+        parameters = dict(self.base.parameters)
+        for (name, (low, high)), value in zip(self.bounds.items(), vector[position:]):
+            parameters[name] = min(max(round(value), low), high)
+        return BalanceCandidate(tuple(frequencies), tuple(sorted(parameters.items())))
+
+
+@dataclass
+class BalanceEvaluation:
+    """The metrics of a candidate over the optimizer's games."""
+
+    candidate: BalanceCandidate
+    """The candidate."""
+
+    games: int
+    """The number of games played."""
+
+    rounds: float
+    """The mean game length in rounds."""
+
+    death_rate: float
+    """The mean fraction of players who died."""
+
+    loss: float
+    """The loss against the optimizer's targets (infinite for infeasible candidates)."""
+
+
+def play_candidate(base: GameConfig, candidate: BalanceCandidate, seeds: list[int], max_round: int) -> list[GameResult]:
+    """Play all-CPU games with a candidate's events and parameters.
+
+    Args:
+        base: The configuration of everything that is not searched.
+        candidate: The candidate.
+        seeds: The seeds of the games.
+        max_round: The round at which an unfinished game is stopped.
+
+    Returns:
+        The result of each game.
+    """
+
+    config = candidate.config(base)
+    return [play_game(config, seed, max_round) for seed in seeds]
+
+
+class BalanceOptimizer:
+    """Nelder-Mead search over candidates, with cached evaluations on common random numbers."""
+
+    def __init__(
+                self,
+                base: GameConfig,
+                targets: BalanceTargets,
+                space: BalanceSpace,
+                games: int = 200,
+                max_round: int = 200,
+                seed: int = 0,
+                executor: Executor | None = None,
+                cache_path: str | None = None,
+            ) -> None:
+        """Create an optimizer.
+
+        Args:
+            base: The configuration of everything that is not searched.
+            targets: The metrics to reach.
+            space: The searched coordinates.
+            games: The number of games played per candidate (the same seeds for every candidate).
+            max_round: The round at which an unfinished game is stopped.
+            seed: The seed from which the seeds of the games are derived.
+            executor: Plays the games of the candidates in parallel if given.
+            cache_path: A file of evaluations to resume from and append to (evaluations of
+                other settings in the file are ignored).
+        """
+
+        self.base = base
+        self.targets = targets
+        self.space = space
+        self.games = games
+        self.max_round = max_round
+        self.executor = executor
+        self.cache_path = cache_path
+        self.seeds = [game_seed(seed, index) for index in range(games)]
+        self.history: list[BalanceEvaluation] = []
+        self._setting = json.dumps([config_to_data(base), games, max_round, seed], sort_keys=True)
+        self._cache: dict[BalanceCandidate, tuple[float, float]] = dict()
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    data = json.loads(line)
+                    if data["setting"] == self._setting:
+                        self._cache[BalanceCandidate.from_data(data["candidate"])] = (data["rounds"], data["death_rate"])
+
+    @property
+    def simulated(self) -> int:
+        """The number of distinct candidates played (including those loaded from the cache file)."""
+        return len(self._cache)
+
+    def _evaluation(self, candidate: BalanceCandidate) -> BalanceEvaluation:
+        rounds, death_rate = self._cache[candidate]
+        evaluation = BalanceEvaluation(candidate, self.games, rounds, death_rate, self.targets.loss(rounds, death_rate))
+        self.history.append(evaluation)
+        return evaluation
+
+    def evaluate_many(self, candidates: list[BalanceCandidate]) -> list[BalanceEvaluation]:
+        """Evaluate candidates, playing the games of all the uncached ones at once.
+
+        Args:
+            candidates: The candidates.
+
+        Returns:
+            The evaluation of each candidate.
+        """
+
+        pending = list(dict.fromkeys(
+            candidate for candidate in candidates if candidate.feasible and candidate not in self._cache
+        ))
+        if pending:
+            chunk = max(1, self.games // 8) if self.executor is not None else self.games
+            batches = [(candidate, self.seeds[start:start + chunk]) for candidate in pending for start in range(0, self.games, chunk)]
+            mapper = map if self.executor is None else self.executor.map
+            results: dict[BalanceCandidate, list[GameResult]] = {candidate: [] for candidate in pending}
+            for (candidate, _), games in zip(batches, mapper(
+                        play_candidate, repeat(self.base), *zip(*batches), repeat(self.max_round)
+                    )):
+                results[candidate].extend(games)
+
+            lines = []
+            for candidate, games in results.items():
+                rounds = sum(game.rounds for game in games) / len(games)
+                death_rate = sum(game.deaths for game in games) / (len(games) * self.base.num_players)
+                self._cache[candidate] = (rounds, death_rate)
+                lines.append(json.dumps({
+                    "setting": self._setting, "candidate": candidate.to_data(),
+                    "rounds": rounds, "death_rate": death_rate,
+                }))
+            if self.cache_path is not None:
+                with open(self.cache_path, "a", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in lines))
+
+        evaluations = []
+        for candidate in candidates:
+            if candidate.feasible:
+                evaluations.append(self._evaluation(candidate))
+            else:
+                evaluations.append(BalanceEvaluation(candidate, 0, math.nan, math.nan, math.inf))
+        return evaluations
+
+    def evaluate(self, candidate: BalanceCandidate) -> BalanceEvaluation:
+        """Evaluate a candidate (see `evaluate_many`)."""
+        return self.evaluate_many([candidate])[0]
+
+    def optimize(self, start: BalanceCandidate | None = None, max_evaluations: int = 100, step: float = 1.0) -> BalanceEvaluation:
+        """Search for the candidate with the lowest loss.
+
+        Nelder-Mead with the standard coefficients (reflection 1, expansion 2, contraction
+        and shrinking 1/2). The search stops once `max_evaluations` distinct candidates
+        were played, or once every vertex of the simplex rounds to the same candidate.
+
+        Args:
+            start: The first candidate (defaults to the base candidate of the space).
+            max_evaluations: The most distinct candidates to play.
+            step: The initial size of the simplex along each coordinate.
+
+        Returns:
+            The best evaluation.
+
+        Raises:
+            ValueError: If no feasible candidate was evaluated (see `best`).
+        """
+
+        space = self.space
+        x0 = space.encode(start or space.base)
+        simplex = [x0] + [
+            [value + (step if i == j else 0.0) for j, value in enumerate(x0)] for i in range(len(x0))
+        ]
+        losses = [evaluation.loss for evaluation in self.evaluate_many([space.decode(x) for x in simplex])]
+
+        def loss(x: list[float]) -> float:
+            return self.evaluate(space.decode(x)).loss
+
+        while self.simulated < max_evaluations:
+            order = sorted(range(len(simplex)), key=losses.__getitem__)
+            simplex = [simplex[i] for i in order]
+            losses = [losses[i] for i in order]
+            if len({space.decode(x) for x in simplex}) == 1:
+                break
+
+            centroid = [sum(values) / (len(simplex) - 1) for values in zip(*simplex[:-1])]
+            worst = simplex[-1]
+            reflected = [c + (c - w) for c, w in zip(centroid, worst)]
+            reflected_loss = loss(reflected)
+            if reflected_loss < losses[0]:
+                expanded = [c + 2 * (c - w) for c, w in zip(centroid, worst)]
+                expanded_loss = loss(expanded)
+                if expanded_loss < reflected_loss:
+                    simplex[-1], losses[-1] = expanded, expanded_loss
+                else:
+                    simplex[-1], losses[-1] = reflected, reflected_loss
+                continue
+            if reflected_loss < losses[-2]:
+                simplex[-1], losses[-1] = reflected, reflected_loss
+                continue
+
+            # Contract towards the better of the worst vertex and its reflection
+            outside = reflected_loss < losses[-1]
+            towards = reflected if outside else worst
+            contracted = [c + (t - c) / 2 for c, t in zip(centroid, towards)]
+            contracted_loss = loss(contracted)
+            if contracted_loss < min(reflected_loss, losses[-1]):
+                simplex[-1], losses[-1] = contracted, contracted_loss
+                continue
+
+            # Shrink every vertex towards the best one
+            best = simplex[0]
+            simplex = [best] + [[b + (v - b) / 2 for b, v in zip(best, x)] for x in simplex[1:]]
+            losses = [losses[0]] + [
+                evaluation.loss for evaluation in self.evaluate_many([space.decode(x) for x in simplex[1:]])
+            ]
+
+        return self.best()
+
+    def best(self) -> BalanceEvaluation:
+        """The evaluation with the lowest loss so far.
+
+        Raises:
+            ValueError: If no feasible candidate was evaluated (infeasible candidates play no
+                games and are not kept in `history`).
+        """
+
+        if not self.history:
+            raise ValueError(
+                "No feasible candidate was evaluated: every candidate leaves a category with fewer than two events."
+            )
+        return min(self.history, key=lambda evaluation: evaluation.loss)
+
+
+def write_candidate(candidate: BalanceCandidate, directory: str) -> None:
+    """Write a candidate's event tables (and parameters) as YAML game data files.
+
+    The event files have the layout of `gamedata/events/*.yml`, with the candidate's
+    frequencies; the parameters are written to `config.yml`.
+
+    Args:
+        candidate: The candidate.
+        directory: The directory to write the files to.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    for category, frequencies in zip(CATEGORIES, candidate.frequencies):
+        events = [dict(event, frequency=frequency) for event, frequency in zip(load_events(category.key), frequencies)]
+        save_events(category.key, events, os.path.join(directory, f"{category.key}.yml"))
+    if candidate.parameters:
+        from yaml import safe_dump as dump
+
+        with open(os.path.join(directory, "config.yml"), "w", encoding="utf-8") as f:
+            dump(dict(candidate.parameters), f, sort_keys=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--cities", type=int, default=6)
+    parser.add_argument("--cpu-governors", action="store_true")
+    parser.add_argument("--rounds", type=float, help="target mean game length")
+    parser.add_argument("--death-rate", type=float, help="target mean fraction of players who die")
+    parser.add_argument("--categories", nargs="+", choices=[category.key for category in CATEGORIES],
+                        help="event categories to search (default all)")
+    parser.add_argument("--parameters", nargs="*", choices=PARAMETERS, default=[],
+                        help="game parameters to search (between 0 and 6, survey_threshold between 1 and 11)")
+    parser.add_argument("--games", type=int, default=200, help="games per candidate")
+    parser.add_argument("--max-evaluations", type=int, default=100)
+    parser.add_argument("--step", type=float, default=2.0, help="initial simplex size, in frequency units")
+    parser.add_argument("--max-round", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", help="file of evaluations to resume from and append to")
+    parser.add_argument("--output", default="balance", help="directory for the best candidate's YAML files")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 to play in this process)")
+    args = parser.parse_args()
+    if args.rounds is None and args.death_rate is None:
+        parser.error("give at least one of --rounds and --death-rate")
+
+    base = GameConfig(num_players=args.players, num_cities=args.cities, cpu_governors=args.cpu_governors)
+    space = BalanceSpace(
+        BalanceCandidate.default(base, args.parameters),
+        tuple(category for category in CATEGORIES if args.categories is None or category.key in args.categories),
+        {name: (1, 11) if name == "survey_threshold" else (0, 6) for name in args.parameters},
+    )
+    optimizer = BalanceOptimizer(
+        base, BalanceTargets(args.rounds, args.death_rate), space,
+        games=args.games, max_round=args.max_round, seed=args.seed, cache_path=args.cache,
+    )
+    if args.workers > 0:
+        with SharedGameData.create() as shared, ProcessPoolExecutor(
+                    args.workers, initializer=init_worker, initargs=(shared.spec,)
+                ) as optimizer.executor:
+            start = optimizer.evaluate(space.base)
+            best = optimizer.optimize(max_evaluations=args.max_evaluations, step=args.step)
+    else:
+        start = optimizer.evaluate(space.base)
+        best = optimizer.optimize(max_evaluations=args.max_evaluations, step=args.step)
+
+    print(f"{optimizer.simulated} candidates played, {args.games} games each")
+    for label, evaluation in (("Game data", start), ("Best", best)):
+        print(f"  {label:<10} rounds {evaluation.rounds:6.2f}  death rate {evaluation.death_rate:6.2%}  loss {evaluation.loss:.4f}")
+    write_candidate(best.candidate, args.output)
+    print(f"Wrote the best candidate to {args.output}")
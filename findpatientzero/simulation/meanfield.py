@@ -0,0 +1,876 @@
+"""A mean-field approximation of all-CPU games, for instant estimates on large maps.
+
+Instead of playing games, the model propagates expected values round by round: the
+distribution of every city's infection stage (and whether it is alerted), and the expected
+number of healthy, asymptomatic and symptomatic travelers in every city. It follows the
+order of `Game.resolve_moves`, with the event tables, the survey detection curve and the
+health transition table as its inputs.
+
+The approximations are:
+
+- Everything in a city is independent of everything else: travelers arrive in an infected
+  city with the probability that the city is infected, whoever they are, and governors,
+  pauses and lockdowns are spread evenly over the cities.
+- The ages of infected travelers are independent of where they are, so every infected
+  traveler follows the average transition of their health state.
+- Events are rolled from the whole event table, ignoring the rule that a player cannot
+  roll the same event twice in a row, and CPU governors always roll a Suspicious event
+  when they can and never use the compiled policy to pick their roll.
+- Whether an ungoverned city can survey again is spread over its cooldown, as a rate.
+
+Run `python -m benchmarks.bench_meanfield` from the repository root to measure its error
+against the full engine.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field, replace
+
+from findpatientzero.engine.entities.city import City
+from findpatientzero.engine.entities.event import EVENTS, Event, EventCategory
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.transitions import INFECTED_STATES, HealthTransitions
+
+CONDITIONS = ("harbor", "road", "merch")
+"""The conditions that block moves between cities (all of them are set by a lockdown)."""
+
+MAX_STAGE = City.MAX_INFECTION_STAGE
+
+_OUTCOMES = (InfectionState.ASYMPTOMATIC, InfectionState.SYMPTOMATIC, InfectionState.IMMUNE, InfectionState.DEAD)
+"""The health states infected travelers can move to, in the order of the transition tuples."""
+
+
+def _detection(stage: int, advantage: bool = False) -> float:
+    """The probability that a survey detects the infection of a city at a stage."""
+    miss = 1 - City.SURVEY_THRESHOLDS[stage] / 100
+    return 1 - miss * miss if advantage else 1 - miss
+
+
+def _rotate(values: list[float], offset: int) -> list[float]:
+    """Move every value `offset` cities forward on the map (wrapping around)."""
+    offset %= len(values)
+    return values[-offset:] + values[:-offset] if offset else values
+
+
+@dataclass(frozen=True)
+class _Window:
+    """The cities a model tracks one by one.
+
+    Cities that no traveler could have reached from Patient Zero's city by moving (rather
+    than by choosing a city) are all in the same state, so the model tracks a window of the
+    map around that city, plus one background city that stands for every city outside it.
+    Per-city values are lists with an entry for each city of the window (from its first
+    city) followed by the background entry, or an entry for every city of the map once the
+    window covers it.
+    """
+
+    num_cities: int
+    """The number of cities on the map."""
+
+    start: int
+    """The first city of the window, relative to Patient Zero's city (negative if before it)."""
+
+    size: int
+    """The number of cities in the window."""
+
+    @property
+    def background(self) -> bool:
+        """Whether there are cities outside the window."""
+        return self.size < self.num_cities
+
+    def widen(self, left: int, right: int) -> "_Window":
+        """The window extended by a number of cities on each side (the whole map once it covers it)."""
+        if not self.background or self.size + left + right >= self.num_cities:
+            return _Window(self.num_cities, 0, self.num_cities)
+        return _Window(self.num_cities, self.start - left, self.size + left + right)
+
+    def adapt(self, values: list[float], previous: "_Window") -> list[float]:
+        """Lay out the values of a smaller window for this window.
+
+        Args:
+            values: The values, laid out for `previous`.
+            previous: A window that this window contains.
+
+        Returns:
+            The values, laid out for this window.
+        """
+
+        if not previous.background:
+            return values
+        background = values[-1]
+        if self.background:
+            left = previous.start - self.start
+            right = self.size - previous.size - left
+            return [background] * left + values[:-1] + [background] * (right + 1)
+        expanded = [background] * self.num_cities
+        for index in range(previous.size):
+            expanded[(previous.start + index) % self.num_cities] = values[index]
+        return expanded
+
+    def rotate(self, values: list[float], offset: int) -> list[float]:
+        """Move every value `offset` cities forward on the map (see `_rotate`)."""
+
+        if not self.background:
+            return _rotate(values, offset)
+        offset %= self.num_cities
+        if offset > self.num_cities // 2:
+            offset -= self.num_cities
+        background = values[-1]
+        if abs(offset) >= self.size:
+            return [background] * (self.size + 1)
+        if offset >= 0:
+            return [background] * offset + values[:self.size - offset] + [background]
+        return values[-offset:self.size] + [background] * (1 - offset)
+
+    def total(self, values: list[float]) -> float:
+        """The sum of the values of every city on the map."""
+        if not self.background:
+            return sum(values)
+        return sum(values) + (self.num_cities - self.size - 1) * values[-1]
+
+
+@dataclass
+class TravelerTable:
+    """The moves of a traveler event table, as probabilities."""
+
+    moves: dict[tuple[int, str | None], float]
+    """The probability of moving by each offset with each condition (offsets that wrap to 0 are stays)."""
+
+    offsets: dict[int, float]
+    """The probability of moving by each offset, whatever the condition."""
+
+    choose: float
+    """The probability of choosing any unalerted city."""
+
+    @classmethod
+    def from_events(cls, events: list[Event], num_cities: int) -> "TravelerTable":
+        """Count the moves of an event table.
+
+        Args:
+            events: The events of the table, repeated by frequency.
+            num_cities: The number of cities on the map.
+
+        Returns:
+            The table.
+        """
+
+        moves: dict[tuple[int, str | None], float] = dict()
+        offsets: dict[int, float] = dict()
+        choose = 0.0
+        for event in events:
+            if event.action == "choose":
+                choose += 1 / len(events)
+            elif event.action == "move" and event.amount % num_cities != 0:
+                key = (event.amount % num_cities, event.condition)
+                moves[key] = moves.get(key, 0.0) + 1 / len(events)
+                offsets[key[0]] = offsets.get(key[0], 0.0) + 1 / len(events)
+        return cls(moves, offsets, choose)
+
+    def reach(self, num_cities: int) -> tuple[int, int]:
+        """The number of cities a move can go back and forward on the map (choices excluded)."""
+        signed = [offset - num_cities if offset > num_cities // 2 else offset for offset in self.offsets]
+        return max([0, *(-offset for offset in signed)]), max([0, *signed])
+
+
+@dataclass
+class CityTable:
+    """The outcomes of a city event table, as probabilities."""
+
+    pause: dict[int, float]
+    """The probability of pausing the infection for each number of rounds."""
+
+    rollback: dict[int, float]
+    """The probability of rolling the infection back by each number of stages."""
+
+    survey: float
+    """The probability of a survey."""
+
+    survey_advantage: float
+    """The probability of a survey with advantage."""
+
+    lockdown: float
+    """The probability of a lockdown."""
+
+    conditions: dict[str, float]
+    """The probability of each condition (other than a lockdown)."""
+
+    @classmethod
+    def from_events(cls, events: list[Event]) -> "CityTable":
+        """Count the outcomes of an event table.
+
+        Args:
+            events: The events of the table, repeated by frequency.
+
+        Returns:
+            The table.
+        """
+
+        table = cls(dict(), dict(), 0.0, 0.0, 0.0, {condition: 0.0 for condition in CONDITIONS})
+        for event in events:
+            p = 1 / len(events)
+            if event.action == "pause":
+                table.pause[event.amount] = table.pause.get(event.amount, 0.0) + p
+            elif event.action == "rollback":
+                table.rollback[event.amount] = table.rollback.get(event.amount, 0.0) + p
+            elif event.action.startswith("survey"):
+                if event.action.endswith("adv"):
+                    table.survey_advantage += p
+                else:
+                    table.survey += p
+            if event.condition == "lockdown":
+                table.lockdown += p
+            elif event.condition in table.conditions:
+                table.conditions[event.condition] += p
+        return table
+
+
+@dataclass
+class MeanFieldRound:
+    """The expected state of a game at the end of a round."""
+
+    round: int
+    """The round."""
+
+    health: dict[InfectionState, float]
+    """The expected fraction of players in each health state."""
+
+    infected_cities: float
+    """The expected number of infected cities."""
+
+    alerted_cities: float
+    """The expected number of alerted cities."""
+
+    unalerted: list[list[float]] = field(repr=False)
+    """The probability that each city is unalerted at each stage (by stage, then city)."""
+
+    alerted: list[list[float]] = field(repr=False)
+    """The probability that each city is alerted at each stage (by stage, then city)."""
+
+    window: _Window = field(repr=False)
+    """The layout of the per-city values."""
+
+    @property
+    def stages(self) -> list[float]:
+        """The expected infection stage of each city, counted from Patient Zero's first city."""
+
+        stages = [0.0] * len(self.unalerted[0])
+        for stage in range(1, MAX_STAGE + 1):
+            stages = [
+                total + stage * (u + a)
+                for total, u, a in zip(stages, self.unalerted[stage], self.alerted[stage])
+            ]
+        return _Window(self.window.num_cities, 0, self.window.num_cities).adapt(stages, self.window)
+
+    @property
+    def mean_stage(self) -> float:
+        """The expected infection stage over all cities."""
+        total = self.window.total
+        return sum(
+            stage * (total(self.unalerted[stage]) + total(self.alerted[stage]))
+            for stage in range(1, MAX_STAGE + 1)
+        ) / self.window.num_cities
+
+
+class MeanFieldModel:
+    """Expected all-CPU games of a configuration, propagated without playing them.
+
+    Cities are numbered from the city where Patient Zero starts, in game order, so the
+    expected stage of each city describes how the epidemic spreads from its origin.
+    """
+
+    config: GameConfig
+    """The configuration of the games."""
+
+    transitions: HealthTransitions
+    """How infected travelers progress."""
+
+    _healthy: TravelerTable
+    """The moves of travelers who do not show symptoms."""
+
+    _infected: TravelerTable
+    """The moves of symptomatic travelers."""
+
+    _suspicious: CityTable
+    """The outcomes of Suspicious events."""
+
+    _epidemic: CityTable
+    """The outcomes of Epidemic events."""
+
+    _outcomes: dict[InfectionState, list[tuple[float, ...]]]
+    """The probability of each new health (in `_OUTCOMES` order) followed by the probability
+    of spreading the infection, for each infected health state at each age."""
+
+    def __init__(
+                self,
+                config: GameConfig,
+                events: dict[EventCategory, list[Event]] | None = None,
+                transitions: HealthTransitions | None = None,
+            ) -> None:
+        """Create a model.
+
+        Args:
+            config: The configuration of the games.
+            events: The event tables, repeated by frequency (defaults to the configuration's tables).
+            transitions: How infected travelers progress (defaults to the configuration's table).
+        """
+
+        events = events or config.events or EVENTS
+        self.config = config
+        self.transitions = transitions or config.health_transitions or HealthTransitions.default()
+        self._healthy = TravelerTable.from_events(events[EventCategory.TRAV_HEALTHY], config.num_cities)
+        self._infected = TravelerTable.from_events(events[EventCategory.TRAV_INFECTED], config.num_cities)
+        self._suspicious = CityTable.from_events(events[EventCategory.CITY_SUSPICIOUS])
+        self._epidemic = CityTable.from_events(events[EventCategory.CITY_EPIDEMIC])
+        self._outcomes = dict()
+        for health in INFECTED_STATES:
+            self._outcomes[health] = list()
+            for age in range(self.transitions.max_age + 1):
+                probabilities, spread = self.transitions.outcome_probabilities(health, age)
+                self._outcomes[health].append(tuple(probabilities.get(outcome, 0.0) for outcome in _OUTCOMES) + (spread,))
+
+    def _move(
+                self,
+                window: _Window,
+                counts: list[float],
+                table: TravelerTable,
+                locked: list[float] | None,
+                conditions: dict[str, list[float]] | None,
+                open_cities: list[float],
+            ) -> tuple[list[float], list[float]]:
+        """Move travelers by the events of a table.
+
+        Args:
+            window: The layout of the per-city values.
+            counts: The expected number of travelers in each city.
+            table: The table the travelers roll on.
+            locked: The probability that each city is in lockdown (None if none can be).
+            conditions: The probability of each condition in each city (None if there are none).
+            open_cities: The probability that each city is unalerted (and can be chosen).
+
+        Returns:
+            The probability that a traveler in each city stays there (in lockdown, with a stay
+            event or with a blocked move), and the expected number of travelers who move
+            into each city.
+        """
+
+        n = len(counts)
+        staying = 1 - sum(table.offsets.values()) - table.choose
+        if locked is None:
+            unlocked = [1.0] * n
+            free = counts
+        else:
+            unlocked = [1 - lock for lock in locked]
+            free = [count * u for count, u in zip(counts, unlocked)]
+        stay = [1 - u + u * staying for u in unlocked]
+        arrivals = [0.0] * n
+
+        if conditions is None:
+            for offset, p in table.offsets.items():
+                arrivals = [arrived + p * count for arrived, count in zip(arrivals, window.rotate(free, offset))]
+        else:
+            for (offset, condition), p in table.moves.items():
+                if condition is None:
+                    arrivals = [arrived + p * count for arrived, count in zip(arrivals, window.rotate(free, offset))]
+                    continue
+                # The condition must be in neither the city left nor the destination
+                clear = [1 - c for c in conditions[condition]]
+                allowed = [source * dest for source, dest in zip(clear, window.rotate(clear, -offset))]
+                moving = [count * a for count, a in zip(free, allowed)]
+                arrivals = [arrived + p * count for arrived, count in zip(arrivals, window.rotate(moving, offset))]
+                stay = [s + p * u * (1 - a) for s, u, a in zip(stay, unlocked, allowed)]
+
+        if table.choose:
+            total = window.total(open_cities)
+            if total > 0:
+                choosing = table.choose * window.total(free) / total
+                arrivals = [arrived + choosing * weight for arrived, weight in zip(arrivals, open_cities)]
+            else:
+                stay = [s + table.choose * u for s, u in zip(stay, unlocked)]
+        return stay, arrivals
+
+    def _transition_rates(self, ages: dict[InfectionState, list[float]]) -> dict[InfectionState, tuple[float, ...]]:
+        """The average transition of the infected travelers of each health state.
+
+        Args:
+            ages: The expected number of infected travelers of each health state, by age.
+
+        Returns:
+            The probability of each new health (in `_OUTCOMES` order) followed by the
+            probability of spreading the infection, for each infected health state.
+        """
+
+        rates: dict[InfectionState, tuple[float, ...]] = dict()
+        for health in INFECTED_STATES:
+            total = sum(ages[health])
+            if total <= 0:
+                rates[health] = tuple(float(outcome == health) for outcome in _OUTCOMES) + (0.0,)
+                continue
+            average = [0.0] * (len(_OUTCOMES) + 1)
+            for age, count in enumerate(ages[health]):
+                if count > 0:
+                    average = [x + p * count / total for x, p in zip(average, self._outcomes[health][age])]
+            rates[health] = tuple(average)
+        return rates
+
+    def run(self, rounds: int) -> list[MeanFieldRound]:
+        """Propagate the expected state of the games.
+
+        Travelers are tracked jointly with the infection of their city (a pair approximation):
+        a healthy traveler who stays in a city was already exposed to it, and an infected
+        traveler who stays is usually in a city they already infected, so only travelers who
+        move meet cities independently of their past.
+
+        Args:
+            rounds: The number of rounds to play.
+
+        Returns:
+            The expected state at the end of every round, starting with the setup (round 0).
+        """
+
+        config = self.config
+        n = config.num_cities
+        players = config.num_players
+        cooldown = max(1, config.suspicious_cooldown)
+        tables = {
+            InfectionState.HEALTHY: self._healthy,
+            InfectionState.ASYMPTOMATIC: self._healthy,
+            InfectionState.SYMPTOMATIC: self._infected,
+        }
+
+        reaches = [table.reach(n) for table in (self._healthy, self._infected)]
+        left = max(back for back, _ in reaches)
+        right = max(forward for _, forward in reaches)
+
+        # Patient Zero starts in city 0 (the window) and the other players are dealt evenly.
+        # For each health state, the expected number of travelers in each city that is
+        # uninfected (index 0) or infected (index 1), jointly with the infection of the city.
+        window = _Window(n, 0, 1)
+        zeros = [0.0, 0.0]
+        others = (players - 1) / (n - 1) if players <= n else players / n
+        travelers = {
+            InfectionState.HEALTHY: ([0.0 if players <= n else others - 1, others], zeros),
+            InfectionState.ASYMPTOMATIC: ([1.0, 0.0], zeros),
+            InfectionState.SYMPTOMATIC: (zeros, zeros),
+        }
+        ages = {health: [0.0] * (self.transitions.max_age + 1) for health in INFECTED_STATES}
+        ages[InfectionState.ASYMPTOMATIC][1] = 1.0
+        immune = dead = 0.0
+
+        ones = [1.0, 1.0]
+        unalerted = [ones] + [zeros] * MAX_STAGE
+        alerted = [zeros] * (MAX_STAGE + 1)
+        max_pause = max([0, *self._suspicious.pause, *self._epidemic.pause])
+        pauses = [ones] + [zeros] * max_pause
+        lockdowns = [ones] + [zeros] * config.lockdown_duration
+        conditions = {condition: zeros for condition in CONDITIONS}
+
+        results = [self._result(0, window, travelers, immune, dead, unalerted, alerted)]
+        for game_round in range(1, rounds + 1):
+            # Widen the window to every city travelers can move to this round
+            if window.background:
+                previous, window = window, window.widen(left, right)
+                new_zeros = window.adapt(zeros, previous)
+
+                def adapt(values: list[float]) -> list[float]:
+                    return new_zeros if values is zeros else window.adapt(values, previous)
+
+                travelers = {health: (adapt(clear), adapt(infected)) for health, (clear, infected) in travelers.items()}
+                unalerted, alerted, pauses, lockdowns = (
+                    [adapt(row) for row in rows] for rows in (unalerted, alerted, pauses, lockdowns)
+                )
+                conditions = {condition: adapt(values) for condition, values in conditions.items()}
+                zeros = new_zeros
+
+            governed = min(1.0, dead / n) if config.cpu_governors else 0.0
+            was_alerted = [sum(column) for column in zip(*(row for row in alerted if row is not zeros))] or zeros
+            was_clear = [u + a for u, a in zip(unalerted[0], alerted[0])]
+            locked = None if governed == 0 and not any(map(any, lockdowns[1:])) else [1 - l for l in lockdowns[0]]
+            blocking = None if locked is None and not any(map(any, conditions.values())) else conditions
+
+            # Update the cities (surveys, pauses, rollbacks and lockdowns, then progression)
+            unalerted, alerted = list(unalerted), list(alerted)
+            unpaused = pauses[0]
+            auto_survey = [(1 - governed) * z / cooldown for z in unpaused]
+            for stage in range(max(1, config.survey_threshold), MAX_STAGE + 1):
+                if unalerted[stage] is zeros:
+                    continue
+                rate = _detection(stage)
+                detected = [u * rate * s for u, s in zip(unalerted[stage], auto_survey)]
+                unalerted[stage] = [u - d for u, d in zip(unalerted[stage], detected)]
+                alerted[stage] = [a + d for a, d in zip(alerted[stage], detected)]
+            if governed:
+                unalerted, alerted, pauses, lockdowns, conditions = self._govern(
+                    governed, cooldown, was_alerted, unalerted, alerted, pauses, lockdowns,
+                )
+            unalerted = self._progress(unalerted, unpaused, zeros)
+            alerted = self._progress(alerted, unpaused, zeros)
+            if unalerted[MAX_STAGE] is not zeros:
+                alerted[MAX_STAGE] = [a + u for a, u in zip(alerted[MAX_STAGE], unalerted[MAX_STAGE])]
+                unalerted[MAX_STAGE] = zeros
+
+            # Move the travelers: those who stay keep their city, those who move find an
+            # uninfected destination with the probability that it is uninfected
+            open_cities = [1 - a for a in was_alerted]
+            arrived: dict[InfectionState, tuple[list[float], list[float]]] = dict()
+            for health, (clear, infected) in travelers.items():
+                stay, moved = self._move(
+                    window,
+                    [c + i for c, i in zip(clear, infected)], tables[health], locked, blocking, open_cities,
+                )
+                arrived[health] = (
+                    [c * s + m * w for c, s, m, w in zip(clear, stay, moved, was_clear)],
+                    [i * s + m * (1 - w) for i, s, m, w in zip(infected, stay, moved, was_clear)],
+                )
+
+            # Healthy travelers in infected cities are infected, and infected travelers in
+            # uninfected cities seed them (the pressure is conditional on the city being uninfected)
+            rates = self._transition_rates(ages)
+            spread = {health: rates[health][-1] for health in INFECTED_STATES}
+            exposed, infections = arrived[InfectionState.HEALTHY]
+            pressure = [
+                (a * spread[InfectionState.ASYMPTOMATIC] + s * spread[InfectionState.SYMPTOMATIC]) / w if w > 0 else 0.0
+                for a, s, w in zip(arrived[InfectionState.ASYMPTOMATIC][0], arrived[InfectionState.SYMPTOMATIC][0], was_clear)
+            ]
+            unseeded = [math.exp(-p) for p in pressure]
+            for rows in (unalerted, alerted):
+                if rows[0] is zeros:
+                    continue
+                new = [r * (1 - u) for r, u in zip(rows[0], unseeded)]
+                rows[0] = [r - x for r, x in zip(rows[0], new)]
+                rows[1] = [r + x for r, x in zip(rows[1], new)]
+
+            # Travelers in a city that was just seeded are now in an infected city, and the
+            # infected ones are more likely to be there since they may have seeded it
+            def seeded(counts: tuple[list[float], list[float]], p_spread: float) -> tuple[list[float], list[float]]:
+                clear, infected = counts
+                if p_spread >= 1:
+                    return zeros, [c + i for c, i in zip(clear, infected)]
+                stays_clear = [
+                    (1 - p_spread) * min(1.0, u * math.exp(p_spread)) for u in unseeded
+                ]
+                return (
+                    [c * s for c, s in zip(clear, stays_clear)],
+                    [i + c * (1 - s) for c, i, s in zip(clear, infected, stays_clear)],
+                )
+
+            healthy_clear = seeded((exposed, zeros), 0.0)
+            asymptomatic = seeded(arrived[InfectionState.ASYMPTOMATIC], spread[InfectionState.ASYMPTOMATIC])
+            symptomatic = seeded(arrived[InfectionState.SYMPTOMATIC], spread[InfectionState.SYMPTOMATIC])
+
+            # Progress the infected travelers
+            a_a, a_s, a_i, a_d, _ = rates[InfectionState.ASYMPTOMATIC]
+            _, s_s, s_i, s_d, _ = rates[InfectionState.SYMPTOMATIC]
+            travelers = {
+                InfectionState.HEALTHY: healthy_clear,
+                InfectionState.ASYMPTOMATIC: (
+                    [a * a_a for a in asymptomatic[0]],
+                    [a * a_a + i for a, i in zip(asymptomatic[1], infections)],
+                ),
+                InfectionState.SYMPTOMATIC: tuple(
+                    [a * a_s + s * s_s for a, s in zip(asymptomatic[index], symptomatic[index])]
+                    for index in (0, 1)
+                ),
+            }
+            total_asymptomatic = window.total(asymptomatic[0]) + window.total(asymptomatic[1])
+            total_symptomatic = window.total(symptomatic[0]) + window.total(symptomatic[1])
+            immune += total_asymptomatic * a_i + total_symptomatic * s_i
+            dead += total_asymptomatic * a_d + total_symptomatic * s_d
+            ages = self._age(ages, window.total(infections))
+
+            results.append(self._result(game_round, window, travelers, immune, dead, unalerted, alerted))
+        return results
+
+    def _age(self, ages: dict[InfectionState, list[float]], new_infections: float) -> dict[InfectionState, list[float]]:
+        """Age the infected travelers by a round.
+
+        Args:
+            ages: The expected number of infected travelers of each health state, by age.
+            new_infections: The expected number of travelers infected this round.
+
+        Returns:
+            The expected number of infected travelers of each health state, by age, next round.
+        """
+
+        oldest = self.transitions.max_age
+        aged = {health: [0.0] * (oldest + 1) for health in INFECTED_STATES}
+        aged[InfectionState.ASYMPTOMATIC][1] = new_infections
+        for health in INFECTED_STATES:
+            for age, count in enumerate(ages[health]):
+                if count <= 0:
+                    continue
+                outcomes = self._outcomes[health][age]
+                aged[InfectionState.ASYMPTOMATIC][min(age + 1, oldest)] += count * outcomes[0]
+                aged[InfectionState.SYMPTOMATIC][min(age + 1, oldest)] += count * outcomes[1]
+        return aged
+
+    @staticmethod
+    def _progress(rows: list[list[float]], unpaused: list[float], zeros: list[float]) -> list[list[float]]:
+        """Advance the stage of every infected city that is not paused.
+
+        Args:
+            rows: The probability of each stage in each city (by stage, then city).
+            unpaused: The probability that each city's infection is not paused.
+            zeros: The shared row of zeros (rows that are still zeros are kept as it, so they can be skipped).
+
+        Returns:
+            The probabilities after progression.
+        """
+
+        if all(z == 1.0 for z in unpaused):
+            last = rows[MAX_STAGE - 1] if rows[MAX_STAGE] is zeros else [
+                a + b for a, b in zip(rows[MAX_STAGE - 1], rows[MAX_STAGE])
+            ]
+            return [rows[0], zeros, *rows[1:MAX_STAGE - 1], last]
+        progressed = [rows[0]]
+        for stage in range(1, MAX_STAGE + 1):
+            staying = [r * (1 - z) for r, z in zip(rows[stage], unpaused)]
+            if stage > 1:
+                staying = [s + r * z for s, r, z in zip(staying, rows[stage - 1], unpaused)]
+            if stage == MAX_STAGE:
+                staying = [s + r * z for s, r, z in zip(staying, rows[stage], unpaused)]
+            progressed.append(staying)
+        return progressed
+
+    def _govern(
+                self,
+                governed: float,
+                cooldown: int,
+                was_alerted: list[float],
+                unalerted: list[list[float]],
+                alerted: list[list[float]],
+                pauses: list[list[float]],
+                lockdowns: list[list[float]],
+            ) -> tuple[list[list[float]], list[list[float]], list[list[float]], list[list[float]], dict[str, list[float]]]:
+        """Resolve the events of CPU governors.
+
+        Governors of alerted cities roll an Epidemic event every round, and governors of
+        unalerted cities roll a Suspicious event every `cooldown` rounds.
+
+        Args:
+            governed: The probability that a city has a governor.
+            cooldown: The rounds between Suspicious events.
+            was_alerted: The probability that each city was alerted.
+            unalerted: The probability that each city is unalerted at each stage.
+            alerted: The probability that each city is alerted at each stage.
+            pauses: The probability of each number of paused rounds left in each city.
+            lockdowns: The probability of each number of lockdown rounds left in each city.
+
+        Returns:
+            The new stage probabilities (unalerted and alerted), the new pause and lockdown
+            probabilities, and the probability of each condition in each city.
+        """
+
+        n = len(was_alerted)
+        epidemic, suspicious = self._epidemic, self._suspicious
+        rate_epidemic = [governed * a for a in was_alerted]
+        rate_suspicious = [governed * (1 - a) / cooldown for a in was_alerted]
+
+        def rate(p_epidemic: float, p_suspicious: float) -> list[float]:
+            return [e * p_epidemic + s * p_suspicious for e, s in zip(rate_epidemic, rate_suspicious)]
+
+        # Surveys of unalerted cities
+        survey = governed / cooldown
+        for stage in range(1, MAX_STAGE + 1):
+            p = survey * (suspicious.survey * _detection(stage) + suspicious.survey_advantage * _detection(stage, True))
+            if p:
+                detected = [u * p for u in unalerted[stage]]
+                unalerted[stage] = [u - d for u, d in zip(unalerted[stage], detected)]
+                alerted[stage] = [a + d for a, d in zip(alerted[stage], detected)]
+
+        # Rollbacks (of the stage before progression, which they replace)
+        for rows, table, p_round in ((alerted, epidemic, governed), (unalerted, suspicious, survey)):
+            for amount, p in table.rollback.items():
+                p *= p_round
+                for stage in range(1, MAX_STAGE + 1):
+                    back = [r * p for r in rows[stage]]
+                    rows[stage] = [r - b for r, b in zip(rows[stage], back)]
+                    target = max(0, stage - amount)
+                    rows[target] = [r + b for r, b in zip(rows[target], back)]
+
+        # Pauses and lockdowns count down, and are restarted by events
+        def restart(chain: list[list[float]], starts: dict[int, list[float]]) -> list[list[float]]:
+            chain = [[a + b for a, b in zip(chain[0], chain[1])] if len(chain) > 1 else chain[0], *chain[2:], [0.0] * n][:len(chain)]
+            total = [0.0] * n
+            for amount, p in starts.items():
+                total = [t + x for t, x in zip(total, p)]
+            chain = [[c * (1 - t) for c, t in zip(row, total)] for row in chain]
+            for amount, p in starts.items():
+                if amount < len(chain):
+                    chain[amount] = [c + x for c, x in zip(chain[amount], p)]
+            return chain
+
+        was_locked = [1 - l for l in lockdowns[0]]
+        pauses = restart(pauses, {
+            amount: rate(epidemic.pause.get(amount, 0.0), suspicious.pause.get(amount, 0.0))
+            for amount in set(epidemic.pause) | set(suspicious.pause)
+        })
+        lockdown = rate(epidemic.lockdown, suspicious.lockdown)
+        lockdowns = restart(lockdowns, {len(lockdowns) - 1: lockdown})
+        conditions = {
+            condition: [
+                min(1.0, w + l + c)
+                for w, l, c in zip(was_locked, lockdown, rate(epidemic.conditions[condition], suspicious.conditions[condition]))
+            ]
+            for condition in CONDITIONS
+        }
+        return unalerted, alerted, pauses, lockdowns, conditions
+
+    def _result(
+                self,
+                game_round: int,
+                window: _Window,
+                travelers: dict[InfectionState, tuple[list[float], list[float]]],
+                immune: float,
+                dead: float,
+                unalerted: list[list[float]],
+                alerted: list[list[float]],
+            ) -> MeanFieldRound:
+        """Summarize the expected state at the end of a round."""
+
+        players = self.config.num_players
+        total = window.total
+        health = {health: (total(clear) + total(infected)) / players for health, (clear, infected) in travelers.items()}
+        health[InfectionState.IMMUNE] = immune / players
+        health[InfectionState.DEAD] = dead / players
+        return MeanFieldRound(
+            round=game_round,
+            health=health,
+            infected_cities=self.config.num_cities - total(unalerted[0]) - total(alerted[0]),
+            alerted_cities=sum(total(row) for row in alerted),
+            unalerted=unalerted,
+            alerted=alerted,
+            window=window,
+        )
+
+
+@dataclass
+class EngineRound:
+    """The average state of games played with the full engine at the end of a round."""
+
+    round: int
+    """The round."""
+
+    health: dict[InfectionState, float]
+    """The average fraction of players in each health state."""
+
+    infected_cities: float
+    """The average number of infected cities."""
+
+    alerted_cities: float
+    """The average number of alerted cities."""
+
+    stages: list[float]
+    """The average infection stage of each city, counted from Patient Zero's first city."""
+
+    @property
+    def mean_stage(self) -> float:
+        """The average infection stage over all cities."""
+        return sum(self.stages) / len(self.stages)
+
+
+def engine_rounds(config: GameConfig, seeds: list[int], rounds: int) -> list[EngineRound]:
+    """Play all-CPU games with the full engine and average their state at the end of every round.
+
+    Games that end early keep their final state in the later rounds.
+
+    Args:
+        config: The configuration of the games.
+        seeds: The seeds of the games.
+        rounds: The number of rounds to play.
+
+    Returns:
+        The average state at the end of every round, starting with the setup (round 0).
+    """
+
+    config = replace(config, keep_history=False)
+    n = config.num_cities
+    health = [{state: 0.0 for state in InfectionState} for _ in range(rounds + 1)]
+    stages = [[0.0] * n for _ in range(rounds + 1)]
+    infected = [0.0] * (rounds + 1)
+    alerted = [0.0] * (rounds + 1)
+    for seed in seeds:
+        game = Game(config, [], [f"City {i}" for i in range(n)], seed=seed)
+        origin = game.cities.index(game.patient_zero.city)
+        for game_round in range(rounds + 1):
+            if game_round > 0 and game.phase != GamePhase.GAME_OVER:
+                game.run_rounds(1)
+            for player in game.players:
+                health[game_round][player.state.health] += 1 / (config.num_players * len(seeds))
+            for index, city in enumerate(game.cities):
+                stage = city.infection_stage
+                stages[game_round][(index - origin) % n] += stage / len(seeds)
+                infected[game_round] += (stage > 0) / len(seeds)
+                alerted[game_round] += city.alerted / len(seeds)
+    return [
+        EngineRound(game_round, health[game_round], infected[game_round], alerted[game_round], stages[game_round])
+        for game_round in range(rounds + 1)
+    ]
+
+
+@dataclass
+class MeanFieldError:
+    """The error of the mean-field model against the full engine."""
+
+    health: float
+    """The mean absolute error of the health fractions, over every health state and round."""
+
+    max_health: float
+    """The largest absolute error of any health fraction in any round."""
+
+    mean_stage: float
+    """The mean absolute error of the average city stage, over every round."""
+
+    city_stage: float
+    """The mean absolute error of the expected stage of each city, over every city and round."""
+
+    infected_cities: float
+    """The mean absolute error of the number of infected cities, relative to the number of cities."""
+
+    model_seconds: float
+    """The time the model took."""
+
+    engine_seconds: float
+    """The time the engine took."""
+
+
+def measure_error(config: GameConfig, seeds: list[int], rounds: int) -> MeanFieldError:
+    """Compare the mean-field model with the average of games played with the full engine.
+
+    Args:
+        config: The configuration of the games.
+        seeds: The seeds of the engine games.
+        rounds: The number of rounds to compare.
+
+    Returns:
+        The error of the model.
+    """
+
+    start = time.perf_counter()
+    model = MeanFieldModel(config).run(rounds)
+    model_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    engine = engine_rounds(config, seeds, rounds)
+    engine_seconds = time.perf_counter() - start
+
+    health_errors = [
+        abs(estimate.health[state] - actual.health[state])
+        for estimate, actual in zip(model, engine)
+        for state in InfectionState
+    ]
+    city_errors = [
+        abs(e - a)
+        for estimate, actual in zip(model, engine)
+        for e, a in zip(estimate.stages, actual.stages)
+    ]
+    return MeanFieldError(
+        health=sum(health_errors) / len(health_errors),
+        max_health=max(health_errors),
+        mean_stage=sum(abs(e.mean_stage - a.mean_stage) for e, a in zip(model, engine)) / len(model),
+        city_stage=sum(city_errors) / len(city_errors),
+        infected_cities=sum(
+            abs(e.infected_cities - a.infected_cities) for e, a in zip(model, engine)
+        ) / (len(model) * config.num_cities),
+        model_seconds=model_seconds,
+        engine_seconds=engine_seconds,
+    )
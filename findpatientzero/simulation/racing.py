@@ -0,0 +1,296 @@
+"""Successive-halving races that screen many candidate configurations with all-CPU games.
+
+Every surviving candidate plays a small batch of games; the worst fraction is eliminated and
+the survivors' budget is doubled, until one candidate is left or the game limit is reached.
+Most of the games are therefore played by the candidates that are still in contention.
+
+Candidates are either scored per game and judged by their mean score, or judged by the loss
+of their mean game length and death rate against `BalanceTargets` (lower is better either
+way). They are ranked by the optimistic (lower) bound of the confidence interval of that
+value, so a candidate with few informative games is not eliminated on a bad streak as easily
+as one that is precisely bad. Candidates whose whole interval lies above a survivor's
+interval are eliminated as well, even outside the worst fraction. Every candidate plays the
+same seeds (common random numbers).
+
+Run `python -m findpatientzero.simulation.racing --help` from the repository root for the
+command line interface.
+"""
+
+import argparse
+import math
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import repeat
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.gamedata.shared import SharedGameData, init_worker
+from findpatientzero.simulation.balance import BalanceTargets
+from findpatientzero.simulation.runner import ConfigResult, GameResult, game_seed, play_game
+from findpatientzero.simulation.stats import RunningStats
+
+
+@dataclass
+class RaceEntry:
+    """A candidate configuration in a race."""
+
+    name: str
+    """The name of the candidate."""
+
+    result: ConfigResult
+    """The aggregated results of the candidate's games."""
+
+    scores: RunningStats = field(default_factory=RunningStats)
+    """The running statistics of the candidate's per-game scores (if the race scores games)."""
+
+    loss: float = math.inf
+    """The value the candidate is judged by: its mean score, or the loss of its means."""
+
+    interval: tuple[float, float] = (-math.inf, math.inf)
+    """The confidence interval of `loss`."""
+
+    eliminated: int | None = None
+    """The rung at which the candidate was eliminated (None if it survived)."""
+
+    @property
+    def games(self) -> int:
+        """The number of games played."""
+        return self.result.games
+
+
+@dataclass
+class Rung:
+    """A stage of a race."""
+
+    games: int
+    """The number of games each survivor had played at the end of the stage."""
+
+    survivors: int
+    """The number of candidates that played the stage."""
+
+    eliminated: list[str]
+    """The candidates eliminated at the end of the stage."""
+
+
+class SuccessiveHalving:
+    """Races candidate configurations, doubling the games of the survivors at each rung."""
+
+    def __init__(
+                self,
+                score: Callable[[GameConfig, GameResult], float] | BalanceTargets,
+                initial_games: int = 20,
+                fraction: float = 0.5,
+                confidence: float = 0.95,
+                max_games: int = 10_000,
+                max_round: int = 200,
+                seed: int = 0,
+                executor: Executor | None = None,
+            ) -> None:
+        """Create a race.
+
+        Args:
+            score: The score of a game played with a configuration (lower is better), or the
+                targets of the mean game length and death rate (judged by `BalanceTargets.loss`).
+            initial_games: The number of games each candidate plays in the first rung.
+            fraction: The fraction of the candidates eliminated at each rung.
+            confidence: The confidence level of the intervals of the mean scores.
+            max_games: The most games to play per candidate.
+            max_round: The round at which an unfinished game is stopped.
+            seed: The seed from which the seeds of the games are derived.
+            executor: Plays the games of each rung in parallel if given.
+        """
+
+        assert initial_games >= 2 and 0 < fraction < 1
+        self.score = score
+        self.initial_games = initial_games
+        self.fraction = fraction
+        self.confidence = confidence
+        self.max_games = max_games
+        self.max_round = max_round
+        self.seed = seed
+        self.executor = executor
+        self.rungs: list[Rung] = []
+
+    def play(self, entries: list[RaceEntry], configs: dict[str, GameConfig], games: int) -> None:
+        """Play games with candidates until each has played a number of games.
+
+        Args:
+            entries: The candidates.
+            configs: The configuration of each candidate, by name.
+            games: The number of games each candidate should have played.
+        """
+
+        work = [
+            (entry, game_seed(self.seed, index))
+            for entry in entries
+            for index in range(entry.games, games)
+        ]
+        candidates = [configs[entry.name] for entry, _ in work]
+        seeds = [seed for _, seed in work]
+        if self.executor is None:
+            results = map(play_game, candidates, seeds, repeat(self.max_round))
+        else:
+            results = self.executor.map(
+                play_game, candidates, seeds, repeat(self.max_round),
+                chunksize=max(1, len(work) // 64),
+            )
+        targets = self.score if isinstance(self.score, BalanceTargets) else None
+        for (entry, _), result in zip(work, results):
+            entry.result.add(result)
+            if targets is None:
+                entry.scores.add(self.score(entry.result.config, result))
+
+        for entry in entries:
+            if targets is None:
+                entry.loss = entry.scores.mean
+                entry.interval = entry.scores.interval(self.confidence)
+                continue
+            config_result = entry.result
+            players = config_result.config.num_players
+            low, high = config_result.deaths.interval(self.confidence)
+            entry.loss = targets.loss(config_result.rounds.mean, config_result.deaths.mean / players)
+            entry.interval = targets.loss_interval(
+                config_result.rounds.interval(self.confidence), (low / players, high / players),
+            )
+
+    def eliminate(self, survivors: list[RaceEntry]) -> list[RaceEntry]:
+        """Choose the candidates to eliminate at the end of a rung.
+
+        Args:
+            survivors: The candidates that played the rung.
+
+        Returns:
+            The candidates to eliminate.
+        """
+
+        ranked = sorted(survivors, key=lambda entry: (entry.interval[0], entry.loss))
+        keep = max(1, len(ranked) - math.floor(len(ranked) * self.fraction))
+        best_high = min(entry.interval[1] for entry in survivors)
+        return ranked[keep:] + [entry for entry in ranked[:keep] if entry.interval[0] > best_high]
+
+    def run(self, configs: dict[str, GameConfig]) -> list[RaceEntry]:
+        """Race candidate configurations.
+
+        Args:
+            configs: The configuration of each candidate, by name.
+
+        Returns:
+            Every candidate, the survivors first (by `RaceEntry.loss`), then the others from the
+            last eliminated.
+        """
+
+        entries = [RaceEntry(name, ConfigResult(name, config)) for name, config in configs.items()]
+        survivors = list(entries)
+        self.rungs = []
+        games = min(self.initial_games, self.max_games)
+        while True:
+            self.play(survivors, configs, games)
+            if len(survivors) == 1 or games >= self.max_games:
+                self.rungs.append(Rung(games, len(survivors), []))
+                break
+            eliminated = self.eliminate(survivors)
+            for entry in eliminated:
+                entry.eliminated = len(self.rungs)
+            self.rungs.append(Rung(games, len(survivors), [entry.name for entry in eliminated]))
+            survivors = [entry for entry in survivors if entry.eliminated is None]
+            games = min(2 * games, self.max_games)
+
+        return sorted(entries, key=lambda entry: (
+            -(len(self.rungs) if entry.eliminated is None else entry.eliminated), entry.loss,
+        ))
+
+
+def target_score(rounds: float | None = None, death_rate: float | None = None) -> Callable[[GameConfig, GameResult], float]:
+    """A per-game score for games that should reach a length and a death rate.
+
+    Each game is scored on its own, so the mean score is the mean squared error of single
+    games: the variance of the metrics plus the squared error of their means. It favors
+    candidates whose games are consistently close to the targets; to judge candidates by
+    their means only, as `BalanceOptimizer` does, race `BalanceTargets` instead.
+
+    Args:
+        rounds: The target game length in rounds (not targeted if None).
+        death_rate: The target fraction of players who die (not targeted if None).
+
+    Returns:
+        The score: the squared relative error of the game length plus the squared error of
+        the fraction of players who died.
+    """
+
+    def score(config: GameConfig, result: GameResult) -> float:
+        value = 0.0
+        if rounds is not None:
+            value += ((result.rounds - rounds) / rounds) ** 2
+        if death_rate is not None:
+            value += (result.deaths / config.num_players - death_rate) ** 2
+        return value
+
+    return score
+
+
+def format_race(entries: list[RaceEntry], rungs: list[Rung]) -> str:
+    """Format the results of a race as a table.
+
+    Args:
+        entries: The candidates, as returned by `SuccessiveHalving.run`.
+        rungs: The rungs of the race.
+
+    Returns:
+        The report.
+    """
+
+    lines = [
+        f"Rung {index}: {rung.survivors} candidates, {rung.games:,} games each, {len(rung.eliminated)} eliminated"
+        for index, rung in enumerate(rungs)
+    ]
+    lines.append(f"{sum(entry.games for entry in entries):,} games in total")
+    for entry in entries:
+        low, high = entry.interval
+        status = "survived" if entry.eliminated is None else f"out at rung {entry.eliminated}"
+        lines.append(
+            f"  {entry.name:<32} {entry.loss:8.4f}  [{low:8.4f}, {high:8.4f}]  "
+            f"rounds {entry.result.rounds.mean:6.2f}  deaths {entry.result.deaths.mean:5.2f}  "
+            f"{entry.games:>6,} games  {status}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--cities", type=int, default=6)
+    parser.add_argument("--rounds", type=float, help="target game length")
+    parser.add_argument("--death-rate", type=float, help="target fraction of players who die")
+    parser.add_argument("--initial-games", type=int, default=20)
+    parser.add_argument("--fraction", type=float, default=0.5)
+    parser.add_argument("--max-games", type=int, default=10_000)
+    parser.add_argument("--max-round", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 to play in this process)")
+    args = parser.parse_args()
+    if args.rounds is None and args.death_rate is None:
+        parser.error("give at least one of --rounds and --death-rate")
+
+    # Screen every combination of the integer rule parameters
+    base = GameConfig(num_players=args.players, num_cities=args.cities)
+    configs = {
+        f"cooldown {cooldown}, lockdown {lockdown}, survey {survey}":
+            replace(base, suspicious_cooldown=cooldown, lockdown_duration=lockdown, survey_threshold=survey)
+        for cooldown in range(0, 7, 2)
+        for lockdown in range(0, 5)
+        for survey in range(1, 12, 2)
+    }
+    race = SuccessiveHalving(
+        BalanceTargets(args.rounds, args.death_rate),
+        initial_games=args.initial_games,
+        fraction=args.fraction,
+        max_games=args.max_games,
+        max_round=args.max_round,
+    )
+    if args.workers > 0:
+        with SharedGameData.create() as shared, ProcessPoolExecutor(
+                    args.workers, initializer=init_worker, initargs=(shared.spec,)
+                ) as race.executor:
+            entries = race.run(configs)
+    else:
+        entries = race.run(configs)
+    print(format_race(entries, race.rungs))
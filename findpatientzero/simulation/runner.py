@@ -0,0 +1,364 @@
+"""Headless batch runner for all-CPU games that stops once the results are precise enough.
+
+Run `python -m findpatientzero.simulation.runner` from the repository root to compare the
+default rules with CPU governors.
+"""
+
+import argparse
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from itertools import repeat
+from typing import TYPE_CHECKING
+
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.gamedata.shared import SharedGameData, init_worker
+from findpatientzero.simulation.stats import RunningStats, wilson_interval
+
+if TYPE_CHECKING:
+    from findpatientzero.simulation.warehouse import ResultsWarehouse
+
+
+class GameOutcome(Enum):
+    """How a simulated game ended."""
+
+    PATIENT_ZERO_FOUND = "Patient Zero found"
+    """Patient Zero was identified."""
+
+    ALL_DEAD = "All dead"
+    """Every player died."""
+
+    SURVIVED = "Survived"
+    """The epidemic ended with immune survivors."""
+
+    UNFINISHED = "Unfinished"
+    """The game was stopped at the maximum round."""
+
+
+@dataclass
+class GameResult:
+    """The result of a simulated game."""
+
+    seed: int
+    """The seed of the game."""
+
+    outcome: GameOutcome
+    """How the game ended."""
+
+    rounds: int
+    """The number of rounds played."""
+
+    deaths: int
+    """The number of players who died."""
+
+    round_metrics: list[tuple[int, int, int, int, int, int]] | None = None
+    """The (round, infected, new infections, deaths, infected cities, max stage) of every
+    committed state, if they were collected (see `EpidemicMetrics`)."""
+
+    transmissions: list[tuple[int, int, int | None]] | None = None
+    """The (player, infection round, likeliest source) of every infection in order of infection,
+    with players given by their position in the game, if `GameConfig.track_contacts` was set
+    (see `ContactIndex.transmission_tree`)."""
+
+
+def game_seed(seed: int, index: int) -> int:
+    """The seed of a game in a sequence of simulated games.
+
+    Args:
+        seed: The seed of the sequence.
+        index: The position of the game in the sequence.
+
+    Returns:
+        The seed of the game.
+    """
+    return random.Random(f"{seed}/{index}").getrandbits(64)
+
+
+def play_game(config: GameConfig, seed: int, max_round: int, round_metrics: bool = False) -> GameResult:
+    """Play an all-CPU game to the end.
+
+    Args:
+        config: The configuration of the game.
+        seed: The seed of the game.
+        max_round: The round at which an unfinished game is stopped.
+        round_metrics: Whether to include the metrics of every round in the result.
+
+    Returns:
+        The result of the game.
+    """
+
+    config = replace(config, collect_metrics=True, keep_history=False)
+    game = Game(config, [], [f"City {i}" for i in range(config.num_cities)], seed=seed)
+    game.run_to_end(max_round=max_round)
+    assert game.metrics is not None
+
+    if game.phase != GamePhase.GAME_OVER:
+        outcome = GameOutcome.UNFINISHED
+    elif game.suspect_is_patient_zero:
+        outcome = GameOutcome.PATIENT_ZERO_FOUND
+    elif all(player.state.health == InfectionState.DEAD for player in game.players):
+        outcome = GameOutcome.ALL_DEAD
+    else:
+        outcome = GameOutcome.SURVIVED
+    result = GameResult(seed, outcome, game.last_state.round, game.metrics.total_deaths)
+    if round_metrics:
+        metrics = game.metrics
+        result.round_metrics = list(zip(
+            metrics.rounds, metrics.infected, metrics.new_infections, metrics.deaths,
+            metrics.infected_cities, metrics.max_stage,
+        ))
+    if game.contacts is not None:
+        positions = {player: position for position, player in enumerate(game.players)}
+        result.transmissions = [
+            (positions[player], game.contacts.infection(player)[0], None if source is None else positions[source])
+            for player, source in game.contacts.transmission_tree().items()
+        ]
+    return result
+
+
+@dataclass
+class ConfigResult:
+    """The aggregated results of the games played with one configuration."""
+
+    name: str
+    """The name of the configuration."""
+
+    config: GameConfig
+    """The configuration."""
+
+    outcomes: dict[GameOutcome, int] = field(default_factory=lambda: {outcome: 0 for outcome in GameOutcome})
+    """The number of games with each outcome."""
+
+    rounds: RunningStats = field(default_factory=RunningStats)
+    """The running statistics of the game length in rounds."""
+
+    deaths: RunningStats = field(default_factory=RunningStats)
+    """The running statistics of the number of deaths."""
+
+    converged: bool = False
+    """Whether the target precision was reached (otherwise the game limit was)."""
+
+    @property
+    def games(self) -> int:
+        """The number of games played."""
+        return self.rounds.count
+
+    def add(self, result: GameResult) -> None:
+        """Add the result of a game.
+
+        Args:
+            result: The result to add.
+        """
+
+        self.outcomes[result.outcome] += 1
+        self.rounds.add(result.rounds)
+        self.deaths.add(result.deaths)
+
+    def rate(self, outcome: GameOutcome) -> float:
+        """The fraction of games with an outcome."""
+        return self.outcomes[outcome] / self.games if self.games else 0.0
+
+    def rate_interval(self, outcome: GameOutcome, confidence: float = 0.95) -> tuple[float, float]:
+        """The Wilson confidence interval of the fraction of games with an outcome."""
+        return wilson_interval(self.outcomes[outcome], self.games, confidence)
+
+
+class BatchRunner:
+    """Plays all-CPU games in batches until every estimate is precise enough.
+
+    After each batch, the runner computes a confidence interval for the rate of every game
+    outcome (Wilson score intervals) and for the mean game length (from Welford running
+    statistics). It stops once every interval is narrower than the target precision, or when
+    the game limit is reached.
+
+    Every configuration plays the same sequence of seeds, so comparisons between
+    configurations use common random numbers. Checking the intervals after every batch
+    slightly inflates the error rate compared to a fixed sample size; `min_games` keeps the
+    runner from stopping on an early lucky streak.
+    """
+
+    def __init__(
+                self,
+                rate_precision: float = 0.01,
+                length_precision: float = 0.25,
+                confidence: float = 0.95,
+                min_games: int = 200,
+                max_games: int = 100_000,
+                batch_size: int = 200,
+                max_round: int = 200,
+                seed: int = 0,
+                executor: Executor | None = None,
+                warehouse: "ResultsWarehouse | None" = None,
+                round_metrics: bool = False,
+            ) -> None:
+        """Create a batch runner.
+
+        Args:
+            rate_precision: The target half-width of the outcome rate intervals.
+            length_precision: The target half-width of the mean game length interval, in rounds.
+            confidence: The confidence level of the intervals.
+            min_games: The fewest games to play per configuration.
+            max_games: The most games to play per configuration.
+            batch_size: The number of games played between precision checks.
+            max_round: The round at which an unfinished game is stopped.
+            seed: The seed from which the seeds of the games are derived.
+            executor: Plays the games of each batch in parallel if given.
+            warehouse: Records every game if given.
+            round_metrics: Whether to record the metrics of every round of every game in the warehouse.
+        """
+
+        self.rate_precision = rate_precision
+        self.length_precision = length_precision
+        self.confidence = confidence
+        self.min_games = min_games
+        self.max_games = max_games
+        self.batch_size = batch_size
+        self.max_round = max_round
+        self.seed = seed
+        self.executor = executor
+        self.warehouse = warehouse
+        self.round_metrics = round_metrics
+
+    def game_seed(self, index: int) -> int:
+        """The seed of a game (the same for every configuration).
+
+        Args:
+            index: The position of the game in the sequence.
+
+        Returns:
+            The seed.
+        """
+        return game_seed(self.seed, index)
+
+    def is_precise(self, result: ConfigResult) -> bool:
+        """Whether every estimate of a configuration has reached the target precision.
+
+        Args:
+            result: The results so far.
+
+        Returns:
+            True if the runner can stop playing the configuration.
+        """
+
+        if result.games < self.min_games:
+            return False
+        for outcome in GameOutcome:
+            low, high = result.rate_interval(outcome, self.confidence)
+            if (high - low) / 2 > self.rate_precision:
+                return False
+        low, high = result.rounds.interval(self.confidence)
+        return (high - low) / 2 <= self.length_precision
+
+    def run_config(self, name: str, config: GameConfig) -> ConfigResult:
+        """Play games with a configuration until its estimates are precise enough.
+
+        Args:
+            name: The name of the configuration.
+            config: The configuration.
+
+        Returns:
+            The aggregated results.
+        """
+
+        result = ConfigResult(name, config)
+        while result.games < self.max_games and not result.converged:
+            count = min(self.batch_size, self.max_games - result.games)
+            seeds = [self.game_seed(result.games + i) for i in range(count)]
+            round_metrics = self.warehouse is not None and self.round_metrics
+            if self.executor is None:
+                games = list(map(play_game, repeat(config), seeds, repeat(self.max_round), repeat(round_metrics)))
+            else:
+                games = list(self.executor.map(
+                    play_game, repeat(config), seeds, repeat(self.max_round), repeat(round_metrics),
+                    chunksize=max(1, count // 32),
+                ))
+            for game in games:
+                result.add(game)
+            if self.warehouse is not None:
+                self.warehouse.add_games(config, games, name)
+            result.converged = self.is_precise(result)
+        return result
+
+    def run(self, configs: dict[str, GameConfig]) -> dict[str, ConfigResult]:
+        """Play games with each configuration until its estimates are precise enough.
+
+        Args:
+            configs: The configurations, by name.
+
+        Returns:
+            The aggregated results of each configuration, by name.
+        """
+        return {name: self.run_config(name, config) for name, config in configs.items()}
+
+
+def format_report(results: dict[str, ConfigResult], confidence: float = 0.95, show_convergence: bool = True) -> str:
+    """Format the results of a batch run as a table.
+
+    Args:
+        results: The results of each configuration.
+        confidence: The confidence level of the intervals.
+        show_convergence: Whether to show if each configuration reached the target precision.
+
+    Returns:
+        The report.
+    """
+
+    lines = []
+    for name, result in results.items():
+        if show_convergence:
+            status = "converged" if result.converged else "game limit reached"
+            lines.append(f"{name}: {result.games:,} games ({status})")
+        else:
+            lines.append(f"{name}: {result.games:,} games")
+        for outcome in GameOutcome:
+            low, high = result.rate_interval(outcome, confidence)
+            lines.append(f"  {outcome.value:<20} {result.rate(outcome):7.2%}  [{low:7.2%}, {high:7.2%}]")
+        low, high = result.rounds.interval(confidence)
+        lines.append(f"  {'Rounds':<20} {result.rounds.mean:7.2f}  [{low:7.2f}, {high:7.2f}]")
+        low, high = result.deaths.interval(confidence)
+        lines.append(f"  {'Deaths':<20} {result.deaths.mean:7.2f}  [{low:7.2f}, {high:7.2f}]")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--cities", type=int, default=6)
+    parser.add_argument("--rate-precision", type=float, default=0.01)
+    parser.add_argument("--length-precision", type=float, default=0.25)
+    parser.add_argument("--max-games", type=int, default=100_000)
+    parser.add_argument("--max-round", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 to play in this process)")
+    parser.add_argument("--warehouse", help="SQLite database to record every game in")
+    parser.add_argument("--round-metrics", action="store_true", help="also record the metrics of every round")
+    parser.add_argument("--contacts", action="store_true", help="trace contacts and record who infected whom")
+    args = parser.parse_args()
+
+    base = GameConfig(num_players=args.players, num_cities=args.cities, track_contacts=args.contacts)
+    configs = {
+        "Default": base,
+        "CPU governors": replace(base, auto_roll=False, cpu_governors=True),
+    }
+    runner = BatchRunner(
+        rate_precision=args.rate_precision,
+        length_precision=args.length_precision,
+        max_games=args.max_games,
+        max_round=args.max_round,
+        round_metrics=args.round_metrics,
+    )
+    if args.warehouse is not None:
+        from findpatientzero.simulation.warehouse import ResultsWarehouse
+
+        runner.warehouse = ResultsWarehouse(args.warehouse)
+    if args.workers > 0:
+        with SharedGameData.create() as shared, ProcessPoolExecutor(
+                    args.workers, initializer=init_worker, initargs=(shared.spec,)
+                ) as runner.executor:
+            results = runner.run(configs)
+    else:
+        results = runner.run(configs)
+    if runner.warehouse is not None:
+        runner.warehouse.close()
+    print(format_report(results))
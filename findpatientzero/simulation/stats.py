@@ -0,0 +1,111 @@
+"""Running statistics and confidence intervals for simulation results."""
+
+import math
+from statistics import NormalDist
+
+
+def z_score(confidence: float) -> float:
+    """The two-sided standard normal critical value for a confidence level.
+
+    Args:
+        confidence: The confidence level (e.g. 0.95).
+
+    Returns:
+        The critical value (e.g. about 1.96 for 0.95).
+    """
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """The Wilson score interval for a binomial proportion.
+
+    Unlike the normal approximation, the interval stays inside [0, 1] and behaves well for
+    rates close to 0 or 1 and for few trials.
+
+    Args:
+        successes: The number of successes.
+        trials: The number of trials.
+        confidence: The confidence level.
+
+    Returns:
+        The lower and upper bounds of the interval ((0, 1) if there are no trials).
+    """
+
+    if trials == 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class RunningStats:
+    """Running mean and variance of a stream of values (Welford's algorithm)."""
+
+    count: int
+    """The number of values seen."""
+
+    mean: float
+    """The mean of the values."""
+
+    _m2: float
+    """The sum of squared differences from the mean."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        Args:
+            value: The value to add.
+        """
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Add all the values seen by another instance (Chan et al.'s parallel update).
+
+        Args:
+            other: The statistics to merge into these.
+        """
+
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """The sample variance of the values (0 for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """The sample standard deviation of the values."""
+        return math.sqrt(self.variance)
+
+    def interval(self, confidence: float = 0.95) -> tuple[float, float]:
+        """The normal-approximation confidence interval for the mean.
+
+        Args:
+            confidence: The confidence level.
+
+        Returns:
+            The lower and upper bounds of the interval (infinite for fewer than two values).
+        """
+
+        if self.count < 2:
+            return -math.inf, math.inf
+        margin = z_score(confidence) * self.stdev / math.sqrt(self.count)
+        return self.mean - margin, self.mean + margin
@@ -0,0 +1,429 @@
+"""Resumable sweeps of all-CPU games, split into shards that any number of workers can claim.
+
+A sweep lives in a directory:
+    manifest.json       The configurations, seed ranges and shards of the sweep.
+    queue.lock          Locked (with an OS file lock) while a worker claims a shard.
+    claims/<shard>.json The worker currently playing a shard.
+    done/<shard>.jsonl  The results of a finished shard, one game per line.
+
+A shard's results are written to a temporary file, flushed to disk and renamed into
+`done/`, so a shard is either completely recorded or not at all. Workers (processes on
+one machine, or machines sharing the directory) take the lock only to claim a shard, and
+skip shards that are done or claimed by a live worker. Workers renew their claims while
+they play. A claim is stale, and its shard is played again, if its worker process is gone
+(on the same host) or, for workers on other hosts, if it was not renewed within its lease.
+Restarting an interrupted sweep therefore only plays the unfinished shards. Games are
+seeded by their position in the sweep, so a shard that ends up played twice records the
+same results both times.
+
+Run `python -m findpatientzero.simulation.sweep --help` from the repository root for the
+command line interface.
+"""
+
+import argparse
+import json
+import os
+import socket
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, fields, replace
+from multiprocessing import Process
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.runner import ConfigResult, GameOutcome, GameResult, format_report, game_seed, play_game
+
+MANIFEST_VERSION = 1
+"""The version of the manifest format."""
+
+DEFAULT_LEASE = 3600.0
+"""The default number of seconds after which an unrenewed claim from another host is considered stale."""
+
+try:
+    import fcntl
+
+    def _lock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """An exclusive lock on a file, shared by processes on one machine (and by machines on
+    file systems that support locks)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: int | None = None
+
+    def __enter__(self) -> "FileLock":
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        _lock_file(self._fd)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        assert self._fd is not None
+        _unlock_file(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+
+def write_atomic(path: str, lines: Iterator[str]) -> None:
+    """Write a file so that it appears complete or not at all.
+
+    Args:
+        path: The path of the file.
+        lines: The lines of the file (without line endings).
+    """
+
+    temporary = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def config_to_data(config: GameConfig) -> dict:
+    """Serialize a game configuration for a manifest."""
+
+    if config.health_transitions is not None:
+        raise ValueError("Sweeps only support the health transitions of the game data.")
+    if config.events is not None:
+        raise ValueError("Sweeps only support the events of the game data.")
+    data = asdict(config)
+    del data["health_transitions"]
+    del data["events"]
+    return data
+
+
+def config_from_data(data: dict) -> GameConfig:
+    """Deserialize a game configuration from a manifest."""
+    names = {field.name for field in fields(GameConfig)}
+    return GameConfig(**{key: value for key, value in data.items() if key in names})
+
+
+def result_to_line(result: GameResult) -> str:
+    """Serialize a game result as a line of a shard file."""
+    return json.dumps([result.seed, result.outcome.name, result.rounds, result.deaths])
+
+
+def result_from_line(line: str) -> GameResult:
+    """Deserialize a game result from a line of a shard file."""
+    seed, outcome, rounds, deaths = json.loads(line)
+    return GameResult(seed, GameOutcome[outcome], rounds, deaths)
+
+
+@dataclass
+class Shard:
+    """A range of games of one configuration."""
+
+    id: str
+    """The identifier of the shard (used for its file names)."""
+
+    config: str
+    """The name of the configuration."""
+
+    start: int
+    """The index of the first game."""
+
+    stop: int
+    """The index after the last game."""
+
+
+class Sweep:
+    """A sweep directory and its manifest."""
+
+    path: str
+    """The sweep directory."""
+
+    configs: dict[str, GameConfig]
+    """The configurations, by name."""
+
+    games: int
+    """The number of games per configuration."""
+
+    seed: int
+    """The seed from which the seeds of the games are derived (shared by all configurations)."""
+
+    max_round: int
+    """The round at which an unfinished game is stopped."""
+
+    shards: list[Shard]
+    """The shards of the sweep."""
+
+    def __init__(self, path: str) -> None:
+        """Open an existing sweep.
+
+        Args:
+            path: The sweep directory.
+        """
+
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["version"] != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported sweep manifest version: {manifest['version']}")
+        self.configs = {name: config_from_data(data) for name, data in manifest["configs"].items()}
+        self.games = manifest["games"]
+        self.seed = manifest["seed"]
+        self.max_round = manifest["max_round"]
+        self.shards = [Shard(**shard) for shard in manifest["shards"]]
+
+    @classmethod
+    def create(
+                cls,
+                path: str,
+                configs: dict[str, GameConfig],
+                games: int,
+                shard_size: int = 1000,
+                seed: int = 0,
+                max_round: int = 200,
+            ) -> "Sweep":
+        """Create a sweep directory and its manifest.
+
+        Args:
+            path: The sweep directory (created if needed; must not hold a sweep yet).
+            configs: The configurations, by name.
+            games: The number of games per configuration.
+            shard_size: The number of games per shard.
+            seed: The seed from which the seeds of the games are derived.
+            max_round: The round at which an unfinished game is stopped.
+
+        Returns:
+            The sweep.
+        """
+
+        if os.path.exists(os.path.join(path, "manifest.json")):
+            raise FileExistsError(f"A sweep already exists in {path}")
+        os.makedirs(os.path.join(path, "claims"), exist_ok=True)
+        os.makedirs(os.path.join(path, "done"), exist_ok=True)
+
+        shards = []
+        for number, name in enumerate(configs):
+            for start in range(0, games, shard_size):
+                stop = min(start + shard_size, games)
+                shards.append({"id": f"{number:03d}-{start:09d}", "config": name, "start": start, "stop": stop})
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "configs": {name: config_to_data(config) for name, config in configs.items()},
+            "games": games,
+            "seed": seed,
+            "max_round": max_round,
+            "shards": shards,
+        }
+        write_atomic(os.path.join(path, "manifest.json"), iter([json.dumps(manifest, indent=2)]))
+        return cls(path)
+
+    def _claim_path(self, shard: Shard) -> str:
+        return os.path.join(self.path, "claims", f"{shard.id}.json")
+
+    def _done_path(self, shard: Shard) -> str:
+        return os.path.join(self.path, "done", f"{shard.id}.jsonl")
+
+    def is_done(self, shard: Shard) -> bool:
+        """Whether the results of a shard are recorded."""
+        return os.path.exists(self._done_path(shard))
+
+    def pending(self) -> list[Shard]:
+        """The shards whose results are not recorded yet."""
+        return [shard for shard in self.shards if not self.is_done(shard)]
+
+    def _is_stale(self, claim: dict, lease: float) -> bool:
+        if claim["host"] == socket.gethostname():
+            # Local claims last as long as their worker, however long the shard takes
+            try:
+                os.kill(claim["pid"], 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                pass
+            return False
+        return time.time() - claim["time"] > lease
+
+    def _renew(self, shard: Shard) -> None:
+        """Refresh the time of this worker's claim on a shard, unless another worker took it over."""
+
+        claim_path = self._claim_path(shard)
+        with FileLock(os.path.join(self.path, "queue.lock")):
+            try:
+                with open(claim_path, encoding="utf-8") as f:
+                    claim = json.load(f)
+            except FileNotFoundError:
+                return
+            if claim["host"] == socket.gethostname() and claim["pid"] == os.getpid():
+                claim["time"] = time.time()
+                write_atomic(claim_path, iter([json.dumps(claim)]))
+
+    def claim(self, lease: float = DEFAULT_LEASE) -> Shard | None:
+        """Claim a shard that is neither done nor claimed by a live worker.
+
+        Args:
+            lease: The number of seconds after which an unrenewed claim from another host is stale.
+
+        Returns:
+            The claimed shard, or None if there is none left to claim.
+        """
+
+        with FileLock(os.path.join(self.path, "queue.lock")):
+            for shard in self.shards:
+                if self.is_done(shard):
+                    continue
+                claim_path = self._claim_path(shard)
+                if os.path.exists(claim_path):
+                    with open(claim_path, encoding="utf-8") as f:
+                        if not self._is_stale(json.load(f), lease):
+                            continue
+                claim = {"host": socket.gethostname(), "pid": os.getpid(), "time": time.time()}
+                write_atomic(claim_path, iter([json.dumps(claim)]))
+                return shard
+        return None
+
+    def play(self, shard: Shard, lease: float = DEFAULT_LEASE) -> None:
+        """Play the games of a shard and record their results, renewing the claim on it as games finish.
+
+        Args:
+            shard: The shard to play.
+            lease: The lease of the claim (renewed four times per lease).
+        """
+
+        config = self.configs[shard.config]
+
+        def lines() -> Iterator[str]:
+            renewed = time.monotonic()
+            for index in range(shard.start, shard.stop):
+                yield result_to_line(play_game(config, game_seed(self.seed, index), self.max_round))
+                if time.monotonic() - renewed >= lease / 4:
+                    self._renew(shard)
+                    renewed = time.monotonic()
+
+        write_atomic(self._done_path(shard), lines())
+        try:
+            os.remove(self._claim_path(shard))
+        except FileNotFoundError:
+            pass
+
+    def work(self, lease: float = DEFAULT_LEASE) -> int:
+        """Claim and play shards until none are left to claim.
+
+        Args:
+            lease: The number of seconds after which an unrenewed claim from another host is stale.
+
+        Returns:
+            The number of shards played.
+        """
+
+        played = 0
+        while (shard := self.claim(lease)) is not None:
+            self.play(shard, lease)
+            played += 1
+        return played
+
+    def results(self, config: str | None = None) -> Iterator[GameResult]:
+        """Stream the recorded game results, shard by shard.
+
+        Args:
+            config: Only stream the results of this configuration if given.
+
+        Yields:
+            The result of each recorded game.
+        """
+
+        for shard in self.shards:
+            if (config is not None and shard.config != config) or not self.is_done(shard):
+                continue
+            with open(self._done_path(shard), encoding="utf-8") as f:
+                for line in f:
+                    yield result_from_line(line)
+
+    def merge(self, output: str | None = None) -> dict[str, ConfigResult]:
+        """Reduce the recorded results, streaming them so they never all sit in memory.
+
+        Args:
+            output: Also concatenate the results into this file (one JSON line per game,
+                prefixed with the configuration name) if given.
+
+        Returns:
+            The aggregated results of each configuration, by name.
+        """
+
+        merged = {name: ConfigResult(name, config) for name, config in self.configs.items()}
+        out = open(output, "w", encoding="utf-8") if output is not None else None
+        try:
+            for shard in self.shards:
+                if not self.is_done(shard):
+                    continue
+                result = merged[shard.config]
+                with open(self._done_path(shard), encoding="utf-8") as f:
+                    for line in f:
+                        result.add(result_from_line(line))
+                        if out is not None:
+                            out.write(f'[{json.dumps(shard.config)}, {line.rstrip()}]\n')
+        finally:
+            if out is not None:
+                out.close()
+        return merged
+
+
+def _work(path: str, lease: float) -> None:
+    Sweep(path).work(lease)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable sharded sweeps of all-CPU games.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="create a sweep comparing the default rules with CPU governors")
+    create.add_argument("path")
+    create.add_argument("--games", type=int, default=100_000)
+    create.add_argument("--shard-size", type=int, default=1000)
+    create.add_argument("--players", type=int, default=8)
+    create.add_argument("--cities", type=int, default=6)
+    create.add_argument("--seed", type=int, default=0)
+    create.add_argument("--max-round", type=int, default=200)
+    work = commands.add_parser("work", help="play unfinished shards")
+    work.add_argument("path")
+    work.add_argument("--workers", type=int, default=1)
+    work.add_argument("--lease", type=float, default=DEFAULT_LEASE)
+    status = commands.add_parser("status", help="show the progress of a sweep")
+    status.add_argument("path")
+    merge = commands.add_parser("merge", help="reduce the results of a sweep")
+    merge.add_argument("path")
+    merge.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        base = GameConfig(num_players=args.players, num_cities=args.cities)
+        configs = {"Default": base, "CPU governors": replace(base, auto_roll=False, cpu_governors=True)}
+        sweep = Sweep.create(args.path, configs, args.games, args.shard_size, args.seed, args.max_round)
+        print(f"Created {len(sweep.shards)} shards in {args.path}")
+    elif args.command == "work":
+        workers = [Process(target=_work, args=(args.path, args.lease)) for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    elif args.command == "status":
+        sweep = Sweep(args.path)
+        print(f"{len(sweep.shards) - len(sweep.pending())} of {len(sweep.shards)} shards done")
+    else:
+        sweep = Sweep(args.path)
+        print(format_report(sweep.merge(args.output), show_convergence=False))
+        if pending := sweep.pending():
+            print(f"{len(pending)} of {len(sweep.shards)} shards are not done yet")
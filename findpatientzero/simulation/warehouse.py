@@ -0,0 +1,325 @@
+"""A SQLite database of simulated games, for querying simulation results with SQL.
+
+Tables:
+    configs         One row per game configuration: its hash, name and JSON data.
+    games           One row per game: its configuration, seed, outcome, length and deaths.
+    round_metrics   One row per committed state of a game, if the metrics of every round
+                    were collected (see `GameResult.round_metrics`).
+    transmissions   One row per infection in a game played with contact tracing: the
+                    infected player, the round and the likeliest source (see
+                    `GameResult.transmissions`), players given by their position in the game.
+
+Games are buffered and written in large transactions with `executemany`, and the database
+runs in WAL mode with `synchronous=NORMAL`, so ingesting is far faster than playing the
+games. Configurations are indexed by hash, and games by configuration and by seed. Seeds are 64-bit unsigned integers, stored as signed SQLite integers (see
+`to_signed`); query them with `to_signed(seed)`.
+
+The schema version is kept in `PRAGMA user_version`. Opening a database applies the
+migrations it is missing, each in its own transaction, so databases written by older
+versions are upgraded in place.
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import replace
+
+from findpatientzero.engine.entities.event import EVENT_FREQUENCIES
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.runner import GameOutcome, GameResult
+from findpatientzero.simulation.sweep import config_to_data
+
+MIGRATIONS: list[list[str]] = [
+    [
+        """CREATE TABLE configs (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            name TEXT,
+            data TEXT NOT NULL
+        )""",
+        """CREATE TABLE games (
+            id INTEGER PRIMARY KEY,
+            config_id INTEGER NOT NULL REFERENCES configs (id),
+            seed INTEGER NOT NULL,
+            outcome TEXT NOT NULL,
+            rounds INTEGER NOT NULL,
+            deaths INTEGER NOT NULL
+        )""",
+        "CREATE INDEX games_config ON games (config_id)",
+        "CREATE INDEX games_seed ON games (seed)",
+        """CREATE TABLE round_metrics (
+            game_id INTEGER NOT NULL REFERENCES games (id),
+            round INTEGER NOT NULL,
+            infected INTEGER NOT NULL,
+            new_infections INTEGER NOT NULL,
+            deaths INTEGER NOT NULL,
+            infected_cities INTEGER NOT NULL,
+            max_stage INTEGER NOT NULL,
+            PRIMARY KEY (game_id, round)
+        ) WITHOUT ROWID""",
+    ],
+    [
+        """CREATE TABLE transmissions (
+            game_id INTEGER NOT NULL REFERENCES games (id),
+            player INTEGER NOT NULL,
+            round INTEGER NOT NULL,
+            source INTEGER,
+            PRIMARY KEY (game_id, player)
+        ) WITHOUT ROWID""",
+    ],
+]
+"""The statements that upgrade the schema from each version to the next (version 0 is empty)."""
+
+_SEED_RANGE = 1 << 64
+_MAX_SIGNED = 1 << 63
+
+
+def to_signed(seed: int) -> int:
+    """The signed 64-bit integer under which a seed is stored."""
+    return seed - _SEED_RANGE if seed >= _MAX_SIGNED else seed
+
+
+def from_signed(value: int) -> int:
+    """The seed stored as a signed 64-bit integer."""
+    return value + _SEED_RANGE if value < 0 else value
+
+
+def config_data(config: GameConfig) -> dict:
+    """Serialize a game configuration, with the frequency of each event if it overrides them.
+
+    Args:
+        config: The configuration.
+
+    Returns:
+        The data.
+    """
+
+    data = config_to_data(replace(config, events=None))
+    if config.events is not None:
+        data["events"] = {
+            category.key: [config.events[category].count(event) for event, _ in events]
+            for category, events in EVENT_FREQUENCIES.items()
+        }
+    return data
+
+
+def config_hash(config: GameConfig) -> str:
+    """A stable hash of a game configuration."""
+    encoded = json.dumps(config_data(config), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def migrate(connection: sqlite3.Connection, migrations: list[list[str]] = MIGRATIONS) -> int:
+    """Apply the migrations a database is missing.
+
+    Args:
+        connection: The database (in autocommit mode).
+        migrations: The statements of each schema version.
+
+    Returns:
+        The schema version of the database.
+
+    Raises:
+        ValueError: If the database was written by a newer version.
+    """
+
+    for version, statements in enumerate(migrations, 1):
+        # Checked again in the transaction, in case another process migrated in the meantime
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= version:
+            continue
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("PRAGMA user_version").fetchone()[0] < version:
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {version}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > len(migrations):
+        raise ValueError(f"The database has schema version {version}, newer than {len(migrations)}.")
+    return version
+
+
+class ResultsWarehouse:
+    """Records simulated games in a SQLite database.
+
+    Games are buffered and written once `batch_size` games are pending, or when the
+    warehouse is flushed or closed, each time in a single transaction. Game ids are assigned
+    as games are added and renumbered when they are written if another process wrote games
+    in the meantime, so several processes can write to the same database (one at a time).
+
+    Usage:
+        with ResultsWarehouse("results.db") as warehouse:
+            warehouse.add_games(config, results)
+            ...
+            warehouse.flush()
+            rows = warehouse.connection.execute("SELECT outcome, COUNT(*) FROM games GROUP BY outcome")
+    """
+
+    path: str
+    """The path of the database."""
+
+    connection: sqlite3.Connection
+    """The connection to the database (in autocommit mode), also for queries."""
+
+    batch_size: int
+    """The number of pending games at which they are written."""
+
+    _config_ids: dict[str, int]
+    """The id of each configuration seen, by hash."""
+
+    _games: list[tuple[int, int, int, str, int, int]]
+    """The (id, config id, signed seed, outcome, rounds, deaths) of each pending game."""
+
+    _rounds: list[tuple[int, int, int, int, int, int, int]]
+    """The (game id, round, infected, new infections, deaths, infected cities, max stage) of each pending round."""
+
+    _transmissions: list[tuple[int, int, int, int | None]]
+    """The (game id, player, round, source) of each pending infection."""
+
+    _start: int
+    """The id of the first pending game (checked, and renumbered if needed, when it is written)."""
+
+    def __init__(self, path: str, batch_size: int = 100_000) -> None:
+        """Open a database, creating or upgrading it if needed.
+
+        Args:
+            path: The path of the database.
+            batch_size: The number of pending games at which they are written.
+        """
+
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("PRAGMA busy_timeout = 60000")
+        # Room for the indexes of millions of games, which are updated at random positions
+        self.connection.execute("PRAGMA cache_size = -262144")
+        try:
+            migrate(self.connection)
+        except BaseException:
+            self.connection.close()
+            raise
+        self._config_ids = dict()
+        self._games = []
+        self._rounds = []
+        self._transmissions = []
+        self._start = 0
+
+    def _next_id(self) -> int:
+        return self.connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+
+    def config_id(self, config: GameConfig, name: str | None = None) -> int:
+        """The id of a configuration, adding it to the database if needed.
+
+        Args:
+            config: The configuration.
+            name: The name to record with a new configuration.
+
+        Returns:
+            The id.
+        """
+
+        key = config_hash(config)
+        config_id = self._config_ids.get(key)
+        if config_id is None:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO configs (hash, name, data) VALUES (?, ?, ?)",
+                (key, name, json.dumps(config_data(config), sort_keys=True)),
+            )
+            config_id = self.connection.execute("SELECT id FROM configs WHERE hash = ?", (key,)).fetchone()[0]
+            self._config_ids[key] = config_id
+        return config_id
+
+    def add_games(self, config: GameConfig, results: Iterable[GameResult], name: str | None = None) -> None:
+        """Record games played with a configuration.
+
+        Args:
+            config: The configuration.
+            results: The results of the games.
+            name: The name to record with the configuration, if it is new.
+        """
+
+        config_id = self.config_id(config, name)
+        games = self._games
+        if not games:
+            self._start = self._next_id()
+        game_id = self._start + len(games)
+        for result in results:
+            if result.round_metrics is not None:
+                self._rounds.extend((game_id, *metrics) for metrics in result.round_metrics)
+            if result.transmissions is not None:
+                self._transmissions.extend((game_id, *transmission) for transmission in result.transmissions)
+            seed = result.seed
+            games.append((
+                game_id, config_id, seed - _SEED_RANGE if seed >= _MAX_SIGNED else seed,
+                result.outcome.name, result.rounds, result.deaths,
+            ))
+            game_id += 1
+        if len(games) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the pending games in one transaction."""
+
+        if not self._games:
+            return
+        connection = self.connection
+        games, rounds, transmissions = self._games, self._rounds, self._transmissions
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process wrote games since the ids were assigned. The pending games keep
+            # their ids until the commit, so a failed write is renumbered from scratch next time.
+            shift = self._next_id() - self._start
+            if shift:
+                games = [(game_id + shift, *game) for game_id, *game in games]
+                rounds = [(game_id + shift, *metrics) for game_id, *metrics in rounds]
+                transmissions = [(game_id + shift, *infection) for game_id, *infection in transmissions]
+            connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)", games)
+            if rounds:
+                connection.executemany("INSERT INTO round_metrics VALUES (?, ?, ?, ?, ?, ?, ?)", rounds)
+            if transmissions:
+                connection.executemany("INSERT INTO transmissions VALUES (?, ?, ?, ?)", transmissions)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._games = []
+        self._rounds = []
+        self._transmissions = []
+
+    def results(self, config: GameConfig) -> list[GameResult]:
+        """The recorded games of a configuration (without their round metrics), in the order they were added.
+
+        Args:
+            config: The configuration.
+
+        Returns:
+            The results of the games.
+        """
+
+        self.flush()
+        rows = self.connection.execute(
+            "SELECT g.seed, g.outcome, g.rounds, g.deaths FROM games g JOIN configs c ON c.id = g.config_id "
+            "WHERE c.hash = ? ORDER BY g.id",
+            (config_hash(config),),
+        )
+        return [GameResult(from_signed(seed), GameOutcome[outcome], rounds, deaths) for seed, outcome, rounds, deaths in rows]
+
+    def close(self) -> None:
+        """Write the pending games and close the database."""
+
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> "ResultsWarehouse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
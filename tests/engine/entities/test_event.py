@@ -1,7 +1,7 @@
 """Tests for classes in the Event module."""
 
 import unittest
-from findpatientzero.engine.entities.event import Event, EVENTS, EventCategory
+from findpatientzero.engine.entities.event import Event, EVENT_FREQUENCIES, EVENTS, EventCategory, repeat_events
 
 
 class TestEvent(unittest.TestCase):
@@ -31,6 +31,14 @@ class TestEvent(unittest.TestCase):
             self.assertIsInstance(event_list, list)
             self.assertGreater(len(event_list), 0)
 
+    def test_repeat_events(self):
+        """Test that the event lists repeat each event by its frequency."""
+        self.assertEqual(repeat_events(EVENT_FREQUENCIES), EVENTS)
+        for category, event_list in repeat_events({
+                    category: [(event, 3) for event, _ in events] for category, events in EVENT_FREQUENCIES.items()
+                }).items():
+            self.assertEqual(len(event_list), 3 * len(EVENT_FREQUENCIES[category]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+"""Tests for the contact index module."""
+
+import unittest
+
+from findpatientzero.engine.entities.player import PlayerRole
+from findpatientzero.engine.game import Game, GameConfig
+from findpatientzero.engine.transitions import INFECTED_STATES
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta"]
+
+
+def new_game(seed, **config):
+    """Create an all-CPU game that tracks contacts."""
+    config = GameConfig(num_players=10, num_cities=len(CITY_NAMES), track_contacts=True, **config)
+    return Game(config, [], CITY_NAMES, seed=seed)
+
+
+def scan_contacts(game, player, start=0, stop=None):
+    """Find a player's contacts by scanning the whole history."""
+    contacts = dict()
+    for state in game._history:
+        if state.round < start or (stop is not None and state.round > stop):
+            continue
+        mine = state.players.get(player)
+        if mine is None or mine.role != PlayerRole.TRAVELER:
+            continue
+        for other, theirs in state.players.items():
+            if other is not player and theirs.role == PlayerRole.TRAVELER and theirs.city is mine.city:
+                contacts.setdefault(other, []).append((state.round, mine.city))
+    return contacts
+
+
+class TestContactIndex(unittest.TestCase):
+    def test_contacts_match_history(self):
+        for seed in range(6):
+            game = new_game(seed)
+            game.run_to_end(max_round=30)
+            assert game.contacts is not None
+            for player in game.players:
+                self.assertEqual(game.contacts.contacts(player), scan_contacts(game, player))
+                self.assertEqual(game.contacts.contacts(player, 3, 7), scan_contacts(game, player, 3, 7))
+
+    def test_visits_and_occupants(self):
+        game = new_game(1)
+        game.run_rounds(5)
+        assert game.contacts is not None
+        for state in game._history:
+            for player, player_state in state.players.items():
+                if player_state.role == PlayerRole.TRAVELER:
+                    self.assertIn((state.round, player_state.city), game.contacts.visits(player))
+                    self.assertIn(player, game.contacts.occupants(player_state.city, state.round))
+
+    def test_transmission_chains(self):
+        chains = 0
+        for seed in range(10):
+            game = new_game(seed)
+            game.run_to_end(max_round=30)
+            assert game.contacts is not None
+            self.assertEqual(game.contacts.transmission_chain(game.patient_zero)[0][0], game.patient_zero)
+            for player in game.players:
+                chain = game.contacts.transmission_chain(player)
+                if game.contacts.infection(player) is None:
+                    self.assertEqual(chain, [])
+                    continue
+                self.assertEqual(chain[-1][0], player)
+                rounds = [game_round for _, game_round, _ in chain]
+                self.assertEqual(rounds, sorted(rounds))
+                # Every source was infected and in the city that infected the next player
+                for (source, _, _), (infected, game_round, city) in zip(chain, chain[1:]):
+                    seeded = [r for r, c in game.contacts.visits(source) if c is city and r < game_round]
+                    self.assertTrue(seeded)
+                    self.assertLessEqual(game.contacts.infection(source)[0], max(seeded))
+                chains += len(chain) > 1
+        self.assertGreater(chains, 0)
+
+    def test_chains_reach_patient_zero(self):
+        """With one source, every infection traces back to Patient Zero."""
+        for seed in range(10):
+            game = new_game(seed)
+            game.run_to_end(max_round=30)
+            assert game.contacts is not None
+            tree = game.contacts.transmission_tree()
+            self.assertIs(next(iter(tree)), game.patient_zero)
+            self.assertIsNone(tree[game.patient_zero])
+            for player, source in tree.items():
+                if player is not game.patient_zero:
+                    self.assertIsNotNone(source)
+                    self.assertLess(game.contacts.infection(source)[0], game.contacts.infection(player)[0])
+                    self.assertIs(game.contacts.transmission_chain(player)[0][0], game.patient_zero)
+
+    def test_fork(self):
+        game = new_game(2)
+        game.run_rounds(4)
+        fork = game.fork()
+        fork.run_rounds(4)
+        assert fork.contacts is not None and game.contacts is not None
+        for original, copy in zip(game.players, fork.players):
+            visits = [(r, c.name) for r, c in game.contacts.visits(original)]
+            self.assertEqual([(r, c.name) for r, c in fork.contacts.visits(copy)[:len(visits)]], visits)
+            for other in fork.contacts.contacts(copy):
+                self.assertIn(other, fork.players)
+
+    def test_disabled_by_default(self):
+        game = Game(GameConfig(num_players=4, num_cities=2), [], CITY_NAMES[:2], seed=0)
+        self.assertIsNone(game.contacts)
+
+    def test_infections_are_tracked(self):
+        game = new_game(4)
+        game.run_to_end(max_round=30)
+        assert game.contacts is not None
+        for state in game._history:
+            for player, player_state in state.players.items():
+                if player_state.health in INFECTED_STATES:
+                    self.assertIsNotNone(game.contacts.infection(player))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Tests for the deadlines module."""
+
+import threading
+import time
+import unittest
+
+from findpatientzero.engine.deadlines import DeadlineScheduler
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+
+
+def new_game(seed=0, deadline=10.0):
+    config = GameConfig(
+        num_players=4,
+        num_cities=len(CITY_NAMES),
+        auto_roll=False,
+        sus_prompt_deadline=deadline,
+        roll_prompt_deadline=deadline,
+        city_prompt_deadline=deadline,
+    )
+    return Game(config, ["Ann", "Bob"], CITY_NAMES, seed=seed)
+
+
+def step_to(game, phase):
+    while game.phase != phase:
+        game.go_to_next_phase()
+
+
+class TestPromptDeadlines(unittest.TestCase):
+    def test_deadline_only_in_prompt_phases(self):
+        game = new_game()
+        self.assertIsNone(game.prompt_deadline)
+        game.go_to_next_phase()
+        self.assertIsNone(game.prompt_deadline)
+        game.go_to_next_phase()
+        self.assertEqual(game.phase, GamePhase.SUS_PROMPTS)
+        self.assertIsNotNone(game.prompt_deadline)
+
+    def test_no_deadlines_by_default(self):
+        game = Game(GameConfig(num_players=4, num_cities=4, auto_roll=False), ["Ann"], CITY_NAMES, seed=0)
+        step_to(game, GamePhase.ROLL_DICE)
+        self.assertIsNone(game.prompt_deadline)
+        self.assertFalse(game.expire_prompts(now=float("inf")))
+
+    def test_expired_prompts_are_answered(self):
+        game = new_game()
+        step_to(game, GamePhase.ROLL_DICE)
+        ann = game.get_player("Ann")
+        self.assertTrue(ann.roll_prompt_pending)
+        deadline = game.prompt_deadline
+
+        self.assertFalse(game.expire_prompts(now=deadline - 1))
+        self.assertEqual(game.phase, GamePhase.ROLL_DICE)
+        self.assertTrue(game.expire_prompts(now=deadline))
+        self.assertEqual(game.phase, GamePhase.ROLL_EVENTS)
+        self.assertTrue(1 <= ann.roll_prompt_response <= 100)
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def test_poll_expires_due_games_only(self):
+        scheduler = DeadlineScheduler()
+        games = [new_game(seed) for seed in range(3)]
+        for game in games:
+            scheduler.watch(game)
+            step_to(game, GamePhase.ROLL_DICE)
+        games[1].get_player("Ann").respond_roll(10)
+        games[1].get_player("Bob").respond_roll(20)
+        games[1].go_to_next_phase()
+
+        deadline = max(game.prompt_deadline for game in (games[0], games[2]))
+        self.assertEqual(scheduler.poll(now=deadline), [games[0], games[2]])
+        self.assertEqual(games[0].phase, GamePhase.ROLL_EVENTS)
+        self.assertEqual(games[1].phase, GamePhase.ROLL_EVENTS)
+        self.assertEqual(scheduler.poll(now=deadline), [])
+
+    def test_unwatched_games_are_not_scheduled(self):
+        scheduler = DeadlineScheduler()
+        game = new_game()
+        unwatch = scheduler.watch(game)
+        unwatch()
+        step_to(game, GamePhase.ROLL_DICE)
+        self.assertEqual(len(scheduler), 0)
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_scheduled_deadlines_of_unwatched_games_are_skipped(self):
+        scheduler = DeadlineScheduler()
+        game = new_game()
+        unwatch = scheduler.watch(game)
+        step_to(game, GamePhase.ROLL_DICE)
+        unwatch()
+        self.assertEqual(scheduler.poll(now=game.prompt_deadline), [])
+        self.assertEqual(game.phase, GamePhase.ROLL_DICE)
+        with self.assertRaises(KeyError):
+            scheduler.lock(game)
+
+    def test_background_thread_expires_deadlines(self):
+        expired = threading.Event()
+
+        def expire(game, deadline):
+            game.expire_prompts(deadline)
+            expired.set()
+
+        scheduler = DeadlineScheduler(expire)
+        scheduler.start()
+        try:
+            game = new_game(deadline=0.05)
+            scheduler.watch(game)
+            with scheduler.lock(game):
+                step_to(game, GamePhase.ROLL_DICE)
+            start = time.monotonic()
+            self.assertTrue(expired.wait(5))
+            self.assertGreaterEqual(time.monotonic() - start, 0.01)
+            with scheduler.lock(game):
+                self.assertEqual(game.phase, GamePhase.ROLL_EVENTS)
+        finally:
+            scheduler.stop()
+
+    def test_expiry_is_serialized_with_responses(self):
+        """A deadline that passes while a request holds the game's lock does not advance the game twice."""
+        scheduler = DeadlineScheduler()
+        scheduler.start()
+        try:
+            game = new_game(deadline=0.02)
+            scheduler.watch(game)
+            with scheduler.lock(game):
+                step_to(game, GamePhase.ROLL_DICE)
+                time.sleep(0.1)
+                ids = [game.player_id(game.get_player(name)) for name in ("Ann", "Bob")]
+                self.assertTrue(game.submit_responses({ids[0]: 10, ids[1]: 20}))
+            time.sleep(0.1)
+            with scheduler.lock(game):
+                self.assertEqual(game.phase, GamePhase.ROLL_EVENTS)
+                self.assertEqual(game.get_player("Ann").roll_prompt_response, 10)
+        finally:
+            scheduler.stop()
+
+    def test_errors_do_not_stop_the_background_thread(self):
+        expired = []
+
+        def expire(game, deadline):
+            if not expired:
+                expired.append(None)
+                raise RuntimeError("boom")
+            game.expire_prompts(deadline)
+            expired.append(game)
+
+        scheduler = DeadlineScheduler(expire)
+        scheduler.start()
+        try:
+            with self.assertLogs("findpatientzero.engine.deadlines", "ERROR"):
+                for game in (new_game(seed, deadline=0.02) for seed in range(2)):
+                    scheduler.watch(game)
+                    with scheduler.lock(game):
+                        step_to(game, GamePhase.ROLL_DICE)
+                deadline = time.monotonic() + 5
+                while len(expired) < 2 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            self.assertEqual(len(expired), 2)
+        finally:
+            scheduler.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+"""Tests for classes in the Game module."""
+
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from findpatientzero.engine.entities.event import EVENTS, EventCategory
+from findpatientzero.engine.game import Game, GameConfig, GamePhase, ResponseError
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta"]
+
+
+def new_game(seed=1, num_players=6, **config):
+    """Create an all-CPU game."""
+    config = GameConfig(num_players=num_players, num_cities=len(CITY_NAMES), **config)
+    return Game(config, [], CITY_NAMES, seed=seed)
+
+
+def play(game, max_round=60):
+    """Step a game phase by phase until it is over."""
+    while game.phase != GamePhase.GAME_OVER and game.round < max_round:
+        game.go_to_next_phase()
+    return game
+
+
+def summary(game):
+    """A comparable summary of a game's current state."""
+    return (
+        game.round,
+        game.phase,
+        [(player.health, player.role, str(player.city)) for player in game.players],
+        [(city.infection_stage, city.alerted) for city in game.cities],
+    )
+
+
+def history(game):
+    """A comparable summary of a game's committed states."""
+    players = game.players
+    return [
+        (
+            state.round,
+            sorted((players.index(player), player_state.health, str(player_state.city), player_state.event.description)
+                   for player, player_state in state.players.items()),
+            [(str(city), city_state.infection_stage, city_state.alerted, city_state.event.description)
+             for city, city_state in state.cities.items()],
+        )
+        for state in game._history
+    ]
+
+
+class TestGame(unittest.TestCase):
+    def setUp(self):
+        self.game = new_game()
+
+    def test_seed_is_deterministic(self):
+        self.assertEqual(summary(play(new_game(seed=5))), summary(play(new_game(seed=5))))
+
+    def test_fork_copies_current_state(self):
+        play(self.game, max_round=3)
+        fork = self.game.fork()
+        self.assertEqual(summary(fork), summary(self.game))
+        self.assertEqual(self.game.players.index(self.game.patient_zero), fork.players.index(fork.patient_zero))
+        for player in fork.players:
+            if player.city is not None:
+                self.assertIn(player.city, fork.cities)
+
+    def test_fork_is_independent(self):
+        play(self.game, max_round=3)
+        before = summary(self.game)
+        last_state = self.game.last_state
+        fork = self.game.fork()
+        play(fork)
+        self.assertEqual(summary(self.game), before)
+        self.assertIs(self.game.last_state, last_state)
+
+    def test_fork_does_not_advance_parent_rng(self):
+        play(self.game, max_round=3)
+        other = new_game()
+        play(other, max_round=3)
+        self.game.fork()
+        self.assertEqual(summary(play(self.game)), summary(play(other)))
+
+    def test_fork_seed(self):
+        play(self.game, max_round=2)
+        self.assertEqual(summary(play(self.game.fork(seed=9))), summary(play(self.game.fork(seed=9))))
+
+    def test_run_to_end_matches_stepping(self):
+        for seed in range(6):
+            for config in ({}, {"auto_roll": False}, {"auto_roll": False, "cpu_governors": True}):
+                stepped = play(new_game(seed=seed, **config), max_round=40)
+                fused = new_game(seed=seed, **config)
+                fused.run_to_end(max_round=40)
+                self.assertEqual(summary(fused), summary(stepped))
+                self.assertEqual(history(fused)[1:], history(stepped)[1:])
+
+    def test_run_rounds(self):
+        self.assertEqual(self.game.run_rounds(3), 3)
+        self.assertEqual(self.game.round, 4)
+        self.assertEqual(self.game.phase, GamePhase.ROUND_START)
+
+    def test_views_are_not_copied(self):
+        self.assertIs(self.game.players, self.game.players)
+        self.assertIs(self.game.cities, self.game.cities)
+        self.assertIsInstance(self.game.players, tuple)
+
+    def test_lookups(self):
+        for index, player in enumerate(self.game.players):
+            self.assertEqual(self.game.player_id(player), index)
+            self.assertIs(self.game.get_player(index), player)
+            self.assertIs(self.game.get_player(player.name.upper()), player)
+        for index, city in enumerate(self.game.cities):
+            self.assertEqual(self.game.city_id(city), index)
+            self.assertIs(self.game.get_city(index), city)
+            self.assertIs(self.game.get_city(city.name), city)
+        self.assertIsNone(self.game.get_player(-1))
+        self.assertIsNone(self.game.get_player(len(self.game.players)))
+        self.assertIsNone(self.game.get_city("Nowhere"))
+
+    def test_fork_lookups(self):
+        fork = self.game.fork()
+        self.assertIs(fork.get_player(0), fork.players[0])
+        self.assertIs(fork.get_city(CITY_NAMES[0]), fork.cities[0])
+        self.assertEqual(fork.player_id(fork.players[2]), 2)
+
+    def test_custom_events(self):
+        """Games roll from the events of their configuration, forks included."""
+        events = {**EVENTS, EventCategory.TRAV_HEALTHY: [
+            event for event in EVENTS[EventCategory.TRAV_HEALTHY] if event.action == "stay"
+        ]}
+        events[EventCategory.TRAV_INFECTED] = events[EventCategory.TRAV_HEALTHY]
+        game = new_game(seed=3, events=events)
+        start = [player.city for player in game.players]
+        game.run_rounds(3)
+        fork = game.fork()
+        play(fork, max_round=10)
+        for players in (game.players, fork.players):
+            for player, city in zip(players, start):
+                if player.city is not None:
+                    self.assertEqual(str(player.city), str(city))
+        self.assertEqual(history(new_game(seed=3, events=dict(EVENTS))), history(new_game(seed=3)))
+
+    def test_run_rounds_requires_cpu_players(self):
+        game = Game(GameConfig(num_players=3, num_cities=len(CITY_NAMES)), ["Human"], CITY_NAMES, seed=1)
+        with self.assertRaises(RuntimeError):
+            game.run_rounds(1)
+
+
+class TestSubmitResponses(unittest.TestCase):
+    def new_human_game(self, seed):
+        config = GameConfig(num_players=5, num_cities=len(CITY_NAMES), auto_roll=False)
+        return Game(config, ["Ann", "Bob"], CITY_NAMES, seed=seed)
+
+    def responses(self, game):
+        """Deterministic answers to every pending human prompt, by player ID."""
+        responses = dict()
+        for player_id, player in enumerate(game.players):
+            if player.sus_prompt_pending:
+                responses[player_id] = game.round % 2 == 0
+            elif player.roll_prompt_pending:
+                responses[player_id] = (game.round * 7 + player_id) % 100 + 1
+            elif player.pending_city_prompt:
+                responses[player_id] = player.city_options(game.cities)[-1]
+        return responses
+
+    def test_matches_individual_responses(self):
+        for seed in range(10):
+            batched = self.new_human_game(seed)
+            single = self.new_human_game(seed)
+            while batched.phase != GamePhase.GAME_OVER and batched.round < 30:
+                responses = self.responses(single)
+                for player_id, response in responses.items():
+                    player = single.players[player_id]
+                    if single.phase == GamePhase.SUS_PROMPTS:
+                        player.respond_suspicious(response)
+                    elif single.phase == GamePhase.ROLL_DICE:
+                        player.respond_roll(response)
+                    else:
+                        player.respond_city_choice(response)
+                single.go_to_next_phase()
+
+                if batched.phase in (GamePhase.SUS_PROMPTS, GamePhase.ROLL_DICE, GamePhase.CITY_PROMPTS):
+                    responses = {
+                        player_id: batched.city_id(batched.get_city(str(response)))
+                        if batched.phase == GamePhase.CITY_PROMPTS else response
+                        for player_id, response in responses.items()
+                    }
+                    self.assertTrue(batched.submit_responses(responses))
+                else:
+                    batched.go_to_next_phase()
+                self.assertEqual(summary(batched), summary(single))
+
+    def test_invalid_batch_is_rejected_whole(self):
+        game = self.new_human_game(0)
+        while game.phase != GamePhase.ROLL_DICE:
+            game.go_to_next_phase()
+        ann, bob = game.get_player("Ann"), game.get_player("Bob")
+        with self.assertRaises(ResponseError) as raised:
+            game.submit_responses({0: 50, 1: 101, 2: 50, 99: 50})
+        self.assertEqual(set(raised.exception.errors), {1, 2, 99})
+        self.assertIsNone(ann.roll_prompt_response)
+        self.assertEqual(game.phase, GamePhase.ROLL_DICE)
+
+        self.assertFalse(game.submit_responses({0: 50}))
+        self.assertEqual(ann.roll_prompt_response, 50)
+        self.assertEqual(game.phase, GamePhase.ROLL_DICE)
+        self.assertTrue(game.submit_responses({1: 7}))
+        self.assertEqual(bob.roll_prompt_response, 7)
+        self.assertEqual(game.phase, GamePhase.ROLL_EVENTS)
+
+    def test_rejects_phases_without_prompts(self):
+        game = self.new_human_game(0)
+        with self.assertRaises(RuntimeError):
+            game.submit_responses({0: 50})
+
+
+class TestConcurrency(unittest.TestCase):
+    CONFIGS = ({}, {"auto_roll": False}, {"auto_roll": False, "cpu_governors": True})
+
+    @staticmethod
+    def run_game(seed):
+        """Play a game to the end (and a fork of it), returning comparable results."""
+        config = TestConcurrency.CONFIGS[seed % len(TestConcurrency.CONFIGS)]
+        game = new_game(seed=seed, **config)
+        game.run_rounds(2)
+        fork = game.fork()
+        game.run_to_end(max_round=30)
+        play(fork, max_round=30)
+        return [player.name for player in game.players], history(game), summary(fork)
+
+    def test_threads_match_single_threaded_runs(self):
+        """Hundreds of games played concurrently in threads give the same results as one at a time."""
+        seeds = range(240)
+        expected = [self.run_game(seed) for seed in seeds]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(16) as pool:
+                results = list(pool.map(self.run_game, seeds))
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(results, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
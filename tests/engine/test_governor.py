@@ -0,0 +1,104 @@
+"""Tests for the CPU governor policy module."""
+
+import unittest
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.event import EVENTS, NULL_EVENT, EventCategory
+from findpatientzero.engine.entities.player import CPUPlayer, PlayerRole, PlayerState
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.governor import GovernorPolicy, event_key
+from findpatientzero.engine.governor_compiler import compile_policy
+from findpatientzero.engine.hooks import Hook
+
+
+class TestGovernorPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = GovernorPolicy.default()
+        self.city = City("Alpha")
+        self.city.add_state(CityState(infection_stage=5, alerted=True))
+        self.governor = CPUPlayer([self.city])
+        self.governor.add_state(PlayerState(role=PlayerRole.GOVERNOR, city=self.city))
+
+    def test_roll_for_matches_pool(self):
+        """The computed roll picks an event with the requested key from the real pool."""
+        events = EVENTS[EventCategory.CITY_EPIDEMIC]
+        keys = {event_key(event) for event in events}
+        for last_event in [NULL_EVENT] + events:
+            self.governor.add_state(PlayerState(role=PlayerRole.GOVERNOR, city=self.city, event=last_event))
+            pool = self.governor.event_pool()
+            for key in keys:
+                roll = self.policy.roll_for(self.governor, key)
+                if roll is None:
+                    self.assertNotIn(key, {event_key(event) for event in pool})
+                    continue
+                self.assertTrue(1 <= roll <= 100)
+                index = min((roll - 1) * len(pool) // 100, len(pool) - 1)
+                self.assertEqual(event_key(pool[index]), key)
+
+    def test_roll_for_matches_custom_pool(self):
+        """A policy for other Epidemic events picks rolls from the pools of those events."""
+        events = EVENTS[EventCategory.CITY_EPIDEMIC]
+        custom = events[::2] * 2 + events[:1]
+        policy = self.policy.with_events(custom)
+        self.governor.events = {**EVENTS, EventCategory.CITY_EPIDEMIC: custom}
+        for last_event in [NULL_EVENT] + custom:
+            self.governor.add_state(PlayerState(role=PlayerRole.GOVERNOR, city=self.city, event=last_event))
+            pool = self.governor.event_pool()
+            for key in {event_key(event) for event in events}:
+                roll = policy.roll_for(self.governor, key)
+                if roll is None:
+                    self.assertNotIn(key, {event_key(event) for event in pool})
+                    continue
+                index = min((roll - 1) * len(pool) // 100, len(pool) - 1)
+                self.assertEqual(event_key(pool[index]), key)
+
+    def test_choose_suspicious(self):
+        self.city.add_state(CityState(infection_stage=2, last_sus_roll=1))
+        self.assertIsInstance(self.policy.choose_suspicious(self.governor, 5), bool)
+        self.assertIsInstance(self.policy.choose_suspicious(self.governor, None), bool)
+
+    def test_choose_roll_only_for_alerted_governors(self):
+        roll = self.policy.choose_roll(self.governor)
+        if roll is not None:
+            self.assertTrue(1 <= roll <= 100)
+        self.city.add_state(CityState(infection_stage=5, alerted=False))
+        self.assertIsNone(self.policy.choose_roll(self.governor))
+
+    def test_cpu_governors_in_game(self):
+        config = GameConfig(num_players=6, num_cities=4, auto_roll=False, cpu_governors=True)
+        game = Game(config, [], ["Alpha", "Beta", "Gamma", "Delta"], seed=2)
+        governed = False
+        while game.phase != GamePhase.GAME_OVER and game.round < 40:
+            game.go_to_next_phase()
+            governed = governed or any(player.is_governor for player in game.players)
+        self.assertTrue(governed)
+
+    def test_cpu_governors_in_auto_roll_game(self):
+        """Without roll prompts, alerted CPU governors still roll the events of the table."""
+        config = GameConfig(num_players=8, num_cities=4, cpu_governors=True)
+        steered = 0
+        for seed in range(10):
+            game = Game(config, [], ["Alpha", "Beta", "Gamma", "Delta"], seed=seed)
+            rolls = []
+            game.hooks.subscribe(Hook.EVENT_ROLLED, lambda game, player, event: rolls.append((player, event)))
+            while game.phase != GamePhase.GAME_OVER and game.round < 40:
+                game.go_to_next_phase()
+                for player, event in rolls:
+                    if not player.is_governor or not player.city.alerted:
+                        continue
+                    key = self.policy._epidemic[self.policy.epidemic_index(player.city.state)]
+                    if key is not None and self.policy.roll_for(player, key) is not None:
+                        self.assertEqual(event_key(event), key)
+                        steered += 1
+                rolls.clear()
+        self.assertGreater(steered, 0)
+
+    def test_compile_policy(self):
+        data = compile_policy(games=3, num_players=4, num_cities=3, max_rounds=15)
+        policy = GovernorPolicy(data)
+        self.assertEqual(len(data["suspicious"]), len(data["stage_buckets"]))
+        self.assertEqual(policy.stage_buckets, data["stage_buckets"])
+
+
+if __name__ == "__main__":
+    unittest.main()
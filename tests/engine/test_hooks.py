@@ -0,0 +1,153 @@
+"""Tests for the hooks module."""
+
+import unittest
+from collections import Counter
+
+from findpatientzero.engine.entities.player import InfectionState, PlayerRole
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.hooks import Hook, HookBus, Prompt
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+
+
+def new_game(seed, **config):
+    return Game(GameConfig(num_players=8, num_cities=len(CITY_NAMES), **config), [], CITY_NAMES, seed=seed)
+
+
+class TestHookBus(unittest.TestCase):
+    def test_subscribe_and_unsubscribe(self):
+        bus = HookBus("game")
+        calls = []
+        unsubscribe = bus.subscribe(Hook.DIED, lambda game, player: calls.append((game, player)))
+        self.assertTrue(bus.active)
+        self.assertTrue(bus.wants(Hook.DIED))
+        self.assertFalse(bus.wants(Hook.INFECTED))
+
+        bus.publish(Hook.DIED, "player")
+        bus.publish(Hook.INFECTED, "player", "city")
+        self.assertEqual(calls, [("game", "player")])
+
+        unsubscribe()
+        unsubscribe()
+        self.assertFalse(bus.active)
+        bus.publish(Hook.DIED, "player")
+        self.assertEqual(len(calls), 1)
+
+    def test_unsubscribe_while_publishing(self):
+        bus = HookBus(None)
+        calls = []
+        unsubscribe = bus.subscribe(Hook.LOCKDOWN, lambda game, city: unsubscribe())
+        bus.subscribe(Hook.LOCKDOWN, lambda game, city: calls.append(city))
+        bus.publish(Hook.LOCKDOWN, "city")
+        bus.publish(Hook.LOCKDOWN, "city")
+        self.assertEqual(calls, ["city", "city"])
+
+
+class TestGameHooks(unittest.TestCase):
+    def record(self, game):
+        calls = []
+        for hook in Hook:
+            game.hooks.subscribe(hook, lambda game, *args, hook=hook: calls.append((hook, *args)))
+        return calls
+
+    def test_phase_changes_match_phases(self):
+        game = new_game(0, auto_roll=False)
+        calls = self.record(game)
+        phases = []
+        while game.phase != GamePhase.GAME_OVER and game.round < 20:
+            previous = game.phase
+            game.answer_pending_prompts()
+            game.go_to_next_phase()
+            phases.append((Hook.PHASE_CHANGED, previous, game.phase))
+        self.assertEqual([call for call in calls if call[0] == Hook.PHASE_CHANGED], phases)
+
+    def test_fast_forward_matches_stepping(self):
+        for seed in range(10):
+            for config in ({}, {"auto_roll": False, "cpu_governors": True}):
+                stepped = new_game(seed, **config)
+                stepped_calls = self.record(stepped)
+                while stepped.phase != GamePhase.GAME_OVER and stepped.round < 30:
+                    stepped.go_to_next_phase()
+                fast = new_game(seed, **config)
+                fast_calls = self.record(fast)
+                fast.run_to_end(max_round=30)
+
+                def names(calls):
+                    return [tuple(getattr(arg, "name", arg) for arg in call) for call in calls]
+                self.assertEqual(names(fast_calls), names(stepped_calls))
+
+    def test_state_changes(self):
+        counts = Counter()
+        for seed in range(20):
+            game = new_game(seed, auto_roll=False, cpu_governors=True)
+            calls = self.record(game)
+            game.run_to_end(max_round=60)
+            counts.update(call[0] for call in calls)
+
+            deaths = [call[1] for call in calls if call[0] == Hook.DIED]
+            self.assertEqual(len(deaths), len(set(deaths)))
+            self.assertEqual(
+                set(deaths),
+                {player for player in game.players if player.state.health == InfectionState.DEAD},
+            )
+            infected = {call[1] for call in calls if call[0] == Hook.INFECTED}
+            self.assertNotIn(game.patient_zero, infected)
+            self.assertEqual(
+                infected | {game.patient_zero},
+                {player for player in game.players if player.state.health != InfectionState.HEALTHY},
+            )
+            alerted = [call[1] for call in calls if call[0] == Hook.CITY_ALERTED]
+            self.assertEqual(set(alerted), {city for city in game.cities if city.alerted})
+            for hook, player, role, city in (call for call in calls if call[0] == Hook.ROLE_REASSIGNED):
+                self.assertIn(role, (PlayerRole.GOVERNOR, PlayerRole.OBSERVER))
+                self.assertEqual(city is not None, role == PlayerRole.GOVERNOR)
+
+        for hook in Hook:
+            self.assertGreater(counts[hook], 0, hook)
+
+    def test_prompts_answered_after_issued(self):
+        game = new_game(3, auto_roll=False, cpu_governors=True)
+        calls = self.record(game)
+        game.run_to_end(max_round=30)
+        issued = [call[1:] for call in calls if call[0] == Hook.PROMPT_ISSUED]
+        answered = [call[1:3] for call in calls if call[0] == Hook.PROMPT_ANSWERED]
+        self.assertEqual(issued, answered)
+        self.assertTrue(any(prompt == Prompt.SUSPICIOUS for _, prompt in issued))
+
+    def test_human_answers(self):
+        game = Game(GameConfig(num_players=3, num_cities=len(CITY_NAMES), auto_roll=False), ["Ann"], CITY_NAMES, seed=0)
+        calls = self.record(game)
+        game.go_to_next_phase()
+        game.go_to_next_phase()
+        game.go_to_next_phase()
+        human = game.get_player("Ann")
+        self.assertIn((Hook.PROMPT_ISSUED, human, Prompt.ROLL), calls)
+        human.respond_roll(42)
+        self.assertEqual(calls[-1], (Hook.PROMPT_ANSWERED, human, Prompt.ROLL, 42))
+
+    def test_fork_starts_without_subscribers(self):
+        game = new_game(1)
+        calls = self.record(game)
+        game.run_rounds(3)
+        count = len(calls)
+        fork = game.fork()
+        self.assertFalse(fork.hooks.active)
+        self.assertTrue(all(player.hooks is fork.hooks for player in fork.players))
+        fork.run_rounds(3)
+        self.assertEqual(len(calls), count)
+
+    def test_hooks_do_not_change_the_game(self):
+        plain = new_game(5, auto_roll=False, cpu_governors=True)
+        plain.run_to_end(max_round=40)
+        observed = new_game(5, auto_roll=False, cpu_governors=True)
+        self.record(observed)
+        observed.run_to_end(max_round=40)
+        self.assertEqual(
+            [(state.health, state.role) for state in (player.state for player in plain.players)],
+            [(state.health, state.role) for state in (player.state for player in observed.players)],
+        )
+        self.assertEqual(plain.round, observed.round)
+
+
+if __name__ == "__main__":
+    unittest.main()
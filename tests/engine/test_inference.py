@@ -0,0 +1,90 @@
+"""Tests for the Patient Zero inference module."""
+
+import math
+import unittest
+
+from findpatientzero.engine.entities.city import City, CityState
+from findpatientzero.engine.entities.player import InfectionState, Player, PlayerState
+from findpatientzero.engine.game import Game, GameConfig, GamePhase, GameState
+from findpatientzero.engine.inference import PatientZeroInference, onset_hazard
+from findpatientzero.engine.transitions import HealthTransitions
+
+
+class TestInference(unittest.TestCase):
+    def setUp(self):
+        self.cities = [City("Alpha"), City("Beta")]
+        self.players = [Player("Ann"), Player("Bob"), Player("Cid")]
+        self.inference = PatientZeroInference(self.players)
+        self.inference.observe(self._state(0, {}))
+
+    def _state(self, game_round, health):
+        return GameState(
+            round=game_round,
+            players={
+                player: PlayerState(
+                    health=health.get(player, InfectionState.HEALTHY),
+                    city=self.cities[0],
+                )
+                for player in self.players
+            },
+            cities={city: CityState() for city in self.cities},
+        )
+
+    def test_onset_hazard(self):
+        self.assertEqual(onset_hazard(4), 0.0)
+        self.assertGreater(onset_hazard(5), 0.0)
+        self.assertEqual(onset_hazard(10), 1.0)
+
+    def test_uniform_prior(self):
+        for player in self.players:
+            self.assertAlmostEqual(self.inference.probability(player), 1 / 3)
+
+    def test_early_onset_identifies_patient_zero(self):
+        """Only Patient Zero can show symptoms five rounds into the game."""
+        for game_round in range(1, 5):
+            self.inference.observe(self._state(game_round, {}))
+        self.inference.observe(self._state(5, {self.players[1]: InfectionState.SYMPTOMATIC}))
+        self.assertEqual(self.inference.most_likely(), self.players[1])
+        self.assertAlmostEqual(self.inference.probability(self.players[1]), 1.0)
+
+    def test_no_onset_rules_out_patient_zero(self):
+        """Patient Zero always shows onset by round 10."""
+        onset = {self.players[0]: InfectionState.IMMUNE}
+        for game_round in range(1, 11):
+            self.inference.observe(self._state(game_round, onset if game_round >= 8 else {}))
+        self.assertAlmostEqual(self.inference.probability(self.players[0]), 1.0)
+
+    def test_rejects_repeated_round(self):
+        with self.assertRaises(ValueError):
+            self.inference.observe(self._state(0, {}))
+
+    def test_game_posterior(self):
+        game = Game(GameConfig(num_players=6, num_cities=4), [], ["Alpha", "Beta", "Gamma", "Delta"])
+        inference = PatientZeroInference.from_history(game, [game.last_state])
+        while game.phase != GamePhase.GAME_OVER and game.round < 30:
+            resolving = game.phase == GamePhase.RESOLVE_MOVES
+            game.go_to_next_phase()
+            if resolving:
+                inference.observe(game.last_state)
+                self.assertTrue(math.isclose(sum(inference.posterior.values()), 1.0))
+        self.assertEqual(inference.round, game.last_state.round)
+
+    def test_game_transition_table(self):
+        """Posteriors follow the table the game plays with, not the one of the game data."""
+        deadly = HealthTransitions({"stages": [
+            {"max_age": 0, "spread_above": 0, "outcomes": []},
+            {"spread_above": 0, "outcomes": [{"above": 0, "health": "Dead"}]},
+        ]})
+        config = GameConfig(num_players=6, num_cities=4, health_transitions=deadly)
+        game = Game(config, [], ["Alpha", "Beta", "Gamma", "Delta"], seed=1)
+        inference = PatientZeroInference.from_history(game, [game.last_state])
+        self.assertIs(inference.transitions, deadly)
+        game.run_rounds(1)
+        inference.observe(game.last_state)
+        # Only Patient Zero can die one round into the game
+        self.assertEqual(game.patient_zero.state.health, InfectionState.DEAD)
+        self.assertAlmostEqual(inference.probability(game.patient_zero), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Tests for the epidemic metrics module."""
+
+import unittest
+
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.engine.game import Game, GameConfig
+from findpatientzero.engine.metrics import EpidemicMetrics
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta"]
+
+
+def new_game(seed, **config):
+    """Create an all-CPU game that collects metrics."""
+    config = GameConfig(num_players=8, num_cities=len(CITY_NAMES), collect_metrics=True, **config)
+    return Game(config, [], CITY_NAMES, seed=seed)
+
+
+class TestEpidemicMetrics(unittest.TestCase):
+    def test_matches_history(self):
+        """The incremental metrics match metrics rebuilt from the full history."""
+        for seed in range(8):
+            game = new_game(seed)
+            game.run_to_end(max_round=40)
+            assert game.metrics is not None
+            self.assertEqual(game.metrics.summary(), EpidemicMetrics.from_history(game._history).summary())
+
+    def test_without_history(self):
+        """Games with history disabled keep only the latest state but produce the same metrics."""
+        for seed in range(4):
+            full = new_game(seed)
+            full.run_to_end(max_round=40)
+            light = new_game(seed, keep_history=False)
+            light.run_to_end(max_round=40)
+            assert full.metrics is not None and light.metrics is not None
+            self.assertEqual(light.metrics.summary(), full.metrics.summary())
+            self.assertEqual(len(light._history), 1)
+            self.assertEqual(light.last_state.round, full.last_state.round)
+
+    def test_summary(self):
+        game = new_game(3)
+        game.run_to_end(max_round=40)
+        assert game.metrics is not None
+        summary = game.metrics.summary()
+        self.assertEqual(summary["infected"][0], 1)
+        self.assertEqual(len(summary["deaths"]), game.last_state.round + 1)
+        dead = sum(player.state.health == InfectionState.DEAD for player in game.players)
+        self.assertEqual(summary["total_deaths"], dead)
+        self.assertEqual(summary["peak_stage"], max(summary["max_stage"]))
+
+    def test_fork_copies_metrics(self):
+        game = new_game(5)
+        game.run_rounds(3)
+        fork = game.fork()
+        assert game.metrics is not None and fork.metrics is not None
+        before = game.metrics.summary()
+        fork.run_rounds(2)
+        self.assertEqual(game.metrics.summary(), before)
+        self.assertEqual(fork.metrics.rounds[:len(game.metrics.rounds)], game.metrics.rounds)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(Game(GameConfig(num_players=3, num_cities=2), [], ["Alpha", "Beta"], seed=1).metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""Tests for the name allocation module."""
+
+import random
+import unittest
+
+from findpatientzero.engine.game import Game, GameConfig
+from findpatientzero.engine.names import NamePool, cpu_names
+
+
+class TestNamePool(unittest.TestCase):
+    def test_draws_without_replacement(self):
+        names = tuple(f"Name {i}" for i in range(50))
+        pool = NamePool(names, random.Random(1))
+        drawn = [pool.draw() for _ in range(50)]
+        self.assertEqual(sorted(drawn), sorted(names))
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(names, tuple(f"Name {i}" for i in range(50)))
+
+    def test_falls_back_to_generated_names(self):
+        pool = NamePool(("Ada", "CPU 1"), random.Random(2), fallback="CPU")
+        drawn = [pool.draw() for _ in range(4)]
+        self.assertEqual(sorted(drawn[:2]), ["Ada", "CPU 1"])
+        self.assertEqual(drawn[2:], ["CPU 2", "CPU 3"])
+
+    def test_skips_taken_names(self):
+        pool = NamePool(("Ada", "Bob"), random.Random(3), taken=["Ada"])
+        self.assertEqual([pool.draw(), pool.draw()], ["Bob", "CPU 1"])
+
+    def test_games_do_not_drain_names(self):
+        """Many large games can be created in one process."""
+        config = GameConfig(num_players=len(cpu_names()) + 5, num_cities=3)
+        for seed in range(3):
+            game = Game(config, ["Human"], ["Alpha", "Beta", "Gamma"], seed=seed)
+            names = [player.name for player in game.players]
+            self.assertEqual(len(set(names)), len(names))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Tests for the player registry module."""
+
+import unittest
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+
+
+class TestPlayerRegistry(unittest.TestCase):
+    def assert_partitions(self, game):
+        registry = game._registry
+        players = game.players
+        self.assertEqual(registry.travelers, [player for player in players if player.is_traveler])
+        self.assertEqual(registry.observers, [player for player in players if player.is_observer])
+        self.assertEqual(registry.active, [player for player in players if not player.is_observer])
+        self.assertEqual(
+            list(registry.governors.items()),
+            [(player.city, player) for player in players if player.is_governor],
+        )
+        for city in game.cities:
+            self.assertIs(game.get_governor(city), registry.governors.get(city))
+
+    def test_partitions_follow_role_changes(self):
+        for seed in range(5):
+            config = GameConfig(num_players=8, num_cities=len(CITY_NAMES), auto_roll=False, cpu_governors=True)
+            game = Game(config, [], CITY_NAMES, seed=seed)
+            while game.phase != GamePhase.GAME_OVER and game.round < 40:
+                game.go_to_next_phase()
+                self.assert_partitions(game)
+            self.assertTrue(game._registry.observers or game._registry.governors)
+
+    def test_fork_has_own_registry(self):
+        game = Game(GameConfig(num_players=6, num_cities=len(CITY_NAMES)), [], CITY_NAMES, seed=1)
+        game.run_rounds(5)
+        fork = game.fork()
+        self.assert_partitions(fork)
+        self.assertTrue(all(player in fork.players for player in fork._registry.active))
+
+
+if __name__ == "__main__":
+    unittest.main()
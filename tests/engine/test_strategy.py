@@ -0,0 +1,68 @@
+"""Tests for the CPU strategy module."""
+
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from findpatientzero.engine.entities.event import Event, EventCategory
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.strategy import RolloutStrategy, rollout
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon"]
+CHOOSE_EVENT = Event(category=EventCategory.TRAV_HEALTHY, description="Choose", action="choose")
+
+
+def new_game(auto_roll=True):
+    config = GameConfig(num_players=6, num_cities=len(CITY_NAMES), auto_roll=auto_roll)
+    return Game(config, [], CITY_NAMES, seed=3)
+
+
+class TestRolloutStrategy(unittest.TestCase):
+    def setUp(self):
+        self.game = new_game()
+        self.game.go_to_next_phase()
+        self.player = self.game.players[0]
+        self.player._next_event = CHOOSE_EVENT
+
+    def test_choose_city_within_budget(self):
+        strategy = RolloutStrategy(self.game, time_budget=0.005)
+        options = self.player.city_options(self.game.cities)
+        start = perf_counter()
+        city = strategy.choose_city(self.player, options)
+        self.assertLess(perf_counter() - start, 0.05)
+        self.assertIn(city, options)
+
+    def test_choose_city_parallel(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            strategy = RolloutStrategy(self.game, time_budget=0.005, executor=executor)
+            options = self.player.city_options(self.game.cities)
+            self.assertIn(strategy.choose_city(self.player, options), options)
+
+    def test_slow_process_pool_falls_back_to_this_thread(self):
+        """Actions are still evaluated while a new process pool starts its workers."""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            strategy = RolloutStrategy(self.game, time_budget=0.05, executor=executor)
+            options = self.player.city_options(self.game.cities)
+            actions = [("city", self.game.city_id(city)) for city in options]
+            stats = strategy._search_parallel(self.game.player_id(self.player), actions)
+        self.assertGreater(len(actions), 1)
+        self.assertTrue(all(count > 0 for count, _ in stats))
+
+    def test_rollout_does_not_touch_game(self):
+        round_before, phase_before = self.game.round, self.game.phase
+        score = rollout(self.game.fork(), 0, ("city", 1), horizon=3)
+        self.assertGreaterEqual(score, 0.0)
+        self.assertLessEqual(score, 1.0)
+        self.assertEqual((self.game.round, self.game.phase), (round_before, phase_before))
+
+    def test_play_with_strategy(self):
+        for auto_roll in (True, False):
+            game = new_game(auto_roll)
+            RolloutStrategy.attach(game, time_budget=0.001, max_rollouts=8)
+            while game.phase != GamePhase.GAME_OVER and game.round < 30:
+                game.go_to_next_phase()
+            self.assertNotEqual(game.phase, GamePhase.ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Tests for the health transitions module."""
+
+import unittest
+
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.engine.game import Game, GameConfig
+from findpatientzero.engine.transitions import INFECTED_STATES, HealthTransitions
+
+
+def original_rules(health, age, roll):
+    """The progression rules the default table was compiled from."""
+    if age <= 4:
+        return health, roll > 50
+    if age <= 9:
+        if 40 < roll <= 87:
+            return InfectionState.SYMPTOMATIC, True
+        if roll > 87:
+            return InfectionState.DEAD, True
+        return health, True
+    return (InfectionState.IMMUNE if roll <= 50 else InfectionState.DEAD), True
+
+
+class TestHealthTransitions(unittest.TestCase):
+    def test_default_table(self):
+        table = HealthTransitions.default()
+        for health in INFECTED_STATES:
+            for age in range(15):
+                for roll in range(1, 101):
+                    self.assertEqual(table.apply(health, age, roll), original_rules(health, age, roll))
+
+    def test_onset_probability(self):
+        table = HealthTransitions.default()
+        self.assertEqual(table.onset_probability(4), 0.0)
+        self.assertAlmostEqual(table.onset_probability(7), 0.6)
+        self.assertEqual(table.onset_probability(20), 1.0)
+
+    def test_outcome_probabilities(self):
+        table = HealthTransitions.default()
+        outcomes, spread = table.outcome_probabilities(InfectionState.ASYMPTOMATIC, 2)
+        self.assertEqual(outcomes, {InfectionState.ASYMPTOMATIC: 1.0})
+        self.assertAlmostEqual(spread, 0.5)
+        outcomes, spread = table.outcome_probabilities(InfectionState.SYMPTOMATIC, 7)
+        self.assertAlmostEqual(outcomes[InfectionState.SYMPTOMATIC], 0.87)
+        self.assertAlmostEqual(outcomes[InfectionState.DEAD], 0.13)
+        self.assertEqual(spread, 1.0)
+        outcomes, _ = table.outcome_probabilities(InfectionState.ASYMPTOMATIC, 30)
+        self.assertAlmostEqual(outcomes[InfectionState.IMMUNE], 0.5)
+        self.assertAlmostEqual(sum(outcomes.values()), 1.0)
+
+    def test_invalid_tables(self):
+        with self.assertRaises(ValueError):
+            HealthTransitions({"stages": [{"max_age": 3, "spread_above": 0, "outcomes": []}]})
+        with self.assertRaises(ValueError):
+            HealthTransitions({"stages": [
+                {"max_age": 5, "spread_above": 0, "outcomes": []},
+                {"max_age": 2, "spread_above": 0, "outcomes": []},
+                {"spread_above": 0, "outcomes": []},
+            ]})
+
+    def test_configurable_thresholds(self):
+        """A table where infected travelers die the round after infection ends games quickly."""
+        deadly = HealthTransitions({"stages": [
+            {"max_age": 0, "spread_above": 0, "outcomes": []},
+            {"spread_above": 0, "outcomes": [{"above": 0, "health": "Dead"}]},
+        ]})
+        config = GameConfig(num_players=4, num_cities=3, health_transitions=deadly)
+        game = Game(config, [], ["Alpha", "Beta", "Gamma"], seed=1)
+        game.run_rounds(1)
+        self.assertEqual(game.patient_zero.state.health, InfectionState.DEAD)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from findpatientzero.gamedata.load import (
     load_cpu_names,
     load_event_types,
     load_events,
+    load_health_transitions,
 )
 from findpatientzero.gamedata.schema import (
     ConditionData,
@@ -36,6 +37,9 @@ class TestLoad(unittest.TestCase):
         self.assertIsInstance(load_events("traveler_healthy"), list)
         self.assertIsInstance(load_events("traveler_infected"), list)
 
+    def test_load_health_transitions(self):
+        self.assertIsInstance(load_health_transitions()["stages"], list)
+
     # def test_load_event_types_data(self):
     #     event_types = load_event_types("city")
     #     for event_type in event_types:
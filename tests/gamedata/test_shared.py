@@ -0,0 +1,98 @@
+"""Unit tests for the gamedata.shared module."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from findpatientzero.gamedata.load import (
+    load_city_names,
+    load_cpu_names,
+    load_events,
+    load_governor_policy,
+)
+from findpatientzero.gamedata import shared as shared_module
+from findpatientzero.gamedata.shared import (
+    ENV_VAR,
+    GameDataBuffer,
+    SharedGameData,
+    attached,
+    init_worker,
+    pack_game_data,
+)
+
+
+def _loaded_in_worker():
+    return load_cpu_names()[:3], load_events("city_epidemic")[0], load_governor_policy()["stage_buckets"]
+
+
+class TestGameDataBuffer(unittest.TestCase):
+    def setUp(self):
+        self.data = GameDataBuffer(memoryview(pack_game_data()))
+
+    def tearDown(self):
+        self.data.release()
+
+    def test_names(self):
+        self.assertEqual(list(self.data.names("cpu_names")), load_cpu_names())
+        self.assertEqual(list(self.data.names("city_names")), load_city_names())
+
+    def test_string_table_indexing(self):
+        names = self.data.names("cpu_names")
+        expected = load_cpu_names()
+        self.assertEqual(names[-1], expected[-1])
+        self.assertEqual(names[2:5], expected[2:5])
+        with self.assertRaises(IndexError):
+            names[len(expected)]
+
+    def test_events(self):
+        self.assertEqual(self.data.events("traveler_healthy"), load_events("traveler_healthy"))
+        self.assertEqual(self.data.governor_policy(), load_governor_policy())
+
+    def test_sections_are_decoded_when_read(self):
+        self.assertEqual(self.data._sections, {})
+        self.data.events("city_epidemic")
+        self.assertEqual(list(self.data._sections), ["events/city_epidemic"])
+
+    def test_rejects_other_buffers(self):
+        with self.assertRaises(ValueError):
+            GameDataBuffer(memoryview(bytes(64)))
+
+
+class TestSharedGameData(unittest.TestCase):
+    def assert_workers_read(self, shared: SharedGameData):
+        context = get_context("spawn")
+        with ProcessPoolExecutor(1, mp_context=context, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            names, event, buckets = pool.submit(_loaded_in_worker).result()
+        self.assertEqual(names, load_cpu_names()[:3])
+        self.assertEqual(event, load_events("city_epidemic")[0])
+        self.assertEqual(buckets, load_governor_policy()["stage_buckets"])
+
+    def test_shared_memory(self):
+        with SharedGameData.create() as shared:
+            self.assertTrue(shared.spec.startswith("shm:"))
+            self.assert_workers_read(shared)
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "gamedata.bin")
+            with SharedGameData.create(path) as shared:
+                self.assertTrue(shared.spec.startswith("file:"))
+                self.assert_workers_read(shared)
+            self.assertFalse(os.path.exists(path))
+
+    def test_missing_data_falls_back_to_yaml(self):
+        expected = load_cpu_names()
+        with SharedGameData.create() as shared:
+            spec = shared.spec
+        with patch.dict(os.environ, {ENV_VAR: spec}), patch.object(shared_module, "_unavailable", None):
+            with self.assertLogs("findpatientzero.gamedata.shared", "WARNING"):
+                self.assertIsNone(attached())
+            self.assertIsNone(attached())
+            self.assertEqual(load_cpu_names(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
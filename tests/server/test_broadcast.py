@@ -0,0 +1,95 @@
+"""Tests for the broadcast module."""
+
+import threading
+import unittest
+
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.server.broadcast import Broadcaster
+from findpatientzero.server.protocol import StateMirror, Visibility, decode, decode_json, snapshot
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon"]
+
+
+def new_game(seed):
+    config = GameConfig(num_players=8, num_cities=len(CITY_NAMES), auto_roll=False, cpu_governors=True)
+    return Game(config, [], CITY_NAMES, seed=seed)
+
+
+def mirror(frames, binary=True):
+    """Apply frames to a new mirror."""
+    result = StateMirror()
+    for frame in frames:
+        result.apply(decode(frame) if binary else decode_json(frame.decode()))
+    return result
+
+
+class TestBroadcaster(unittest.TestCase):
+    def assert_matches(self, result, game, visibility):
+        current = snapshot(game).redact(visibility)
+        self.assertEqual(result.round, current.round)
+        self.assertEqual(result.players, current.players)
+        self.assertEqual(result.cities, current.cities)
+        self.assertEqual(result.patient_zero, current.patient_zero)
+
+    def test_frames_are_shared_per_visibility_class(self):
+        game = new_game(0)
+        broadcaster = Broadcaster(game, max_pending=1000)
+        public = [broadcaster.subscribe() for _ in range(50)]
+        masters = [broadcaster.subscribe(Visibility.GAME_MASTER) for _ in range(5)]
+        text = broadcaster.subscribe(binary=False)
+        game.run_to_end(max_round=20)
+
+        rounds = len(public[0])
+        self.assertGreater(rounds, 10)
+        self.assertEqual(broadcaster.encodings, 3 * rounds)
+        frames = [subscription.drain() for subscription in public]
+        for other in frames[1:]:
+            self.assertTrue(all(a is b for a, b in zip(other, frames[0])))
+        self.assert_matches(mirror(frames[0]), game, Visibility.PUBLIC)
+        self.assert_matches(mirror(masters[0].drain()), game, Visibility.GAME_MASTER)
+        self.assert_matches(mirror(text.drain(), binary=False), game, Visibility.PUBLIC)
+
+    def test_slow_subscribers_are_coalesced(self):
+        game = new_game(1)
+        broadcaster = Broadcaster(game, max_pending=3)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe(max_pending=1000)
+        game.run_to_end(max_round=20)
+
+        self.assertLessEqual(len(slow), 3)
+        self.assertGreater(slow.coalesced, 0)
+        self.assertEqual(fast.coalesced, 0)
+        self.assert_matches(mirror(slow.drain()), game, Visibility.PUBLIC)
+        self.assert_matches(mirror(fast.drain()), game, Visibility.PUBLIC)
+
+    def test_late_subscribers_start_from_a_snapshot(self):
+        game = new_game(2)
+        broadcaster = Broadcaster(game)
+        game.run_rounds(5)
+        late = broadcaster.subscribe(Visibility.GAME_MASTER)
+        game.run_rounds(5)
+        self.assert_matches(mirror(late.drain()), game, Visibility.GAME_MASTER)
+
+    def test_consumer_thread_and_close(self):
+        game = new_game(3)
+        broadcaster = Broadcaster(game, max_pending=1000)
+        subscription = broadcaster.subscribe()
+        received = []
+
+        def consume():
+            while (frame := subscription.get(timeout=5)) is not None:
+                received.append(frame)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        while game.phase != GamePhase.GAME_OVER and game.round < 20:
+            game.go_to_next_phase()
+        broadcaster.close()
+        consumer.join()
+        self.assertTrue(subscription.closed)
+        self.assert_matches(mirror(received), game, Visibility.PUBLIC)
+        self.assertFalse(game.hooks.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for the protocol module."""
+
+import unittest
+
+from findpatientzero.engine.entities.event import NULL_EVENT
+from findpatientzero.engine.entities.player import InfectionState, PlayerRole
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.server.protocol import (
+    StateDelta,
+    StateMirror,
+    Visibility,
+    decode,
+    decode_json,
+    diff,
+    encode,
+    encode_json,
+    event_catalogue,
+    snapshot,
+)
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon"]
+
+
+def new_game(seed):
+    config = GameConfig(num_players=8, num_cities=len(CITY_NAMES), auto_roll=False, cpu_governors=True)
+    return Game(config, [], CITY_NAMES, seed=seed)
+
+
+def deltas(game, max_round=40):
+    """Play a game round by round, yielding the delta of every committed state."""
+    previous = game.last_state
+    while game.phase != GamePhase.GAME_OVER and game.round < max_round:
+        game.run_rounds(1)
+        yield diff(game, previous, game.last_state)
+        previous = game.last_state
+
+
+class TestProtocol(unittest.TestCase):
+    def test_encodings_round_trip(self):
+        for seed in range(5):
+            game = new_game(seed)
+            for delta in [snapshot(game), *deltas(game)]:
+                self.assertEqual(decode(encode(delta)), delta)
+                self.assertEqual(decode_json(encode_json(delta)), delta)
+
+    def test_mirror_follows_game(self):
+        for seed in range(5):
+            game = new_game(seed)
+            mirror = StateMirror()
+            mirror.apply(decode(encode(snapshot(game))))
+            for delta in deltas(game):
+                mirror.apply(decode(encode(delta)))
+
+            current = snapshot(game)
+            self.assertEqual(mirror.round, current.round)
+            self.assertEqual(mirror.players, current.players)
+            self.assertEqual(mirror.cities, current.cities)
+            self.assertEqual(mirror.patient_zero, game.player_id(game.patient_zero))
+
+    def test_deltas_only_hold_changes(self):
+        game = new_game(2)
+        previous = game.last_state
+        for delta in deltas(game, max_round=10):
+            for player_id, fields in delta.players.items():
+                old = previous.players.get(game.players[player_id])
+                if old is not None and "role" not in fields:
+                    self.assertEqual(old.role, game.players[player_id].state.role)
+            self.assertIsNone(delta.patient_zero)
+            previous = game.last_state
+        self.assertLess(len(encode(diff(game, previous, previous))), 10)
+
+    def test_public_view_is_redacted(self):
+        game = new_game(0)
+        mirror = StateMirror()
+        for delta in [snapshot(game), *deltas(game)]:
+            public = delta.redact(Visibility.PUBLIC)
+            self.assertIs(delta.redact(Visibility.GAME_MASTER), delta)
+            self.assertIsNone(public.patient_zero)
+            self.assertTrue(all("health" not in fields for fields in public.players.values()))
+            self.assertTrue(all("infection_stage" not in fields for fields in public.cities.values()))
+            for city_id, fields in public.cities.items():
+                self.assertEqual(fields, {name: delta.cities[city_id][name] for name in fields})
+            mirror.apply(decode(encode(public)))
+        self.assertTrue(all("infection_stage" not in fields for fields in mirror.cities.values()))
+        self.assertEqual(len(mirror.cities), len(game.cities))
+
+    def test_encoding_values(self):
+        delta = StateDelta(
+            300,
+            {0: {"health": InfectionState.DEAD, "role": PlayerRole.OBSERVER, "city": None, "event": NULL_EVENT}},
+            {1: {"alerted": True, "conditions": ["harbor", "unknown"]}},
+            patient_zero=7,
+        )
+        self.assertEqual(decode(encode(delta)), delta)
+        self.assertEqual(event_catalogue()[1], NULL_EVENT)
+        with self.assertRaises(ValueError):
+            decode(b"\x00" + encode(delta)[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
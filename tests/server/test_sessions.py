@@ -0,0 +1,246 @@
+"""Tests for the sessions module."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from findpatientzero.engine.entities.event import NULL_EVENT
+from findpatientzero.engine.game import Game, GameConfig, GamePhase
+from findpatientzero.engine.governor import GovernorPolicy
+from findpatientzero.engine.hooks import Hook
+from findpatientzero.server import sessions
+from findpatientzero.server.sessions import SessionStore, dump_game, load_game
+
+CITY_NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+
+
+def new_game(seed=0):
+    config = GameConfig(num_players=6, num_cities=len(CITY_NAMES), auto_roll=False, cpu_governors=True)
+    return Game(config, ["Ann"], CITY_NAMES, seed=seed)
+
+
+def advance(game, phases):
+    """Step a game, answering the human's prompts at random."""
+    for _ in range(phases):
+        if game.phase == GamePhase.GAME_OVER:
+            return
+        game.answer_pending_prompts()
+        game.go_to_next_phase()
+
+
+def summary(game):
+    return (
+        game.round,
+        game.phase,
+        [(player.name, player.health, player.role, str(player.city)) for player in game.players],
+        [(city.infection_stage, city.alerted) for city in game.cities],
+    )
+
+
+class TestSerialization(unittest.TestCase):
+    def test_reloaded_game_plays_on_identically(self):
+        game = new_game(1)
+        advance(game, 40)
+        copy = load_game(dump_game(game))
+        self.assertEqual(summary(copy), summary(game))
+        advance(game, 60)
+        advance(copy, 60)
+        self.assertEqual(summary(copy), summary(game))
+
+    def test_shared_game_data_is_not_copied(self):
+        game = new_game(2)
+        advance(game, 8)
+        copy = load_game(dump_game(game))
+        cpu = next(player for player in copy.players if player.is_cpu)
+        self.assertIs(cpu.governor_strategy, GovernorPolicy.default())
+        self.assertEqual(
+            sum(player.next_event is NULL_EVENT for player in copy.players),
+            sum(player.next_event is NULL_EVENT for player in game.players),
+        )
+        self.assertIs(copy._transitions, game._transitions)
+
+    def test_subscribers_are_not_serialized(self):
+        game = new_game(3)
+        game.hooks.subscribe(Hook.DIED, lambda game, player: None)
+        copy = load_game(dump_game(game))
+        self.assertFalse(copy.hooks.active)
+        self.assertIs(copy.hooks.game, copy)
+        self.assertTrue(all(player.hooks is copy.hooks for player in copy.players))
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_idle_sessions_are_evicted_and_reloaded(self):
+        store = SessionStore(self.directory.name, idle_seconds=60)
+        games = {f"game {seed}": new_game(seed) for seed in range(3)}
+        for session_id, game in games.items():
+            advance(game, 10)
+            store.put(session_id, game)
+        expected = {session_id: summary(game) for session_id, game in games.items()}
+        resident = store.metrics.resident_bytes
+        self.assertGreater(resident, 0)
+
+        store.get("game 0")
+        self.assertEqual(store.evict_idle(now=store._sessions["game 2"].last_used + 30), 0)
+        self.assertEqual(store.evict_idle(now=store._sessions["game 0"].last_used + 60), 3)
+        self.assertEqual(store.metrics.evictions, 3)
+        self.assertEqual(store.metrics.resident_bytes, 0)
+        self.assertEqual(store.metrics.evicted_sessions, 3)
+        self.assertEqual(len(os.listdir(self.directory.name)), 3)
+
+        for session_id in games:
+            self.assertEqual(summary(store.get(session_id)), expected[session_id])
+        self.assertEqual(store.metrics.hits, 1)
+        self.assertEqual(store.metrics.misses, 3)
+        self.assertEqual(store.metrics.hit_rate, 0.25)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertEqual(len(store), 3)
+
+    def test_prompt_response_rehydrates(self):
+        store = SessionStore(self.directory.name)
+        game = new_game(4)
+        while game.phase != GamePhase.ROLL_DICE:
+            advance(game, 1)
+        store.put("table", game)
+        store.evict_idle(now=float("inf"))
+        self.assertNotIn("table", store._sessions)
+
+        ann = game.player_id(game.get_player("Ann"))
+        self.assertTrue(store.submit_responses("table", {ann: 42}))
+        reloaded = store.get("table")
+        self.assertIsNot(reloaded, game)
+        self.assertEqual(reloaded.get_player("Ann").roll_prompt_response, 42)
+        self.assertEqual(reloaded.phase, GamePhase.ROLL_EVENTS)
+
+    def test_memory_limit_evicts_least_recently_used(self):
+        probe = new_game(0)
+        size = len(dump_game(probe))
+        store = SessionStore(self.directory.name, max_resident_bytes=int(size * 2.5))
+        for seed in range(3):
+            store.put(f"game {seed}", new_game(seed))
+        self.assertEqual(list(store._sessions), ["game 1", "game 2"])
+        store.get("game 1")
+        store.get("game 0")
+        self.assertEqual(list(store._sessions), ["game 1", "game 0"])
+        self.assertEqual(store.metrics.evictions, 2)
+
+    def test_resident_size_follows_played_rounds(self):
+        store = SessionStore(self.directory.name)
+        store.put("table", new_game(6))
+        while store.get("table").phase != GamePhase.GAME_OVER and store.get("table").round < 30:
+            advance(store.get("table"), 1)
+        game = store.get("table")
+        self.assertGreater(game.round, 5)
+        actual = len(dump_game(game))
+        self.assertAlmostEqual(store.metrics.resident_bytes / actual, 1.0, delta=0.2)
+
+        # Evicting measures the growth, and the store learns from it
+        store.evict_idle(now=float("inf"))
+        self.assertEqual(store.metrics.resident_bytes, 0)
+        self.assertGreater(store._growth_units, 0)
+        self.assertEqual(store.get("table").round, game.round)
+        self.assertEqual(store.metrics.resident_bytes, actual)
+
+    def test_disk_io_happens_outside_the_lock(self):
+        store = SessionStore(self.directory.name)
+        store.put("other", new_game(7))
+        store.put("table", new_game(8))
+        store.evict_idle(now=float("inf"))
+        locked = []
+
+        def checked(function):
+            def wrapper(*args):
+                locked.append(store._lock.locked())
+                if not locked[-1]:
+                    # Sessions in transit are still stored
+                    self.assertIn("table", store)
+                return function(*args)
+            return wrapper
+
+        with patch.object(sessions, "load_game", checked(load_game)), patch.object(sessions, "dump_game", checked(dump_game)):
+            store.get("table")
+            store.evict_idle(now=float("inf"))
+        self.assertEqual(locked, [False, False])
+
+    def test_concurrent_reloads_share_one_read(self):
+        store = SessionStore(self.directory.name)
+        store.put("table", new_game(9))
+        store.evict_idle(now=float("inf"))
+        games = []
+        threads = [threading.Thread(target=lambda: games.append(store.get("table"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(game) for game in games}), 1)
+        self.assertEqual(store.metrics.misses, 1)
+        self.assertEqual(store.metrics.hits, 7)
+
+    def test_games_in_use_are_not_evicted(self):
+        """Changes made while another thread forces evictions are all kept."""
+        store = SessionStore(self.directory.name, max_resident_bytes=1)
+        store.put("other", new_game(11))
+        store.put("table", new_game(10))
+        stop = threading.Event()
+
+        def evict():
+            while not stop.is_set():
+                store.get("other")
+                store.evict_idle(now=float("inf"))
+
+        thread = threading.Thread(target=evict)
+        thread.start()
+        submitted = 0
+        try:
+            for _ in range(150):
+                with store.use("table") as game:
+                    if game.phase == GamePhase.GAME_OVER:
+                        break
+                    ann = game.get_player("Ann")
+                    rolling = game.phase == GamePhase.ROLL_DICE and ann.roll_prompt_pending
+                    # Let the other thread try to evict the game before it is changed
+                    time.sleep(0.001)
+                    if not rolling:
+                        advance(game, 1)
+                    expected = summary(game)
+                if rolling:
+                    self.assertTrue(store.submit_responses("table", {game.player_id(ann): 42}))
+                    submitted += 1
+                    game = store.get("table")
+                    self.assertEqual(game.phase, GamePhase.ROLL_EVENTS)
+                    self.assertEqual(game.get_player("Ann").roll_prompt_response, 42)
+                else:
+                    self.assertEqual(summary(store.get("table")), expected)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertGreater(submitted, 0)
+        self.assertGreater(store.metrics.evictions, 10)
+
+    def test_watched_games_stay_resident(self):
+        store = SessionStore(self.directory.name)
+        game = new_game(5)
+        game.hooks.subscribe(Hook.PHASE_CHANGED, lambda game, previous, phase: None)
+        store.put("watched", game)
+        self.assertEqual(store.evict_idle(now=float("inf")), 0)
+        self.assertIs(store.get("watched"), game)
+
+    def test_remove_and_missing_sessions(self):
+        store = SessionStore(self.directory.name)
+        store.put("table", new_game())
+        store.evict_idle(now=float("inf"))
+        store.remove("table")
+        self.assertNotIn("table", store)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        with self.assertRaises(KeyError):
+            store.get("table")
+
+
+if __name__ == "__main__":
+    unittest.main()
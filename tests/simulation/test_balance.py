@@ -0,0 +1,112 @@
+"""Tests for the balance optimizer module."""
+
+import os
+import tempfile
+import unittest
+
+from yaml import safe_load
+
+from findpatientzero.engine.entities.event import EVENTS
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.gamedata.load import load_events
+from findpatientzero.simulation.balance import (
+    CATEGORIES,
+    BalanceCandidate,
+    BalanceOptimizer,
+    BalanceSpace,
+    BalanceTargets,
+    write_candidate,
+)
+
+BASE = GameConfig(num_players=6, num_cities=4)
+
+
+def new_optimizer(cache_path=None, **targets):
+    space = BalanceSpace(
+        BalanceCandidate.default(BASE, ["survey_threshold"]),
+        CATEGORIES[1:2],
+        {"survey_threshold": (1, 11)},
+    )
+    return BalanceOptimizer(BASE, BalanceTargets(**targets), space, games=20, max_round=60, cache_path=cache_path)
+
+
+class TestBalanceCandidate(unittest.TestCase):
+    def test_default_matches_game_data(self):
+        candidate = BalanceCandidate.default(BASE, ["lockdown_duration"])
+        self.assertEqual(candidate.events(), EVENTS)
+        config = candidate.config(BASE)
+        self.assertEqual(config.lockdown_duration, BASE.lockdown_duration)
+        self.assertEqual(BalanceCandidate.from_data(candidate.to_data()), candidate)
+
+    def test_space_rounds_and_bounds(self):
+        space = BalanceSpace(BalanceCandidate.default(BASE, ["survey_threshold"]), CATEGORIES[:1], {"survey_threshold": (1, 11)})
+        vector = space.encode(space.base)
+        self.assertEqual(space.decode(vector), space.base)
+        vector = [value + 0.4 for value in vector[:-1]] + [40.0]
+        vector[0] = -3.0
+        candidate = space.decode(vector)
+        self.assertEqual(candidate.frequencies[0][0], 0)
+        self.assertEqual(candidate.frequencies[0][1:], space.base.frequencies[0][1:])
+        self.assertEqual(candidate.frequencies[1:], space.base.frequencies[1:])
+        self.assertEqual(dict(candidate.parameters)["survey_threshold"], 11)
+
+    def test_infeasible(self):
+        frequencies = list(BalanceCandidate.default().frequencies)
+        frequencies[0] = (1,) + (0,) * (len(frequencies[0]) - 1)
+        candidate = BalanceCandidate(tuple(frequencies))
+        self.assertFalse(candidate.feasible)
+        self.assertEqual(new_optimizer(rounds=10).evaluate(candidate).loss, float("inf"))
+
+
+class TestBalanceOptimizer(unittest.TestCase):
+    def test_optimize(self):
+        optimizer = new_optimizer(rounds=30, death_rate=0.2)
+        start = optimizer.evaluate(optimizer.space.base)
+        best = optimizer.optimize(max_evaluations=12, step=2)
+        self.assertLessEqual(best.loss, start.loss)
+        self.assertLessEqual(optimizer.simulated, 12 + len(optimizer.space.encode(optimizer.space.base)))
+        # Common random numbers: evaluating again replays the same games
+        self.assertEqual(new_optimizer(rounds=30, death_rate=0.2).evaluate(best.candidate), best)
+
+    def test_optimize_without_feasible_candidates(self):
+        optimizer = new_optimizer(rounds=30)
+        frequencies = list(optimizer.space.base.frequencies)
+        frequencies[1] = (0,) * len(frequencies[1])
+        start = BalanceCandidate(tuple(frequencies), optimizer.space.base.parameters)
+        with self.assertRaisesRegex(ValueError, "No feasible candidate"):
+            optimizer.optimize(start, max_evaluations=4, step=0.1)
+        self.assertEqual(optimizer.simulated, 0)
+
+    def test_cache_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.jsonl")
+            first = new_optimizer(path, rounds=20)
+            best = first.optimize(max_evaluations=6)
+            second = new_optimizer(path, death_rate=0.5)
+            self.assertEqual(second.simulated, first.simulated)
+            evaluation = second.evaluate(best.candidate)
+            self.assertEqual((evaluation.rounds, evaluation.death_rate), (best.rounds, best.death_rate))
+            self.assertEqual(second.simulated, first.simulated)
+            # Other settings are not reused
+            self.assertEqual(BalanceOptimizer(BASE, BalanceTargets(10), first.space, games=5, cache_path=path).simulated, 0)
+
+    def test_write_candidate(self):
+        frequencies = [list(values) for values in BalanceCandidate.default().frequencies]
+        frequencies[2][0] = 9
+        candidate = BalanceCandidate(tuple(map(tuple, frequencies)), (("survey_threshold", 4),))
+        with tempfile.TemporaryDirectory() as directory:
+            write_candidate(candidate, directory)
+            for category, values in zip(CATEGORIES, frequencies):
+                with open(os.path.join(directory, f"{category.key}.yml"), encoding="utf-8") as f:
+                    events = safe_load(f)["events"]
+                self.assertEqual([event["frequency"] for event in events], values)
+                self.assertEqual(
+                    [{**event, "frequency": 0} for event in events],
+                    [{**event, "frequency": 0} for event in load_events(category.key)],
+                )
+            with open(os.path.join(directory, "config.yml"), encoding="utf-8") as f:
+                self.assertEqual(safe_load(f), {"survey_threshold": 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
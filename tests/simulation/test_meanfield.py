@@ -0,0 +1,62 @@
+"""Tests for the mean-field model module."""
+
+import unittest
+
+from findpatientzero.engine.entities.player import InfectionState
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.meanfield import MeanFieldModel, _rotate, _Window, engine_rounds, measure_error
+
+
+class TestWindow(unittest.TestCase):
+    def test_matches_the_whole_map(self):
+        """Values laid out in a window behave like the same values on the whole map."""
+        n = 12
+        window = _Window(n, -2, 5)
+        values = [1.0, 2.0, 3.0, 4.0, 5.0, 0.5]
+        full = _Window(n, 0, n)
+        expanded = full.adapt(values, window)
+        self.assertEqual(expanded[:3], [3.0, 4.0, 5.0])
+        self.assertEqual(expanded[-2:], [1.0, 2.0])
+        self.assertEqual(window.total(values), sum(expanded))
+        wider = window.widen(2, 3)
+        self.assertEqual(full.adapt(wider.adapt(values, window), wider), expanded)
+        # Rotating is exact when no value leaves the window
+        widened = wider.adapt(values, window)
+        for offset in (1, 2, -1, -2, n - 1, n + 3):
+            self.assertEqual(full.adapt(wider.rotate(widened, offset), wider), _rotate(expanded, offset))
+        self.assertFalse(window.widen(3, 4).background)
+
+
+class TestMeanFieldModel(unittest.TestCase):
+    def test_conserves_players(self):
+        for config in (
+            GameConfig(num_players=8, num_cities=6),
+            GameConfig(num_players=30, num_cities=200, cpu_governors=True),
+        ):
+            for estimate in MeanFieldModel(config).run(40):
+                self.assertAlmostEqual(sum(estimate.health.values()), 1.0)
+                self.assertEqual(len(estimate.stages), config.num_cities)
+                self.assertAlmostEqual(estimate.mean_stage, sum(estimate.stages) / config.num_cities)
+                self.assertLessEqual(estimate.alerted_cities, config.num_cities + 1e-9)
+
+    def test_first_rounds_are_exact(self):
+        """Before anyone is infected by Patient Zero's city, the model matches the engine (cities approximately)."""
+        config = GameConfig(num_players=20, num_cities=10)
+        model = MeanFieldModel(config).run(2)
+        engine = engine_rounds(config, list(range(400)), 2)
+        for game_round in (0, 1):
+            for health, fraction in model[game_round].health.items():
+                self.assertAlmostEqual(fraction, engine[game_round].health[health])
+        self.assertAlmostEqual(model[0].health[InfectionState.ASYMPTOMATIC], 1 / config.num_players)
+        self.assertAlmostEqual(model[1].infected_cities, engine[1].infected_cities, delta=0.1)
+        self.assertAlmostEqual(model[1].stages[0], engine[1].stages[0], delta=0.1)
+
+    def test_error_against_engine(self):
+        error = measure_error(GameConfig(num_players=8, num_cities=6), list(range(60)), 25)
+        self.assertLess(error.health, 0.03)
+        self.assertLess(error.max_health, 0.15)
+        self.assertLess(error.mean_stage, 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for the successive-halving race module."""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.balance import BalanceTargets
+from findpatientzero.simulation.racing import SuccessiveHalving, target_score
+
+BASE = GameConfig(num_players=5, num_cities=4)
+
+
+def cooldown_score(config, result):
+    """A score that only depends on the configuration (lower cooldowns are better)."""
+    return float(config.suspicious_cooldown)
+
+
+def noisy_cooldown_score(config, result):
+    """A score with the same noise for every configuration, whose means differ by cooldown."""
+    return config.suspicious_cooldown / 100 + result.seed % 2
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    def test_halves_and_doubles(self):
+        configs = {f"cooldown {cooldown}": replace(BASE, suspicious_cooldown=cooldown) for cooldown in range(8)}
+        race = SuccessiveHalving(noisy_cooldown_score, initial_games=4, max_round=40)
+        entries = race.run(configs)
+        self.assertEqual([rung.games for rung in race.rungs], [4, 8, 16, 32])
+        self.assertEqual([rung.survivors for rung in race.rungs], [8, 4, 2, 1])
+        self.assertEqual(entries[0].name, "cooldown 0")
+        self.assertIsNone(entries[0].eliminated)
+        self.assertEqual(entries[-1].eliminated, 0)
+        self.assertEqual([entry.games for entry in entries], [32, 16, 8, 8, 4, 4, 4, 4])
+        self.assertEqual(entries[0].result.games, 32)
+
+    def test_game_limit(self):
+        configs = {"a": BASE, "b": BASE, "c": replace(BASE, num_players=6)}
+        race = SuccessiveHalving(target_score(rounds=12), initial_games=5, max_games=12, max_round=40)
+        entries = race.run(configs)
+        self.assertEqual(race.rungs[-1].games, 12)
+        # Common random numbers: identical candidates play identical games
+        a, b = sorted((entry for entry in entries if entry.name in "ab"), key=lambda entry: entry.name)
+        if a.games == b.games:
+            self.assertEqual(a.scores.mean, b.scores.mean)
+            self.assertEqual(a.result.rounds.mean, b.result.rounds.mean)
+
+    def test_confidently_worse_candidates_are_eliminated(self):
+        configs = {f"cooldown {cooldown}": replace(BASE, suspicious_cooldown=cooldown) for cooldown in range(4)}
+        race = SuccessiveHalving(cooldown_score, initial_games=4, fraction=0.25, max_round=40)
+        race.run(configs)
+        # Every interval is a point, so everything but the best goes at once
+        self.assertEqual(race.rungs[0].survivors, 4)
+        self.assertEqual(len(race.rungs[0].eliminated), 3)
+
+    def test_targets_judge_the_means(self):
+        configs = {f"survey {survey}": replace(BASE, survey_threshold=survey) for survey in (1, 4, 8)}
+        targets = BalanceTargets(rounds=15, death_rate=0.5)
+        race = SuccessiveHalving(targets, initial_games=6, max_games=24, max_round=40)
+        for entry in race.run(configs):
+            result = entry.result
+            death_rate = result.deaths.mean / BASE.num_players
+            self.assertEqual(entry.games, result.games)
+            self.assertEqual(entry.loss, targets.loss(result.rounds.mean, death_rate))
+            low, high = entry.interval
+            self.assertLessEqual(low, entry.loss)
+            self.assertLessEqual(entry.loss, high)
+
+    def test_loss_interval(self):
+        targets = BalanceTargets(rounds=10, death_rate=0.5)
+        cases = [
+            (targets, (8, 12), (0.4, 0.7), (0.0, 0.04 + 0.04)),
+            (targets, (12, 15), (0.2, 0.4), (0.04 + 0.01, 0.25 + 0.09)),
+            (BalanceTargets(rounds=10), (5, 8), (0.0, 1.0), (0.04, 0.25)),
+        ]
+        for targets, rounds, death_rate, expected in cases:
+            for bound, expected_bound in zip(targets.loss_interval(rounds, death_rate), expected):
+                self.assertAlmostEqual(bound, expected_bound)
+
+    def test_executor_matches_serial(self):
+        configs = {f"survey {survey}": replace(BASE, survey_threshold=survey) for survey in (1, 4, 8)}
+        expected = SuccessiveHalving(target_score(15, 0.5), initial_games=6, max_games=24, max_round=40).run(configs)
+        with ThreadPoolExecutor(4) as executor:
+            race = SuccessiveHalving(target_score(15, 0.5), initial_games=6, max_games=24, max_round=40, executor=executor)
+            entries = race.run(configs)
+        self.assertEqual(
+            [(entry.name, entry.games, entry.scores.mean) for entry in entries],
+            [(entry.name, entry.games, entry.scores.mean) for entry in expected],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Tests for the simulation runner module."""
+
+import unittest
+from dataclasses import replace
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.runner import BatchRunner, GameOutcome, play_game
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.config = GameConfig(num_players=5, num_cities=4)
+
+    def test_play_game_is_deterministic(self):
+        self.assertEqual(play_game(self.config, 7, 60), play_game(self.config, 7, 60))
+
+    def test_transmissions_with_contact_tracing(self):
+        self.assertIsNone(play_game(self.config, 7, 60).transmissions)
+        result = play_game(replace(self.config, track_contacts=True), 7, 60)
+        self.assertEqual(replace(result, transmissions=None), play_game(self.config, 7, 60))
+        self.assertTrue(result.transmissions)
+        rounds = [game_round for _, game_round, _ in result.transmissions]
+        self.assertEqual(rounds, sorted(rounds))
+        infected = {player for player, _, _ in result.transmissions}
+        for player, _, source in result.transmissions:
+            self.assertIn(player, range(self.config.num_players))
+            self.assertTrue(source is None or source in infected)
+
+    def test_stops_once_precise(self):
+        runner = BatchRunner(rate_precision=0.1, length_precision=2, min_games=20, batch_size=20, max_round=60)
+        result = runner.run({"small": self.config})["small"]
+        self.assertTrue(result.converged)
+        self.assertLess(result.games, runner.max_games)
+        self.assertEqual(sum(result.outcomes.values()), result.games)
+        for outcome in GameOutcome:
+            low, high = result.rate_interval(outcome)
+            self.assertLessEqual((high - low) / 2, 0.1)
+
+    def test_game_limit(self):
+        runner = BatchRunner(rate_precision=0.001, min_games=10, max_games=30, batch_size=20, max_round=60)
+        result = runner.run_config("limited", self.config)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.games, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
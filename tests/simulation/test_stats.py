@@ -0,0 +1,46 @@
+"""Tests for the simulation statistics module."""
+
+import statistics
+import unittest
+
+from findpatientzero.simulation.stats import RunningStats, wilson_interval, z_score
+
+
+class TestStats(unittest.TestCase):
+    def test_z_score(self):
+        self.assertAlmostEqual(z_score(0.95), 1.959964, places=5)
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=4)
+        self.assertAlmostEqual(high, 0.5962, places=4)
+        low, high = wilson_interval(0, 20)
+        self.assertAlmostEqual(low, 0.0)
+        self.assertGreater(high, 0.0)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_running_stats(self):
+        values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(values))
+
+    def test_merge(self):
+        values = [2.5, 7, 1, 8, 2, 8, 1.5, 8]
+        left, right, merged = RunningStats(), RunningStats(), RunningStats()
+        for value in values[:3]:
+            left.add(value)
+        for value in values[3:]:
+            right.add(value)
+        for value in values:
+            merged.add(value)
+        left.merge(right)
+        self.assertEqual(left.count, merged.count)
+        self.assertAlmostEqual(left.mean, merged.mean)
+        self.assertAlmostEqual(left.variance, merged.variance)
+
+
+if __name__ == "__main__":
+    unittest.main()
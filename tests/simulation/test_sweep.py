@@ -0,0 +1,109 @@
+"""Tests for the simulation sweep module."""
+
+import json
+import os
+import socket
+import tempfile
+import unittest
+from multiprocessing import get_context
+from unittest.mock import patch
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation import sweep
+from findpatientzero.simulation.runner import game_seed, play_game
+from findpatientzero.simulation.sweep import Sweep
+
+
+def work(path):
+    Sweep(path).work()
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        configs = {
+            "small": GameConfig(num_players=4, num_cities=3),
+            "large": GameConfig(num_players=6, num_cities=4),
+        }
+        self.sweep = Sweep.create(self.path, configs, games=25, shard_size=10, seed=3, max_round=60)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_manifest(self):
+        sweep = Sweep(self.path)
+        self.assertEqual([(shard.config, shard.start, shard.stop) for shard in sweep.shards], [
+            ("small", 0, 10), ("small", 10, 20), ("small", 20, 25),
+            ("large", 0, 10), ("large", 10, 20), ("large", 20, 25),
+        ])
+        self.assertEqual(sweep.configs, self.sweep.configs)
+        with self.assertRaises(FileExistsError):
+            Sweep.create(self.path, sweep.configs, games=5)
+
+    def test_work_and_merge(self):
+        self.assertEqual(self.sweep.work(), 6)
+        self.assertEqual(self.sweep.pending(), [])
+        expected = [play_game(self.sweep.configs["large"], game_seed(3, index), 60) for index in range(25)]
+        self.assertEqual(list(self.sweep.results("large")), expected)
+
+        output = os.path.join(self.path, "merged.jsonl")
+        merged = self.sweep.merge(output)
+        self.assertEqual(merged["small"].games, 25)
+        self.assertAlmostEqual(merged["large"].rounds.mean, sum(result.rounds for result in expected) / 25)
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(sum(1 for _ in f), 50)
+
+    def test_resume(self):
+        """A restarted sweep only plays unfinished shards, and reclaims claims of dead workers."""
+        self.sweep.play(self.sweep.shards[0])
+        dead = {"host": socket.gethostname(), "pid": 2 ** 22 + 1, "time": 0}
+        with open(os.path.join(self.path, "claims", f"{self.sweep.shards[1].id}.json"), "w") as f:
+            json.dump(dead, f)
+        live = {"host": "elsewhere", "pid": 1, "time": 1e18}
+        with open(os.path.join(self.path, "claims", f"{self.sweep.shards[2].id}.json"), "w") as f:
+            json.dump(live, f)
+
+        self.assertEqual(Sweep(self.path).work(), 4)
+        self.assertEqual([shard.id for shard in self.sweep.pending()], [self.sweep.shards[2].id])
+
+    def test_live_local_claims_do_not_expire(self):
+        """A shard claimed by a live worker on this host is not taken over, even past the lease."""
+        old = {"host": socket.gethostname(), "pid": os.getpid(), "time": 0}
+        for shard in self.sweep.shards:
+            with open(os.path.join(self.path, "claims", f"{shard.id}.json"), "w") as f:
+                json.dump(old, f)
+        self.assertIsNone(Sweep(self.path).claim(lease=1))
+
+    def test_claims_are_renewed_while_playing(self):
+        shard = self.sweep.claim()
+        claim_path = os.path.join(self.path, "claims", f"{shard.id}.json")
+        with open(claim_path, "w") as f:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid(), "time": 0}, f)
+        times = []
+
+        def observed(*args):
+            with open(claim_path, encoding="utf-8") as f:
+                times.append(json.load(f)["time"])
+            return play_game(*args)
+
+        with patch.object(sweep, "play_game", observed):
+            self.sweep.play(shard, lease=0)
+        self.assertEqual(times[0], 0)
+        self.assertTrue(all(time > 0 for time in times[1:]))
+        self.assertFalse(os.path.exists(claim_path))
+
+    def test_concurrent_workers(self):
+        context = get_context("spawn")
+        workers = [context.Process(target=work, args=(self.path,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.sweep.pending(), [])
+        self.assertEqual(os.listdir(os.path.join(self.path, "claims")), [])
+        self.assertEqual(self.sweep.merge()["large"].games, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
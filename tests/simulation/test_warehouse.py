@@ -0,0 +1,139 @@
+"""Tests for the results warehouse module."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from dataclasses import replace
+
+from findpatientzero.engine.game import GameConfig
+from findpatientzero.simulation.balance import BalanceCandidate
+from findpatientzero.simulation.runner import BatchRunner, GameOutcome, GameResult, play_game
+from findpatientzero.simulation.warehouse import MIGRATIONS, ResultsWarehouse, config_hash, migrate, to_signed
+
+CONFIG = GameConfig(num_players=5, num_cities=4)
+
+
+class TestResultsWarehouse(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        results = [
+            GameResult(2 ** 64 - 1, GameOutcome.ALL_DEAD, 12, 5),
+            GameResult(0, GameOutcome.SURVIVED, 30, 2),
+            GameResult(2 ** 63, GameOutcome.UNFINISHED, 200, 0),
+        ]
+        with ResultsWarehouse(self.path, batch_size=2) as warehouse:
+            warehouse.add_games(CONFIG, results[:1], "small")
+            warehouse.add_games(GameConfig(num_players=6, num_cities=4), [GameResult(7, GameOutcome.SURVIVED, 9, 1)])
+            warehouse.add_games(CONFIG, results[1:])
+            self.assertEqual(warehouse.results(CONFIG), results)
+            (count,) = warehouse.connection.execute(
+                "SELECT COUNT(*) FROM games WHERE seed = ?", (to_signed(2 ** 64 - 1),)
+            ).fetchone()
+            self.assertEqual(count, 1)
+            self.assertEqual(
+                warehouse.connection.execute("SELECT name FROM configs WHERE hash = ?", (config_hash(CONFIG),)).fetchall(),
+                [("small",)],
+            )
+        with ResultsWarehouse(self.path) as warehouse:
+            self.assertEqual(warehouse.results(CONFIG), results)
+            self.assertEqual(warehouse.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            indexes = {name for (name,) in warehouse.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertTrue({"games_config", "games_seed"} <= indexes)
+
+    def test_round_metrics(self):
+        results = [play_game(CONFIG, seed, 60, round_metrics=True) for seed in range(5)]
+        with ResultsWarehouse(self.path) as warehouse:
+            warehouse.add_games(CONFIG, results)
+            warehouse.flush()
+            rows = warehouse.connection.execute(
+                "SELECT g.seed, COUNT(*), MAX(r.round), SUM(r.deaths) FROM round_metrics r "
+                "JOIN games g ON g.id = r.game_id GROUP BY g.id ORDER BY g.id"
+            ).fetchall()
+        self.assertEqual(rows, [
+            (result.seed, len(result.round_metrics), result.rounds, result.deaths) for result in results
+        ])
+
+    def test_transmissions(self):
+        config = replace(CONFIG, track_contacts=True)
+        results = [play_game(config, seed, 60) for seed in range(5)]
+        with ResultsWarehouse(self.path) as warehouse:
+            warehouse.add_games(config, results)
+            warehouse.add_games(CONFIG, [play_game(CONFIG, 0, 60)])
+            warehouse.flush()
+            rows = warehouse.connection.execute(
+                "SELECT g.seed, t.player, t.round, t.source FROM transmissions t "
+                "JOIN games g ON g.id = t.game_id ORDER BY g.id, t.round, t.player"
+            ).fetchall()
+        self.assertEqual(rows, [
+            (result.seed, *transmission)
+            for result in results
+            for transmission in sorted(result.transmissions, key=lambda transmission: transmission[1::-1])
+        ])
+
+    def test_concurrent_writers(self):
+        """Games buffered while another writer writes are renumbered, with their round metrics."""
+        first, second = ResultsWarehouse(self.path), ResultsWarehouse(self.path)
+        first.add_games(CONFIG, [play_game(CONFIG, 1, 60, round_metrics=True)])
+        second.add_games(CONFIG, [play_game(CONFIG, 2, 60, round_metrics=True)] * 3)
+        second.close()
+        first.close()
+        connection = sqlite3.connect(self.path)
+        rows = connection.execute(
+            "SELECT g.id, g.seed, g.rounds, MAX(r.round) FROM games g JOIN round_metrics r ON r.game_id = g.id GROUP BY g.id"
+        ).fetchall()
+        connection.close()
+        self.assertEqual([(game_id, seed) for game_id, seed, _, _ in rows], [(1, 2), (2, 2), (3, 2), (4, 1)])
+        for _, _, rounds, last_round in rows:
+            self.assertEqual(rounds, last_round)
+
+    def test_failed_write_is_renumbered_once(self):
+        first, second = ResultsWarehouse(self.path), ResultsWarehouse(self.path)
+        first.add_games(CONFIG, [GameResult(1, GameOutcome.SURVIVED, 10, 1)])
+        second.add_games(CONFIG, [GameResult(2, GameOutcome.SURVIVED, 10, 1)] * 3)
+        second.close()
+        first.connection.execute("CREATE TEMP TRIGGER fail BEFORE INSERT ON games BEGIN SELECT RAISE(ABORT, 'full'); END")
+        with self.assertRaises(sqlite3.DatabaseError):
+            first.flush()
+        first.connection.execute("DROP TRIGGER fail")
+        first.close()
+        connection = sqlite3.connect(self.path)
+        rows = connection.execute("SELECT id, seed FROM games ORDER BY id").fetchall()
+        connection.close()
+        self.assertEqual(rows, [(1, 2), (2, 2), (3, 2), (4, 1)])
+
+    def test_migrations(self):
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        self.assertEqual(migrate(connection), len(MIGRATIONS))
+        self.assertEqual(migrate(connection), len(MIGRATIONS))
+        upgraded = MIGRATIONS + [["ALTER TABLE games ADD COLUMN note TEXT"]]
+        self.assertEqual(migrate(connection, upgraded), len(MIGRATIONS) + 1)
+        self.assertIn("note", [column[1] for column in connection.execute("PRAGMA table_info(games)")])
+        connection.close()
+        with self.assertRaises(ValueError):
+            ResultsWarehouse(self.path)
+
+    def test_batch_runner(self):
+        runner = BatchRunner(min_games=10, max_games=30, batch_size=10, max_round=60, round_metrics=True)
+        with ResultsWarehouse(self.path) as runner.warehouse:
+            result = runner.run_config("small", CONFIG)
+            (games,) = runner.warehouse.connection.execute("SELECT COUNT(*) FROM games").fetchone()
+            self.assertEqual(games, 0)
+            self.assertEqual(len(runner.warehouse.results(CONFIG)), result.games)
+            (rounds,) = runner.warehouse.connection.execute("SELECT COUNT(*) FROM round_metrics").fetchone()
+            self.assertGreater(rounds, result.games)
+
+    def test_config_hash(self):
+        candidate = BalanceCandidate.default()
+        self.assertNotEqual(config_hash(candidate.config(CONFIG)), config_hash(CONFIG))
+        self.assertEqual(config_hash(candidate.config(CONFIG)), config_hash(candidate.config(CONFIG)))
+
+
+if __name__ == "__main__":
+    unittest.main()